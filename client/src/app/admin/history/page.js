@@ -6,18 +6,27 @@ import CircularProgress from "@mui/material/CircularProgress";
 
 const fetcher = (url) => fetch(url).then((res) => res.json());
 
+const rowsPerPage = 10;
+
 export default function HistoryTable() {
   const t = useTranslations("admin_history");
-  const { data, isLoading, error } = useSWR("/api/admin_history", fetcher);
-  const history = data?.history || [];
-
+  // The history is fetched a page at a time by following the API's cursors
+  const [cursor, setCursor] = useState(null);
   const [currentPage, setCurrentPage] = useState(1);
-  const rowsPerPage = 10;
-  const totalPages = Math.ceil(history.length / rowsPerPage);
-  const paginatedHistory = history.slice(
-    (currentPage - 1) * rowsPerPage,
-    currentPage * rowsPerPage
+  const params = new URLSearchParams({ page_size: rowsPerPage });
+  if (cursor) params.set("cursor", cursor);
+  const { data, isLoading, error } = useSWR(
+    `/api/admin_history?${params}`,
+    fetcher,
+    { keepPreviousData: true }
   );
+  const paginatedHistory = data?.history || [];
+  const firstRow = (currentPage - 1) * rowsPerPage + 1;
+
+  const goTo = (nextCursor, step) => {
+    setCursor(nextCursor);
+    setCurrentPage((prev) => prev + step);
+  };
 
   if (isLoading) {
     return (
@@ -74,23 +83,20 @@ export default function HistoryTable() {
       {/* Pagination Controls */}
       <div className="flex justify-between items-center mt-4 px-4">
         <p className="text-sm text-gray-600">
-          {t("showing")} {(currentPage - 1) * rowsPerPage + 1}–
-          {Math.min(currentPage * rowsPerPage, history.length)} {t("of")}{" "}
-          {history.length}
+          {t("showing")} {paginatedHistory.length ? firstRow : 0}–
+          {firstRow + paginatedHistory.length - 1}
         </p>
         <div className="flex gap-2">
           <button
-            onClick={() => setCurrentPage((prev) => Math.max(prev - 1, 1))}
-            disabled={currentPage === 1}
+            onClick={() => goTo(data.previous, -1)}
+            disabled={!data?.previous}
             className="px-3 py-1 bg-[#043755] text-white rounded hover:bg-gray-300 disabled:opacity-50"
           >
             {t("previous")}
           </button>
           <button
-            onClick={() =>
-              setCurrentPage((prev) => Math.min(prev + 1, totalPages))
-            }
-            disabled={currentPage === totalPages}
+            onClick={() => goTo(data.next, 1)}
+            disabled={!data?.next}
             className="px-3 py-1 bg-[#043755] text-white rounded hover:bg-gray-300 disabled:opacity-50"
           >
             {t("next")}
@@ -2,7 +2,11 @@ import axios from "axios";
 import { cookies } from "next/headers";
 import { API_BASE_URL, API_ENDPOINTS } from "@/apiConfig";
 
-export async function GET() {
+// The backend's next/previous links point at the backend itself; the
+// browser only needs their cursor to ask this route for that page
+const cursorOf = (link) => (link ? new URL(link).searchParams.get("cursor") : null);
+
+export async function GET(req) {
     try {
         const cookieStore = await cookies();
         const token = cookieStore.get("access_token")?.value;
@@ -14,8 +18,11 @@ export async function GET() {
             );
         }
 
+        const backendUrl = `${API_BASE_URL}${API_ENDPOINTS.ADMIN_HISTORY}`;
+        const urlWithParams = req.nextUrl.search ? `${backendUrl}${req.nextUrl.search}` : backendUrl;
+
         const response = await axios.get(
-            `${API_BASE_URL}${API_ENDPOINTS.ADMIN_HISTORY}`,
+            urlWithParams,
             {
                 headers: {
                     Authorization: `Bearer ${token}`,
@@ -25,7 +32,12 @@ export async function GET() {
             }
         );
 
-        return new Response(JSON.stringify(response.data), {
+        const data = { ...response.data };
+        if ("next" in data) {
+            data.next = cursorOf(data.next);
+            data.previous = cursorOf(data.previous);
+        }
+        return new Response(JSON.stringify(data), {
             status: response.status,
         });
     } catch (error) {
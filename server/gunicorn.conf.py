@@ -0,0 +1,95 @@
+"""
+Gunicorn settings for the API container (picked up from the working
+directory, /app, by the Dockerfile's CMD).
+
+Two worker models, chosen with GUNICORN_WORKER_CLASS:
+
+- gthread (default, the `backend` service): threaded workers serving
+  ssgi_fleet_api.wsgi, GUNICORN_THREADS requests at a time per worker, so
+  a slow SMTP call or database query ties up one thread, not the worker.
+- uvicorn (the `events` service in docker-compose.yml): asyncio workers
+  serving ssgi_fleet_api.asgi:events_application, which answers the driver
+  event stream (/api/assignments/driver/events/) only. Streams are held open without a
+  thread each. Sync views there all share one thread per worker (Django
+  runs them with sync_to_async(thread_sensitive=True)), so one slow view
+  stalls every other request on the worker; the API is not served from it.
+
+Measured with `load_test --concurrency 200` against the vehicle list, a
+50-row history page and the profile on one CPU with SQLite: gthread (3
+workers x 8 threads) 129-149 req/s, uvicorn (2 workers) 76-107 req/s.
+
+Each worker keeps its own database pool (DB_POOL_MAX_SIZE connections,
+see ssgi_fleet_api/database.py); workers x pool size must stay below the
+database's connection limit.
+
+`python manage.py load_test` measures throughput against a running
+server, so the two can be compared on the same machine.
+"""
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+# The same .env Django's settings read, for the checks below
+load_dotenv()
+
+worker_model = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+cpus = multiprocessing.cpu_count()
+
+chdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ssgi_fleet_api')
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+if worker_model == 'uvicorn':
+    wsgi_app = 'ssgi_fleet_api.asgi:events_application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    # One event loop per core
+    workers = int(os.getenv('GUNICORN_WORKERS', cpus + 1))
+else:
+    wsgi_app = 'ssgi_fleet_api.wsgi:application'
+    worker_class = 'gthread'
+    threads = int(os.getenv('GUNICORN_THREADS', 8))
+    # Threads cover I/O waits; a few processes more than cores cover the GIL
+    workers = int(os.getenv('GUNICORN_WORKERS', cpus * 2 + 1))
+
+# Assignment events only reach driver streams held by the process that
+# published them unless a shared broker is configured (assignment/events.py)
+if workers > 1 and not (os.getenv('REDIS_URL') or os.getenv('ASSIGNMENT_EVENTS_BROKER')):
+    raise RuntimeError(
+        f"{workers} workers need a shared assignment events broker: set REDIS_URL "
+        "(docker-compose.yml runs a redis service) or run with GUNICORN_WORKERS=1."
+    )
+
+# Recycle workers now and then so slow leaks cannot build up; the jitter
+# keeps them from all restarting at once.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+# Import Django once in the master and fork workers from it: faster
+# restarts and copy-on-write shared memory. Nothing opens a database
+# connection at import time, so workers never share one.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Kill a worker that has not answered the master for this long (excel
+# exports of a year of history stay well under it).
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+# On restart or deploy, give in-flight requests this long to finish.
+# Driver event streams are cut at the end of it and reconnect on their own.
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Worker heartbeat files on tmpfs rather than the container's overlay fs
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+# Per-request logs come from RequestMetricsMiddleware
+accesslog = None
+errorlog = '-'
+forwarded_allow_ips = os.getenv('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+
+def post_fork(server, worker):
+    # Log listener threads started during preload do not survive the fork
+    if not server.cfg.preload_app:
+        return
+    from django.conf import settings
+    from ssgi_fleet_api.logging_utils import configure_logging
+
+    configure_logging(settings.LOGGING)
@@ -29,7 +29,8 @@ from request.models import Vehicle_Request
 
 # Local serializer imports
 from .serializers import AcceptAssignmentSerializer, AssignCarSerializer \
-,DeclineAssignmentSerializer , CompleteAssignmentSerializer
+,DeclineAssignmentSerializer , CompleteAssignmentSerializer, VehicleMatchSerializer, \
+BulkAssignCarSerializer
 
 # Documentation constants (typically in docs.py)
 COMMON_RESPONSES = {
@@ -44,6 +45,14 @@ assign_car_docs = extend_schema(
     description="""
 **Admin/Superadmin-only endpoint**  
 Assigns a specific vehicle and driver to an approved request.
+
+The request and vehicle rows are locked while the assignment is made. If another
+admin is assigning the same vehicle or request at the same moment, or the vehicle
+changed since `vehicle_version` (the `version` field from the vehicle listing) was
+read, the endpoint answers **409 Conflict** and nothing is written.
+
+The vehicle is reserved for the request's start/end window. A vehicle already reserved for an
+overlapping window is refused with `error_code` `booking_conflict`.
 """,
     request=AssignCarSerializer,  # 🛠️ Note: use the Serializer class here, not OpenApiExample
     responses={
@@ -87,6 +96,19 @@ Assigns a specific vehicle and driver to an approved request.
                 )
             ]
         ),
+        409: OpenApiResponse(
+            description="The vehicle or request is being assigned by another admin, or the vehicle changed",
+            examples=[
+                OpenApiExample(
+                    name="Conflict Example",
+                    value={
+                        "error": "Assignment conflict",
+                        "error_code": "assignment_conflict",
+                        "detail": "The vehicle or request was changed by another admin. Refresh and try again."
+                    }
+                )
+            ]
+        ),
         **COMMON_RESPONSES
     },
     examples=[
@@ -95,6 +117,7 @@ Assigns a specific vehicle and driver to an approved request.
             value={
                 "request_id": 11,
                 "vehicle_id": 1,
+                "vehicle_version": 3,
                 "driver_id": 40,
                 "note": "VIP client - handle with care"
             },
@@ -105,6 +128,69 @@ Assigns a specific vehicle and driver to an approved request.
 
 
 
+bulk_assign_car_docs = extend_schema(
+    tags=["Assignment Endpoints"],
+    summary="Assign Vehicles to Many Approved Requests",
+    description="""
+**Admin/Superadmin-only endpoint**
+
+Assigns a list of (request, vehicle) pairs in one transaction. Each pair is checked the same way
+as the single assign endpoint; pairs that fail are reported in `results` with an `error_code`
+and do not prevent the others from being assigned. A vehicle can only be used once per batch.
+
+Returns **201** when every pair was assigned, **207** when some failed, and **400** when none
+could be assigned.
+""",
+    request=BulkAssignCarSerializer,
+    responses={
+        201: OpenApiResponse(description="All pairs assigned"),
+        207: OpenApiResponse(
+            description="Some pairs assigned, some failed",
+            examples=[
+                OpenApiExample(
+                    name="Partial Failure Example",
+                    value={
+                        "assigned": 1,
+                        "failed": 1,
+                        "results": [
+                            {
+                                "index": 0,
+                                "request_id": 11,
+                                "vehicle_id": 1,
+                                "status": "assigned",
+                                "assignment_id": 21,
+                                "license_plate": "ABC-1234",
+                                "driver": "Ahmed Ali"
+                            },
+                            {
+                                "index": 1,
+                                "request_id": 12,
+                                "vehicle_id": 1,
+                                "status": "failed",
+                                "error": "This vehicle is already assigned earlier in this batch",
+                                "error_code": "vehicle_used_in_batch"
+                            }
+                        ]
+                    }
+                )
+            ]
+        ),
+        **COMMON_RESPONSES
+    },
+    examples=[
+        OpenApiExample(
+            name="Bulk Assignment Request Example",
+            value={
+                "assignments": [
+                    {"request_id": 11, "vehicle_id": 1, "note": "VIP client"},
+                    {"request_id": 12, "vehicle_id": 2}
+                ]
+            },
+            request_only=True
+        )
+    ]
+)
+
 from .serializers import RejectCarAssignmentSerializer
 
 reject_car_assignment_docs = extend_schema(
@@ -159,6 +245,10 @@ Returns complete details of the driver's currently active assignment including:
 **Requirements:**
 - Authenticated driver account
 - Active assigned request in 'ASSIGNED' status
+
+New assignments are pushed to drivers over the server-sent events stream at
+`/api/assignments/driver/events/`; call this endpoint on start-up and after
+the stream reconnects rather than polling it.
 """,
     responses={
         200: OpenApiResponse(
@@ -417,8 +507,19 @@ admin_assignment_history_docs = extend_schema(
     tags=["Admin Endpoints"],
     summary="Admin Assignment History",
     description="""
-    Returns a list of all completed assignments (trips) for the admin dashboard history table. Each row includes: assigned date, requester, vehicle, driver, approver, completed trip pickup, destination, and total km (end_mileage - start_mileage). Department is omitted.
+    Returns completed assignments (trips) for the admin dashboard history table, newest first. Each row includes: assigned date, requester, vehicle, driver, approver, completed trip pickup, destination, and total km (end_mileage - start_mileage). Department is omitted.
+
+    Pass `page_size` (or a `cursor`) to receive cursor-paginated results: follow the `next` / `previous` links to move between pages. Each page costs the same regardless of how much history exists. Without them, the full history is returned under `history`.
     """,
+    parameters=[
+        OpenApiParameter("start", OpenApiTypes.DATE, OpenApiParameter.QUERY, description="Only trips completed on or after this date (YYYY-MM-DD)."),
+        OpenApiParameter("end", OpenApiTypes.DATE, OpenApiParameter.QUERY, description="Only trips completed on or before this date (YYYY-MM-DD)."),
+        OpenApiParameter("vehicle", OpenApiTypes.INT, OpenApiParameter.QUERY, description="Filter by vehicle id."),
+        OpenApiParameter("driver", OpenApiTypes.INT, OpenApiParameter.QUERY, description="Filter by driver user id."),
+        OpenApiParameter("department", OpenApiTypes.INT, OpenApiParameter.QUERY, description="Filter by the requester's department id."),
+        OpenApiParameter("page_size", OpenApiTypes.INT, OpenApiParameter.QUERY, description="Results per page (default 50, max 200)."),
+        OpenApiParameter("cursor", OpenApiTypes.STR, OpenApiParameter.QUERY, description="Opaque cursor taken from the `next` or `previous` link."),
+    ],
     responses={
         200: OpenApiResponse(
             description="List of completed assignments for admin history table",
@@ -426,6 +527,8 @@ admin_assignment_history_docs = extend_schema(
                 OpenApiExample(
                     "Admin Assignment History Example",
                     value={
+                        "next": "http://localhost:8000/api/assignments/admin/history/?cursor=cD0yMDI1LTA0LTAx",
+                        "previous": None,
                         "history": [
                             {
                                 "assigned_date": "2025-04-01",
@@ -443,4 +546,68 @@ admin_assignment_history_docs = extend_schema(
             ]
         )
     }
-)
\ No newline at end of file
+)
+
+
+vehicle_match_docs = extend_schema(
+    tags=["Assignment Endpoints"],
+    summary="Rank Available Vehicles for Approved Requests",
+    description="""
+**Admin/Superadmin-only endpoint**
+
+Ranks available vehicles for one or more approved requests. Vehicles must seat every passenger
+and be free for the request's time window; the rest are scored out of 100 on capacity fit (30),
+category (20), department (20), fuel efficiency (15) and kilometres left before the next service (15).
+
+Requests are matched most urgent and earliest first. Each request's top vehicle
+(`suggested_vehicle_id`) is reserved for that request within the batch, so two requests with
+overlapping times are never suggested the same vehicle. Nothing is written; use the assign
+endpoint to confirm a suggestion.
+""",
+    request=VehicleMatchSerializer,
+    responses={
+        200: OpenApiResponse(
+            description="Ranked vehicles per request",
+            examples=[
+                OpenApiExample(
+                    "Match Example",
+                    value={
+                        "matches": [
+                            {
+                                "request_id": 11,
+                                "suggested_vehicle_id": 4,
+                                "candidates": [
+                                    {
+                                        "vehicle_id": 4,
+                                        "license_plate": "AB1234",
+                                        "make_model": "Toyota Corolla",
+                                        "category": "pool",
+                                        "capacity": 4,
+                                        "department": "Finance",
+                                        "score": 91.5,
+                                        "breakdown": {
+                                            "capacity": 0.75,
+                                            "category": 1.0,
+                                            "department": 1.0,
+                                            "fuel_efficiency": 0.9,
+                                            "service_headroom": 1.0
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    }
+                )
+            ]
+        ),
+        **COMMON_RESPONSES
+    },
+    examples=[
+        OpenApiExample(
+            name="Match Request Example",
+            value={"request_ids": [11, 12, 15], "limit": 3},
+            request_only=True
+        )
+    ]
+)
+
@@ -1,31 +1,49 @@
 import logging
 from django.shortcuts import get_object_or_404
-from rest_framework import serializers
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
 from ..models import Vehicle_Assignment, Trips
+from ..reservations import conflicting, release, request_window
 from request.models import Vehicle_Request
 from users.models import User
-from vehicles.models import Vehicle
+from vehicles.models import Vehicle, VehicleDailyUsage
 from django.utils import timezone
-from django.db import transaction
+from django.db import DatabaseError, transaction
 from django.core.exceptions import ValidationError
 
 logger = logging.getLogger(__name__)
 
+class AssignmentConflict(APIException):
+    """Another admin is assigning, or has just assigned, the same vehicle or request."""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The vehicle or request was changed by another admin. Refresh and try again."
+    default_code = "assignment_conflict"
+
+
 class AssignCarSerializer(serializers.ModelSerializer):
     """
     Serializer for creating vehicle assignments.
     
     This serializer handles the assignment of vehicles to approved requests,
     including validation of request and vehicle status.
+
+    Validation locks the request and vehicle rows, so is_valid() must run
+    inside transaction.atomic() together with the writes it guards.
     """
     request_id = serializers.IntegerField(write_only=True)
     vehicle_id = serializers.IntegerField(write_only=True)
+    vehicle_version = serializers.IntegerField(
+        write_only=True,
+        required=False,
+        help_text="Vehicle version the admin was shown; the assignment is refused with 409 if the vehicle changed since"
+    )
     
     class Meta:
         model = Vehicle_Assignment
         fields = [
             'request_id',
             'vehicle_id',
+            'vehicle_version',
             'estimated_distance',
             'estimated_duration',
             'note'
@@ -36,78 +54,65 @@ class AssignCarSerializer(serializers.ModelSerializer):
             'note': {'required': False}
         }
 
-    def validate_request_id(self, value):
-        """Validate that the request exists and is in APPROVED status."""
+    def validate(self, data):
+        """
+        Validate the complete assignment data.
+
+        The request and the vehicle are each fetched once, with
+        SELECT ... FOR UPDATE NOWAIT: if another admin holds either row the
+        assignment fails fast with AssignmentConflict instead of queueing
+        behind them. The locked instances are returned as
+        data['vehicle_request'] and data['vehicle'].
+        """
         try:
-            request = Vehicle_Request.objects.get(pk=value)
-            if request.status != Vehicle_Request.Status.APPROVED:
-                logger.warning(f"[AssignCarSerializer][validate_request_id] Request {value} not APPROVED. Current status: {request.status}")
+            vehicle_request = Vehicle_Request.objects.select_for_update(
+                nowait=True, of=('self',)
+            ).select_related('requester__department').get(pk=data['request_id'])
+            if vehicle_request.status != Vehicle_Request.Status.APPROVED:
+                logger.warning(f"[AssignCarSerializer][validate] Request {data['request_id']} not APPROVED. Current status: {vehicle_request.status}")
                 raise serializers.ValidationError({
-                    "request_id": f"Request must be in APPROVED status. Current status: {request.status}",
-                    "current_status": request.status
+                    "request_id": f"Request must be in APPROVED status. Current status: {vehicle_request.status}",
+                    "current_status": vehicle_request.status
+                })
+            if Vehicle_Assignment.objects.filter(request=vehicle_request).exists():
+                logger.warning(f"[AssignCarSerializer][validate] Request {data['request_id']} already has an assignment.")
+                raise serializers.ValidationError({
+                    "request_id": "This request already has a vehicle assigned",
+                    "error_code": "already_assigned"
                 })
-            return value
-        except Vehicle_Request.DoesNotExist:
-            logger.error(f"[AssignCarSerializer][validate_request_id] No vehicle request found with ID {value}")
-            raise serializers.ValidationError({
-                "request_id": f"No vehicle request found with ID {value}",
-                "error_code": "request_not_found"
-            })
-        except Exception as e:
-            logger.exception(f"[AssignCarSerializer][validate_request_id] Unexpected error: {e}")
-            raise serializers.ValidationError({
-                "request_id": f"Unexpected error: {str(e)}",
-                "error_code": "unexpected_error"
-            })
 
-    def validate_vehicle_id(self, value):
-        """Validate that the vehicle exists and is available."""
-        try:
-            vehicle = Vehicle.objects.get(pk=value)
+            vehicle = Vehicle.objects.select_for_update(
+                nowait=True, of=('self',)
+            ).select_related('assigned_driver').get(pk=data['vehicle_id'])
             if vehicle.status != Vehicle.Status.AVAILABLE:
-                logger.warning(f"[AssignCarSerializer][validate_vehicle_id] Vehicle {value} not AVAILABLE. Current status: {vehicle.get_status_display()}")
+                logger.warning(f"[AssignCarSerializer][validate] Vehicle {data['vehicle_id']} not AVAILABLE. Current status: {vehicle.get_status_display()}")
                 raise serializers.ValidationError({
                     "vehicle_id": f"Vehicle must be AVAILABLE. Current status: {vehicle.get_status_display()}",
                     "current_status": vehicle.status
                 })
             if not vehicle.assigned_driver:
-                logger.warning(f"[AssignCarSerializer][validate_vehicle_id] Vehicle {value} has no assigned driver.")
+                logger.warning(f"[AssignCarSerializer][validate] Vehicle {data['vehicle_id']} has no assigned driver.")
                 raise serializers.ValidationError({
                     "vehicle_id": "Vehicle must have an assigned driver",
                     "error_code": "no_driver_assigned"
                 })
-            return value
-        except Vehicle.DoesNotExist:
-            logger.error(f"[AssignCarSerializer][validate_vehicle_id] No vehicle found with ID {value}")
-            raise serializers.ValidationError({
-                "vehicle_id": f"No vehicle found with ID {value}",
-                "error_code": "vehicle_not_found"
-            })
-        except Exception as e:
-            logger.exception(f"[AssignCarSerializer][validate_vehicle_id] Unexpected error: {e}")
-            raise serializers.ValidationError({
-                "vehicle_id": f"Unexpected error: {str(e)}",
-                "error_code": "unexpected_error"
-            })
-
-    def validate(self, data):
-        """Validate the complete assignment data."""
-        try:
-            request = Vehicle_Request.objects.get(pk=data['request_id'])
-            if Vehicle_Assignment.objects.filter(request=request).exists():
-                logger.warning(f"[AssignCarSerializer][validate] Request {data['request_id']} already has an assignment.")
+            start, end = request_window(vehicle_request)
+            booked = conflicting(vehicle.pk, start, end).first()
+            if booked:
+                logger.warning(f"[AssignCarSerializer][validate] Vehicle {data['vehicle_id']} already booked {booked.start_time} - {booked.end_time}.")
                 raise serializers.ValidationError({
-                    "request_id": "This request already has a vehicle assigned",
-                    "error_code": "already_assigned"
-                })
-            vehicle = Vehicle.objects.get(pk=data['vehicle_id'])
-            if not vehicle.assigned_driver:
-                logger.warning(f"[AssignCarSerializer][validate] Vehicle {data['vehicle_id']} has no assigned driver.")
-                raise serializers.ValidationError({
-                    "vehicle_id": "Vehicle must have an assigned driver",
-                    "error_code": "no_driver_assigned"
+                    "vehicle_id": f"Vehicle is already booked from {booked.start_time} to {booked.end_time}",
+                    "error_code": "booking_conflict"
                 })
+            if data.get('vehicle_version', vehicle.version) != vehicle.version:
+                logger.warning(f"[AssignCarSerializer][validate] Vehicle {data['vehicle_id']} changed since version {data['vehicle_version']}.")
+                raise AssignmentConflict()
+
+            data['vehicle_request'] = vehicle_request
+            data['vehicle'] = vehicle
             return data
+        except (serializers.ValidationError, AssignmentConflict):
+            raise
         except Vehicle_Request.DoesNotExist:
             logger.error(f"[AssignCarSerializer][validate] No vehicle request found with ID {data.get('request_id')}")
             raise serializers.ValidationError({
@@ -120,14 +125,47 @@ class AssignCarSerializer(serializers.ModelSerializer):
                 "vehicle_id": f"No vehicle found with ID {data.get('vehicle_id')}",
                 "error_code": "vehicle_not_found"
             })
+        except DatabaseError as e:
+            # NOWAIT lock not granted: another transaction is assigning this row
+            logger.warning(f"[AssignCarSerializer][validate] Row locked by a concurrent assignment: {e}")
+            raise AssignmentConflict()
         except Exception as e:
             logger.exception(f"[AssignCarSerializer][validate] Unexpected error: {e}")
             raise serializers.ValidationError({
                 "error": f"Unexpected error: {str(e)}",
                 "error_code": "unexpected_error"
             })
-            
-        return data
+
+
+class BulkAssignItemSerializer(serializers.ModelSerializer):
+    """One (request, vehicle) pair in a bulk assignment."""
+    request_id = serializers.IntegerField()
+    vehicle_id = serializers.IntegerField()
+
+    class Meta:
+        model = Vehicle_Assignment
+        fields = [
+            'request_id',
+            'vehicle_id',
+            'estimated_distance',
+            'estimated_duration',
+            'note'
+        ]
+        extra_kwargs = {
+            'estimated_distance': {'required': False},
+            'estimated_duration': {'required': False},
+            'note': {'required': False}
+        }
+
+
+class BulkAssignCarSerializer(serializers.Serializer):
+    """
+    Input for assigning many approved requests at once.
+
+    Only the shape of each item is checked here; the view validates the
+    requests and vehicles themselves with one locked query each.
+    """
+    assignments = BulkAssignItemSerializer(many=True, allow_empty=False, max_length=200)
 
 
 class RejectCarAssignmentSerializer(serializers.ModelSerializer):
@@ -371,6 +409,8 @@ class DeclineAssignmentSerializer(serializers.ModelSerializer):
             assignment.driver_status = Vehicle_Assignment.DriverStatus.DECLINED
             assignment.decline_reason = validated_data['rejection_reason']
             assignment.save()
+            # The vehicle is no longer booked for this request
+            release(assignment)
             # Create declined trip record
             trip = Trips.objects.create(
                 assignment=assignment,
@@ -473,6 +513,10 @@ class CompleteAssignmentSerializer(serializers.ModelSerializer):
             instance.status = Trips.TripStatus.COMPLETED
             instance.end_time = timezone.now()
             instance.save()
+            # Hand back whatever is left of the booked window
+            release(instance.assignment, at=instance.end_time)
+            # Keep the fleet report rollup current
+            VehicleDailyUsage.record_trip(instance)
             logger.info(f"[CompleteAssignmentSerializer][update] Trip {instance.trip_id} completed for assignment {instance.assignment.assignment_id} by driver {instance.assignment.driver_id}.")
             return instance
         except Exception as e:
@@ -482,3 +526,41 @@ class CompleteAssignmentSerializer(serializers.ModelSerializer):
                 "error_code": "unexpected_error"
             })
 
+
+class VehicleMatchSerializer(serializers.Serializer):
+    """
+    Input for ranking available vehicles against approved requests.
+    """
+    request_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        min_length=1,
+        max_length=200,
+        help_text="IDs of APPROVED requests to match"
+    )
+    limit = serializers.IntegerField(
+        default=3,
+        min_value=1,
+        max_value=20,
+        help_text="Number of ranked vehicles returned per request"
+    )
+    category = serializers.ChoiceField(
+        choices=Vehicle.Category.choices,
+        required=False,
+        help_text="Preferred vehicle category; by default pool cars for trips of 4 hours or less, field cars otherwise"
+    )
+
+    def validate_request_ids(self, value):
+        """Load the requests in one query; every ID must be an APPROVED request."""
+        requests = Vehicle_Request.objects.select_related('requester').in_bulk(value)
+        missing = [request_id for request_id in value if request_id not in requests]
+        if missing:
+            raise serializers.ValidationError(f"No vehicle request found with IDs {missing}")
+        not_approved = [
+            request_id for request_id, vehicle_request in requests.items()
+            if vehicle_request.status != Vehicle_Request.Status.APPROVED
+        ]
+        if not_approved:
+            raise serializers.ValidationError(f"Requests must be in APPROVED status: {sorted(not_approved)}")
+        self.context['vehicle_requests'] = list(requests.values())
+        return value
+
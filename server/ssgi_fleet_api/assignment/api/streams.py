@@ -0,0 +1,105 @@
+"""
+Server-sent events stream of a driver's assignment updates.
+
+This is a plain async Django view rather than a DRF APIView, so an ASGI
+server (see ssgi_fleet_api/asgi.py) can hold thousands of idle driver
+connections without tying up a worker thread each; in production it is
+served by the `events` service (see gunicorn.conf.py). Under WSGI
+(runserver, the gthread API workers) each stream holds a thread instead: Django would buffer
+an async iterator completely before sending it, which for an endless
+stream means never. Drivers connect once and only fall back to polling
+DriverRequestView after a reconnect, to catch anything published while
+they were offline.
+"""
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from users.authentication import ClaimsJWTAuthentication
+from users.models import User
+from ..events import driver_channel, get_broker
+
+logger = logging.getLogger(__name__)
+
+# How long the browser waits before reconnecting a dropped stream
+RETRY_MS = 3000
+
+
+def _authenticate(request):
+    """
+    The user behind the request's JWT.
+
+    EventSource cannot send headers, so the access token may also be passed
+    as the `token` query parameter.
+    """
+    auth = ClaimsJWTAuthentication()
+    result = auth.authenticate(request)
+    if result is not None:
+        return result[0]
+    raw_token = request.GET.get('token')
+    if not raw_token:
+        return None
+    return auth.get_user(auth.get_validated_token(raw_token))
+
+
+def _format(event, data, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _opening(driver_id):
+    return f"retry: {RETRY_MS}\n" + _format("ready", {"driver_id": driver_id})
+
+
+def _chunk(message):
+    if message is None:
+        # Comment line; keeps proxies from closing an idle connection
+        return ": keepalive\n\n"
+    return _format(message.get("event", "message"), message, message.get("assignment_id"))
+
+
+async def _stream(driver_id):
+    heartbeat = getattr(settings, 'ASSIGNMENT_EVENTS_HEARTBEAT', 15)
+    async with get_broker().subscribe(driver_channel(driver_id)) as subscription:
+        yield _opening(driver_id)
+        while True:
+            yield _chunk(await subscription.get(timeout=heartbeat))
+
+
+def _blocking_stream(driver_id):
+    heartbeat = getattr(settings, 'ASSIGNMENT_EVENTS_HEARTBEAT', 15)
+    with get_broker().listen(driver_channel(driver_id)) as subscription:
+        yield _opening(driver_id)
+        while True:
+            yield _chunk(subscription.get(timeout=heartbeat))
+
+
+@require_GET
+async def driver_assignment_events(request):
+    """Stream assignment updates for the authenticated driver."""
+    try:
+        user = await sync_to_async(_authenticate)(request)
+    except (AuthenticationFailed, InvalidToken) as e:
+        logger.warning(f"[driver_assignment_events] Authentication failed: {e}")
+        return JsonResponse({"error": "Invalid or expired token.", "error_code": "authentication_failed"}, status=401)
+    if user is None:
+        return JsonResponse({"error": "Authentication credentials were not provided.", "error_code": "not_authenticated"}, status=401)
+    if user.role != User.Role.DRIVER:
+        return JsonResponse({"error": "Only drivers can subscribe to assignment updates.", "error_code": "forbidden"}, status=403)
+
+    stream = _stream(user.id) if isinstance(request, ASGIRequest) else _blocking_stream(user.id)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Tell nginx not to buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,19 +1,24 @@
 from django.urls import path
 from .views import(
     AssignCarAPIView,
+    BulkAssignCarAPIView,
     CarRejectAPIView,
     DriverRequestView,
     AcceptAssignmentAPIView,
     DeclineAssignmentAPIView,
     CompleteAssignmentAPIView,
     DriverCompletedTripsView,
-    AdminAssignmentHistoryAPIView
+    AdminAssignmentHistoryAPIView,
+    VehicleMatchAPIView
 )
+from .streams import driver_assignment_events
 
 urlpatterns = [
     path('assign/', AssignCarAPIView.as_view(), name='assign-vehicle'),
+    path('assign/bulk/', BulkAssignCarAPIView.as_view(), name='bulk-assign-vehicle'),
     path('reject/', CarRejectAPIView.as_view(), name="reject-vehicle"),
     path('driver/requests/',DriverRequestView.as_view() , name="driver-requests"),
+    path('driver/events/', driver_assignment_events, name='driver-assignment-events'),
     path('<int:assignment_id>/accept/' , AcceptAssignmentAPIView.as_view() , name="accept-assigment"),
     path('<int:assignment_id>/decline/',DeclineAssignmentAPIView.as_view(), name = "decline-assignment"),
     path('<int:trip_id>/complete/',
@@ -21,5 +26,6 @@ urlpatterns = [
         name='complete-assignment'
     ),
     path('driver/completed-trips/', DriverCompletedTripsView.as_view(), name='driver-completed-trips'),
-    path('admin/history/', AdminAssignmentHistoryAPIView.as_view(), name='admin-assignment-history')
+    path('admin/history/', AdminAssignmentHistoryAPIView.as_view(), name='admin-assignment-history'),
+    path('match/', VehicleMatchAPIView.as_view(), name='vehicle-match')
 ]
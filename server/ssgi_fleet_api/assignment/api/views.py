@@ -1,32 +1,86 @@
+import logging
+from datetime import datetime, time, timedelta
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db import transaction
+from django.db import OperationalError, transaction
+from django.utils.dateparse import parse_date
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 
 from .serializers import (
     AssignCarSerializer,
+    AssignmentConflict,
+    BulkAssignCarSerializer,
     RejectCarAssignmentSerializer,
     AcceptAssignmentSerializer,
     DeclineAssignmentSerializer,
-    CompleteAssignmentSerializer
+    CompleteAssignmentSerializer,
+    VehicleMatchSerializer
 )
 from .permissions import IsAdminOrSuperAdmin, IsDriver
 from .docs import (
     assign_car_docs,
+    bulk_assign_car_docs,
     reject_car_assignment_docs,
     DRIVER_REQUEST_GET_DOCS,
     ACCEPT_ASSIGNMENT_DOCS,
     DECLINE_ASSIGNMENT_DOCS,
     COMPLETE_ASSIGNMENT_DOCS,
-    admin_assignment_history_docs
+    admin_assignment_history_docs,
+    vehicle_match_docs
 )
-from ..models import Vehicle_Assignment, Trips
+from ..events import publish_assignment
+from ..matching import FleetIndex
+from ..models import Vehicle_Assignment, Trips, VehicleReservation
+from ..reservations import ReservationConflict, ReservationIndex, request_window, reserve
 from request.models import Vehicle_Request
 from vehicles.models import Vehicle
 from users.models import User
+from notifications.outbox import enqueue_email, enqueue_emails
+from ssgi_fleet_api.cache import invalidate
+from ssgi_fleet_api.conditional import conditional_list
+from ssgi_fleet_api.pagination import OptionalEnvelopeCursorPagination
+
+
+logger = logging.getLogger(__name__)
+
+
+def assignment_emails(vehicle_request, vehicle, driver):
+    """(subject, message, recipients) tuples telling the requester and driver about an assignment."""
+    emails = [(
+        "Vehicle Assignment Notification",
+        (
+            f"Dear {vehicle_request.requester.get_full_name()},\n\n"
+            f"Your vehicle request has been assigned.\n"
+            f"Vehicle: {vehicle.make} {vehicle.model} ({vehicle.license_plate})\n"
+            f"Driver: {driver.get_full_name()} ({driver.phone_number})\n\n"
+            f"Pickup: {vehicle_request.pickup_location}\nDestination: {vehicle_request.destination}\n"
+            f"Start: {vehicle_request.start_dateTime}\nEnd: {vehicle_request.end_dateTime}\n"
+            f"Purpose: {vehicle_request.purpose}\n\n"
+            f"Thank you,\nSSGI Fleet Management Team"
+        ),
+        [vehicle_request.requester.email],
+    )]
+    if driver and driver.email:
+        emails.append((
+            "New Vehicle Assignment",
+            (
+                f"Dear {driver.get_full_name()},\n\n"
+                f"You have been assigned to a new vehicle request.\n"
+                f"Requester: {vehicle_request.requester.get_full_name()} ({vehicle_request.requester.phone_number})\n"
+                f"Vehicle: {vehicle.make} {vehicle.model} ({vehicle.license_plate})\n"
+                f"Pickup: {vehicle_request.pickup_location}\nDestination: {vehicle_request.destination}\n"
+                f"Start: {vehicle_request.start_dateTime}\nEnd: {vehicle_request.end_dateTime}\n"
+                f"Purpose: {vehicle_request.purpose}\n\n"
+                f"Please check your dashboard for more details.\n\n"
+                f"Thank you,\nSSGI Fleet Management Team"
+            ),
+            [driver.email],
+        ))
+    return emails
 
 
 class AssignCarAPIView(APIView):
@@ -51,16 +105,26 @@ class AssignCarAPIView(APIView):
             data=request.data,
             context={'request': request}
         )
-        serializer.is_valid(raise_exception=True)
         
         try:
             with transaction.atomic():
-                # Get validated objects
-                vehicle_request = Vehicle_Request.objects.select_related('requester', 'department_approver').get(pk=serializer.validated_data['request_id'])
-                vehicle = Vehicle.objects.select_related('assigned_driver').get(pk=serializer.validated_data['vehicle_id'])
+                # Validation fetches and locks the request and vehicle rows once
+                serializer.is_valid(raise_exception=True)
+                vehicle_request = serializer.validated_data['vehicle_request']
+                vehicle = serializer.validated_data['vehicle']
                 driver = vehicle.assigned_driver
                 
-                # Create the assignment
+                # Claim the vehicle and request with conditional updates, so a
+                # concurrent assignment that slipped past the locks still loses
+                if not Vehicle.objects.claim_for_assignment(vehicle, vehicle.version):
+                    raise AssignmentConflict()
+                if not Vehicle_Request.objects.filter(
+                    pk=vehicle_request.pk,
+                    status=Vehicle_Request.Status.APPROVED
+                ).update(status=Vehicle_Request.Status.ASSIGNED, updated_at=timezone.now()):
+                    raise AssignmentConflict()
+                
+                # Create the assignment (validated against the statuses read above)
                 assignment = Vehicle_Assignment.objects.create(
                     request=vehicle_request,
                     vehicle=vehicle,
@@ -70,64 +134,18 @@ class AssignCarAPIView(APIView):
                     estimated_distance=serializer.validated_data.get('estimated_distance'),
                     estimated_duration=serializer.validated_data.get('estimated_duration')
                 )
-                
-                # Update request status
+                reserve(assignment, *request_window(vehicle_request))
                 vehicle_request.status = Vehicle_Request.Status.ASSIGNED
-                vehicle_request.save()
-                
-                # Update vehicle status
                 vehicle.status = Vehicle.Status.IN_USE
-                vehicle.save()
+                vehicle.version += 1
+                # The queryset update above skips post_save cache invalidation
+                transaction.on_commit(lambda: invalidate('vehicles'))
                 
-                # Send emails to requester and driver after commit
-                from django.db import transaction as dj_transaction
-                def send_assignment_emails():
-                    try:
-                        from django.core.mail import send_mail
-                        # Email to requester
-                        requester_email = vehicle_request.requester.email
-                        requester_subject = "Vehicle Assignment Notification"
-                        requester_message = (
-                            f"Dear {vehicle_request.requester.get_full_name()},\n\n"
-                            f"Your vehicle request has been assigned.\n"
-                            f"Vehicle: {vehicle.make} {vehicle.model} ({vehicle.license_plate})\n"
-                            f"Driver: {driver.get_full_name()} ({driver.phone_number})\n\n"
-                            f"Pickup: {vehicle_request.pickup_location}\nDestination: {vehicle_request.destination}\n"
-                            f"Start: {vehicle_request.start_dateTime}\nEnd: {vehicle_request.end_dateTime}\n"
-                            f"Purpose: {vehicle_request.purpose}\n\n"
-                            f"Thank you,\nSSGI Fleet Management Team"
-                        )
-                        send_mail(
-                            requester_subject,
-                            requester_message,
-                            None,
-                            [requester_email],
-                            fail_silently=False,
-                        )
-                        # Email to driver
-                        if driver and driver.email:
-                            driver_subject = "New Vehicle Assignment"
-                            driver_message = (
-                                f"Dear {driver.get_full_name()},\n\n"
-                                f"You have been assigned to a new vehicle request.\n"
-                                f"Requester: {vehicle_request.requester.get_full_name()} ({vehicle_request.requester.phone_number})\n"
-                                f"Vehicle: {vehicle.make} {vehicle.model} ({vehicle.license_plate})\n"
-                                f"Pickup: {vehicle_request.pickup_location}\nDestination: {vehicle_request.destination}\n"
-                                f"Start: {vehicle_request.start_dateTime}\nEnd: {vehicle_request.end_dateTime}\n"
-                                f"Purpose: {vehicle_request.purpose}\n\n"
-                                f"Please check your dashboard for more details.\n\n"
-                                f"Thank you,\nSSGI Fleet Management Team"
-                            )
-                            send_mail(
-                                driver_subject,
-                                driver_message,
-                                None,
-                                [driver.email],
-                                fail_silently=False,
-                            )
-                    except Exception as email_exc:
-                        print(f"[AssignCarAPIView][send_assignment_emails] Email sending failed: {email_exc}")
-                dj_transaction.on_commit(send_assignment_emails)
+                # Queue emails to requester and driver; they are sent by the
+                # send_queued_emails worker once this transaction commits
+                enqueue_emails(assignment_emails(vehicle_request, vehicle, driver))
+                # Push the assignment to the driver's event stream on commit
+                publish_assignment(assignment)
                 
                 return Response(
                     {
@@ -166,8 +184,20 @@ class AssignCarAPIView(APIView):
                     status=status.HTTP_201_CREATED
                 )
                 
+        except ValidationError:
+            raise
+        except (AssignmentConflict, ReservationConflict, OperationalError) as e:
+            logger.warning(f"[AssignCarAPIView][POST] Conflict: {e}")
+            return Response(
+                {
+                    "error": "Assignment conflict",
+                    "error_code": "assignment_conflict",
+                    "detail": AssignmentConflict.default_detail
+                },
+                status=status.HTTP_409_CONFLICT
+            )
         except (Vehicle_Request.DoesNotExist, Vehicle.DoesNotExist) as e:
-            print(f"[AssignCarAPIView][POST] Not found: {e}")
+            logger.warning(f"[AssignCarAPIView][POST] Not found: {e}")
             return Response(
                 {
                     "error": str(e),
@@ -177,7 +207,7 @@ class AssignCarAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            print(f"[AssignCarAPIView][POST] Assignment failed: {e}")
+            logger.exception(f"[AssignCarAPIView][POST] Assignment failed: {e}")
             return Response(
                 {
                     "error": str(e),
@@ -187,6 +217,166 @@ class AssignCarAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+class BulkAssignCarAPIView(APIView):
+    """
+    API endpoint for admins to assign many approved requests in one call.
+
+    All requests and vehicles are loaded with one locked query each, checked
+    in memory, and the valid pairs are written with bulk_create/bulk_update
+    inside a single transaction. Invalid pairs are reported per item and do
+    not stop the others. Notification emails for the whole batch are queued
+    with one insert.
+
+    Permissions:
+    - User must be authenticated
+    - User must be an admin or superadmin
+    """
+    permission_classes = [IsAuthenticated, IsAdminOrSuperAdmin]
+
+    @bulk_assign_car_docs
+    def post(self, request):
+        serializer = BulkAssignCarSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['assignments']
+
+        try:
+            with transaction.atomic():
+                # Rows another admin is assigning right now are skipped, not waited on
+                vehicle_requests = Vehicle_Request.objects.select_for_update(
+                    skip_locked=True, of=('self',)
+                ).select_related('requester__department').in_bulk(
+                    {item['request_id'] for item in items}
+                )
+                vehicles = Vehicle.objects.select_for_update(
+                    skip_locked=True, of=('self',)
+                ).select_related('assigned_driver').in_bulk(
+                    {item['vehicle_id'] for item in items}
+                )
+                already_assigned = set(
+                    Vehicle_Assignment.objects.filter(
+                        request_id__in=vehicle_requests
+                    ).values_list('request_id', flat=True)
+                )
+                reservations = ReservationIndex.load(list(vehicles))
+
+                results = []
+                to_create = []
+                used_requests = set()
+                used_vehicles = set()
+                for index, item in enumerate(items):
+                    vehicle_request = vehicle_requests.get(item['request_id'])
+                    vehicle = vehicles.get(item['vehicle_id'])
+                    error = self._check(
+                        item, vehicle_request, vehicle, already_assigned, used_requests, used_vehicles, reservations
+                    )
+                    result = {
+                        "index": index,
+                        "request_id": item['request_id'],
+                        "vehicle_id": item['vehicle_id'],
+                    }
+                    if error:
+                        result.update(status="failed", error=error[1], error_code=error[0])
+                        results.append(result)
+                        continue
+                    used_requests.add(vehicle_request.pk)
+                    used_vehicles.add(vehicle.pk)
+                    reservations.book(vehicle.pk, *request_window(vehicle_request))
+                    to_create.append((result, Vehicle_Assignment(
+                        request=vehicle_request,
+                        vehicle=vehicle,
+                        driver=vehicle.assigned_driver,
+                        assigned_by=request.user,
+                        note=item.get('note', ''),
+                        estimated_distance=item.get('estimated_distance'),
+                        estimated_duration=item.get('estimated_duration')
+                    )))
+                    results.append(result)
+
+                if to_create:
+                    created = Vehicle_Assignment.objects.bulk_create(
+                        [assignment for _, assignment in to_create]
+                    )
+                    now = timezone.now()
+                    assigned_requests = []
+                    assigned_vehicles = []
+                    emails = []
+                    booked = []
+                    for (result, _), assignment in zip(to_create, created):
+                        start, end = request_window(assignment.request)
+                        booked.append(VehicleReservation(
+                            vehicle=assignment.vehicle, assignment=assignment, start_time=start, end_time=end
+                        ))
+                        assignment.request.status = Vehicle_Request.Status.ASSIGNED
+                        assignment.request.updated_at = now
+                        assignment.vehicle.status = Vehicle.Status.IN_USE
+                        assignment.vehicle.version += 1
+                        assignment.vehicle.updated_at = now
+                        assigned_requests.append(assignment.request)
+                        assigned_vehicles.append(assignment.vehicle)
+                        emails.extend(assignment_emails(assignment.request, assignment.vehicle, assignment.driver))
+                        publish_assignment(assignment)
+                        result.update(
+                            status="assigned",
+                            assignment_id=assignment.assignment_id,
+                            license_plate=assignment.vehicle.license_plate,
+                            driver=assignment.driver.get_full_name()
+                        )
+                    Vehicle_Request.objects.bulk_update(assigned_requests, ['status', 'updated_at'])
+                    Vehicle.objects.bulk_update(assigned_vehicles, ['status', 'version', 'updated_at'])
+                    VehicleReservation.objects.bulk_create(booked)
+                    enqueue_emails(emails)
+                    # Bulk writes skip post_save cache invalidation
+                    transaction.on_commit(lambda: invalidate('vehicles'))
+
+            assigned = len(to_create)
+            failed = len(items) - assigned
+            if not failed:
+                response_status = status.HTTP_201_CREATED
+            elif assigned:
+                response_status = status.HTTP_207_MULTI_STATUS
+            else:
+                response_status = status.HTTP_400_BAD_REQUEST
+            return Response(
+                {
+                    "assigned": assigned,
+                    "failed": failed,
+                    "results": results
+                },
+                status=response_status
+            )
+        except Exception as e:
+            logger.exception(f"[BulkAssignCarAPIView][POST] Bulk assignment failed: {e}")
+            return Response(
+                {
+                    "error": str(e),
+                    "error_code": "assignment_failed",
+                    "details": "Failed to create the assignments. No assignment was saved."
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    @staticmethod
+    def _check(item, vehicle_request, vehicle, already_assigned, used_requests, used_vehicles, reservations):
+        """Return (error_code, message) if the pair cannot be assigned, else None."""
+        if vehicle_request is None:
+            return ("request_not_found", f"No vehicle request found with ID {item['request_id']}, or it is being assigned by another admin")
+        if vehicle_request.status != Vehicle_Request.Status.APPROVED:
+            return ("request_not_approved", f"Request must be in APPROVED status. Current status: {vehicle_request.status}")
+        if vehicle_request.pk in already_assigned or vehicle_request.pk in used_requests:
+            return ("already_assigned", "This request already has a vehicle assigned")
+        if vehicle is None:
+            return ("vehicle_not_found", f"No vehicle found with ID {item['vehicle_id']}, or it is being assigned by another admin")
+        if vehicle.pk in used_vehicles:
+            return ("vehicle_used_in_batch", "This vehicle is already assigned earlier in this batch")
+        if vehicle.status != Vehicle.Status.AVAILABLE:
+            return ("vehicle_not_available", f"Vehicle must be AVAILABLE. Current status: {vehicle.get_status_display()}")
+        if not vehicle.assigned_driver:
+            return ("no_driver_assigned", "Vehicle must have an assigned driver")
+        if not reservations.is_free(vehicle.pk, *request_window(vehicle_request)):
+            return ("booking_conflict", "Vehicle is already booked for an overlapping time")
+        return None
+
+
 class CarRejectAPIView(APIView):
     """
     API endpoint for admins to reject vehicle requests.
@@ -217,30 +407,18 @@ class CarRejectAPIView(APIView):
                 vehicle_request.status = Vehicle_Request.Status.REJECTED
                 vehicle_request.save()
                 
-                # Send rejection email to requester after commit
-                from django.db import transaction as dj_transaction
-                def send_rejection_email():
-                    try:
-                        from django.core.mail import send_mail
-                        requester_email = vehicle_request.requester.email
-                        subject = "Vehicle Request Rejected"
-                        message = (
-                            f"Dear {vehicle_request.requester.get_full_name()},\n\n"
-                            f"Your vehicle request has been rejected.\n"
-                            f"Reason: {serializer.validated_data.get('note', 'No reason provided.')}\n\n"
-                            f"If you have questions, please contact your administrator.\n\n"
-                            f"Thank you,\nSSGI Fleet Management Team"
-                        )
-                        send_mail(
-                            subject,
-                            message,
-                            None,
-                            [requester_email],
-                            fail_silently=False,
-                        )
-                    except Exception as email_exc:
-                        print(f"[CarRejectAPIView][send_rejection_email] Email sending failed: {email_exc}")
-                dj_transaction.on_commit(send_rejection_email)
+                # Queue the rejection email to the requester
+                enqueue_email(
+                    "Vehicle Request Rejected",
+                    (
+                        f"Dear {vehicle_request.requester.get_full_name()},\n\n"
+                        f"Your vehicle request has been rejected.\n"
+                        f"Reason: {serializer.validated_data.get('note', 'No reason provided.')}\n\n"
+                        f"If you have questions, please contact your administrator.\n\n"
+                        f"Thank you,\nSSGI Fleet Management Team"
+                    ),
+                    [vehicle_request.requester.email],
+                )
                 
                 return Response({
                     "status": "rejected",
@@ -252,7 +430,7 @@ class CarRejectAPIView(APIView):
                 }, status=status.HTTP_200_OK)
                 
         except Vehicle_Request.DoesNotExist:
-            print("[CarRejectAPIView][POST] Request not found.")
+            logger.warning("[CarRejectAPIView][POST] Request not found.")
             return Response(
                 {
                     'error': 'The requested vehicle request does not exist.',
@@ -261,7 +439,7 @@ class CarRejectAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         except Exception as e:
-            print(f"[CarRejectAPIView][POST] Rejection failed: {e}")
+            logger.exception(f"[CarRejectAPIView][POST] Rejection failed: {e}")
             return Response(
                 {
                     "error": str(e),
@@ -688,6 +866,13 @@ class DriverCompletedTripsView(APIView):
     """
     permission_classes = [IsAuthenticated, IsDriver]
     
+    @conditional_list(
+        lambda view, request: Trips.objects.filter(
+            assignment__driver=request.user,
+            status=Trips.TripStatus.COMPLETED
+        ),
+        namespaces=('vehicles', 'users')
+    )
     def get(self, request):
         """Get all completed trips for the current driver."""
         try:
@@ -751,11 +936,17 @@ class DriverCompletedTripsView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class AdminAssignmentHistoryPagination(OptionalEnvelopeCursorPagination):
+    ordering = ('-end_time', '-trip_id')
+    results_key = 'history'
+
+
 class AdminAssignmentHistoryAPIView(APIView):
     """
-    Returns a list of all completed assignments (trips) for admin dashboard history table.
+    Returns completed assignments (trips) for admin dashboard history table, newest first.
     Each row includes: assigned date, requester, vehicle, driver, approver, completed trip pickup, destination, and total km.
     Department is omitted as requested.
+    Results are cursor-paginated when `cursor` or `page_size` is given, and can be filtered by completion date range, vehicle, driver and requester department.
     """
     permission_classes = [IsAuthenticated]
     @admin_assignment_history_docs
@@ -764,21 +955,58 @@ class AdminAssignmentHistoryAPIView(APIView):
         if not (request.user.role in [User.Role.ADMIN, User.Role.SUPERADMIN]):
             return Response({'detail': 'Not authorized.'}, status=403)
 
-        # Get all completed assignments (trips)
+        # Completed assignments (trips), projected to the columns the table shows
         completed_trips = Trips.objects.filter(
-            status=Trips.TripStatus.COMPLETED
+            status=Trips.TripStatus.COMPLETED,
+            end_time__isnull=False
         ).select_related(
             'assignment',
             'assignment__vehicle',
             'assignment__driver',
-            'assignment__assigned_by',
             'assignment__request',
             'assignment__request__requester',
             'assignment__request__department_approver',
-        ).order_by('-end_time')
+        ).only(
+            'trip_id', 'start_mileage', 'end_mileage', 'end_time',
+            'assignment__assigned_at',
+            'assignment__vehicle__make', 'assignment__vehicle__model', 'assignment__vehicle__license_plate',
+            'assignment__driver__first_name', 'assignment__driver__last_name',
+            'assignment__request__pickup_location', 'assignment__request__destination',
+            'assignment__request__requester__first_name', 'assignment__request__requester__last_name',
+            'assignment__request__department_approver__first_name',
+            'assignment__request__department_approver__last_name',
+        )
+
+        params = request.query_params
+        start = parse_date(params['start']) if params.get('start') else None
+        end = parse_date(params['end']) if params.get('end') else None
+        if (params.get('start') and not start) or (params.get('end') and not end):
+            return Response({'detail': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
+        # Compare end_time itself (not its date) so trips_status_end_time_idx serves the range
+        if start:
+            completed_trips = completed_trips.filter(end_time__gte=timezone.make_aware(datetime.combine(start, time.min)))
+        if end:
+            completed_trips = completed_trips.filter(
+                end_time__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+            )
+        for param, lookup in (
+            ('vehicle', 'assignment__vehicle_id'),
+            ('driver', 'assignment__driver_id'),
+            ('department', 'assignment__request__requester__department_id'),
+        ):
+            if value := params.get(param):
+                if not value.isdigit():
+                    return Response({'detail': f"'{param}' must be an integer id."}, status=400)
+                completed_trips = completed_trips.filter(**{lookup: value})
+
+        paginator = AdminAssignmentHistoryPagination()
+        page = paginator.paginate_queryset(completed_trips, request, view=self)
+
+        if page is None:
+            page = completed_trips.order_by(*paginator.ordering)
 
         data = []
-        for trip in completed_trips:
+        for trip in page:
             assignment = trip.assignment
             request_obj = assignment.request
             data.append({
@@ -791,4 +1019,40 @@ class AdminAssignmentHistoryAPIView(APIView):
                 'destination': request_obj.destination,
                 'total_km': float(trip.end_mileage - trip.start_mileage) if trip.end_mileage is not None and trip.start_mileage is not None else None,
             })
-        return Response({'history': data})
\ No newline at end of file
+        if paginator.is_requested(request):
+            return paginator.get_paginated_response(data)
+        return Response({'history': data})
+
+
+class VehicleMatchAPIView(APIView):
+    """
+    Rank available vehicles for a batch of approved requests.
+
+    The fleet is loaded once into a FleetIndex and every request is scored
+    in memory, so matching a whole queue costs a fixed handful of queries.
+    """
+    permission_classes = [IsAuthenticated, IsAdminOrSuperAdmin]
+
+    @vehicle_match_docs
+    def post(self, request):
+        serializer = VehicleMatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            index = FleetIndex.load()
+            matches = index.match_batch(
+                serializer.context['vehicle_requests'],
+                limit=serializer.validated_data['limit'],
+                category=serializer.validated_data.get('category')
+            )
+            return Response({"matches": matches}, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.exception(f"[VehicleMatchAPIView][POST] Matching failed: {e}")
+            return Response(
+                {
+                    "error": str(e),
+                    "error_code": "matching_failed",
+                    "details": "Failed to rank vehicles. Please try again."
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
@@ -0,0 +1,226 @@
+"""
+Push channel for driver assignment updates.
+
+Every driver listens on their own channel ("driver:<id>") through the
+server-sent events endpoint in assignment/api/streams.py. Assignment views
+publish to it once their transaction has committed, so a driver hears about
+a new assignment immediately instead of polling DriverRequestView.
+
+The broker behind the channels is pluggable:
+
+- InProcessBroker keeps subscribers in memory. Publishing only reaches
+  streams served by the same process, so it suits development, tests and
+  single-process deployments; gunicorn.conf.py refuses to start more than
+  one worker with it.
+- RedisBroker uses Redis pub/sub, so every web worker sees every message.
+  It is the default when REDIS_URL is set.
+
+Streams served by ASGI use the async subscribe(); under WSGI each stream
+holds a thread and uses the blocking listen(). ASSIGNMENT_EVENTS_BROKER may
+name any class with the same publish(), subscribe() and listen() methods.
+"""
+import asyncio
+import json
+import logging
+import queue
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+
+def driver_channel(driver_id):
+    return f"driver:{driver_id}"
+
+
+class InProcessBroker:
+    """Fan messages out to the queues of the subscribers in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def publish(self, channel, message):
+        """Deliver a message to every current subscriber; safe to call from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, messages in subscribers:
+            if loop is None:
+                messages.put_nowait(message)
+            else:
+                loop.call_soon_threadsafe(messages.put_nowait, message)
+        return len(subscribers)
+
+    @contextmanager
+    def _subscriber(self, channel, subscriber):
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscriber)
+        try:
+            yield
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(channel, set())
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    self._subscribers.pop(channel, None)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        messages = asyncio.Queue()
+        with self._subscriber(channel, (asyncio.get_running_loop(), messages)):
+            yield _QueueSubscription(messages)
+
+    @contextmanager
+    def listen(self, channel):
+        messages = queue.Queue()
+        with self._subscriber(channel, (None, messages)):
+            yield _BlockingQueueSubscription(messages)
+
+
+class _QueueSubscription:
+
+    def __init__(self, queue):
+        self._queue = queue
+
+    async def get(self, timeout):
+        """The next message, or None if none arrives within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class _BlockingQueueSubscription:
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    def get(self, timeout):
+        """The next message, or None if none arrives within `timeout` seconds."""
+        try:
+            return self._messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class RedisBroker:
+    """Redis pub/sub, shared by every process connected to the same server."""
+
+    def __init__(self, url=None):
+        import redis
+        import redis.asyncio
+
+        self.url = url or settings.REDIS_URL
+        self._client = redis.Redis.from_url(self.url)
+        self._async_client = redis.asyncio.Redis.from_url(self.url)
+
+    def publish(self, channel, message):
+        return self._client.publish(channel, json.dumps(message, default=str))
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        pubsub = self._async_client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(channel)
+        try:
+            yield _RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+
+    @contextmanager
+    def listen(self, channel):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel)
+        try:
+            yield _BlockingRedisSubscription(pubsub)
+        finally:
+            pubsub.unsubscribe(channel)
+            pubsub.close()
+
+
+class _RedisSubscription:
+
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    async def get(self, timeout):
+        message = await self._pubsub.get_message(timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message['data'])
+
+
+class _BlockingRedisSubscription:
+
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    def get(self, timeout):
+        message = self._pubsub.get_message(timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message['data'])
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The process-wide broker, built from settings on first use."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            path = getattr(settings, 'ASSIGNMENT_EVENTS_BROKER', None)
+            if path:
+                _broker = import_string(path)()
+            elif getattr(settings, 'REDIS_URL', None):
+                _broker = RedisBroker()
+            else:
+                _broker = InProcessBroker()
+        return _broker
+
+
+def reset_broker():
+    """Forget the current broker, so the next get_broker() reads the settings again."""
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+def _publish(channel, message):
+    try:
+        get_broker().publish(channel, message)
+    except Exception as e:
+        # Drivers still see the assignment on their next fallback poll
+        logger.exception(f"[events][publish] Failed to publish to {channel}: {e}")
+
+
+def assignment_event(assignment, event):
+    """The message sent to a driver about one of their assignments."""
+    vehicle_request = assignment.request
+    return {
+        "event": event,
+        "assignment_id": assignment.assignment_id,
+        "request_id": vehicle_request.request_id,
+        "pickup": vehicle_request.pickup_location,
+        "destination": vehicle_request.destination,
+        "start_time": vehicle_request.start_dateTime.isoformat() if vehicle_request.start_dateTime else None,
+        "vehicle": {
+            "id": assignment.vehicle.id,
+            "license_plate": assignment.vehicle.license_plate,
+        },
+        "assignment_status": assignment.get_driver_status_display(),
+    }
+
+
+def publish_assignment(assignment, event="assignment.created"):
+    """Notify the assignment's driver once the current transaction commits."""
+    message = assignment_event(assignment, event)
+    channel = driver_channel(assignment.driver_id)
+    transaction.on_commit(lambda: _publish(channel, message))
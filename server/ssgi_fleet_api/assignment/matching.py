@@ -0,0 +1,173 @@
+"""
+Vehicle matching for approved requests.
+
+FleetIndex loads the available fleet and its reservations once (two
+queries) and then ranks vehicles for any number of requests in memory.
+Vehicles are kept sorted by capacity so the capacity filter is a bisect,
+and reservations sit in a per-vehicle interval tree so time conflicts are
+checked without touching the database.
+
+Scores are a weighted sum of normalised criteria (see WEIGHTS); each match
+carries its per-criterion breakdown so admins can see why a vehicle ranks
+where it does.
+"""
+from bisect import bisect_left
+from datetime import timedelta
+
+from django.db.models import F
+
+from request.models import Vehicle_Request
+from vehicles.models import Vehicle
+from .reservations import ReservationIndex, request_window
+
+WEIGHTS = {
+    "capacity": 30,
+    "category": 20,
+    "department": 20,
+    "fuel_efficiency": 15,
+    "service_headroom": 15,
+}
+
+# Trips up to this long are best served by pool cars, longer ones by field cars
+POOL_TRIP_MAX = timedelta(hours=4)
+# Kilometres left before service at which a vehicle gets the full headroom score
+SERVICE_HEADROOM_KM = 1000
+
+URGENCY_ORDER = {
+    Vehicle_Request.Urgency.EMERGENCY: 0,
+    Vehicle_Request.Urgency.PRIORITY: 1,
+    Vehicle_Request.Urgency.REGULAR: 2,
+}
+
+
+def preferred_category(vehicle_request):
+    start, end = request_window(vehicle_request)
+    return Vehicle.Category.POOL if end - start <= POOL_TRIP_MAX else Vehicle.Category.FIELD
+
+
+class FleetVehicle:
+    """The fields of an available vehicle that matching needs."""
+
+    __slots__ = (
+        "id", "license_plate", "make", "model", "category", "capacity",
+        "department_id", "department_name", "fuel_efficiency",
+        "current_mileage", "next_service_mileage",
+    )
+
+    def __init__(self, row):
+        for field in self.__slots__:
+            setattr(self, field, row[field])
+
+    def service_headroom(self):
+        if self.next_service_mileage is None:
+            return None
+        return self.next_service_mileage - self.current_mileage
+
+
+class FleetIndex:
+    """
+    In-memory index of the available fleet.
+
+    Build it once per matching run; rank() and match_batch() do not query
+    the database.
+    """
+
+    def __init__(self, vehicles, reservations=None):
+        self.vehicles = sorted(vehicles, key=lambda vehicle: vehicle.capacity)
+        self.reservations = reservations or ReservationIndex()
+        self.capacities = [vehicle.capacity for vehicle in self.vehicles]
+        self.by_id = {vehicle.id: vehicle for vehicle in self.vehicles}
+        self.max_fuel_efficiency = max(
+            (vehicle.fuel_efficiency for vehicle in self.vehicles), default=0
+        ) or 1
+
+    @classmethod
+    def load(cls):
+        """Build the index from the database with two queries."""
+        rows = Vehicle.objects.filter(
+            status=Vehicle.Status.AVAILABLE,
+            assigned_driver__isnull=False
+        ).values(
+            "id", "license_plate", "make", "model", "category", "capacity",
+            "department_id", "fuel_efficiency", "current_mileage",
+            "next_service_mileage", department_name=F("department__name"),
+        )
+        vehicles = [FleetVehicle(row) for row in rows]
+        return cls(vehicles, ReservationIndex.load([vehicle.id for vehicle in vehicles]))
+
+    def candidates(self, passengers):
+        """Vehicles with room for the passengers, found by bisecting the capacity order."""
+        return self.vehicles[bisect_left(self.capacities, passengers):]
+
+    def score(self, vehicle, vehicle_request, category, department_id):
+        passengers = vehicle_request.passenger_count
+        headroom = vehicle.service_headroom()
+        if department_id and vehicle.department_id == department_id:
+            department_fit = 1.0
+        elif vehicle.department_id is None:
+            department_fit = 0.5
+        else:
+            department_fit = 0.0
+        breakdown = {
+            "capacity": 1 - (vehicle.capacity - passengers) / vehicle.capacity,
+            "category": 1.0 if vehicle.category == category else 0.0,
+            "department": department_fit,
+            "fuel_efficiency": vehicle.fuel_efficiency / self.max_fuel_efficiency,
+            "service_headroom": 0.5 if headroom is None else max(0.0, min(headroom / SERVICE_HEADROOM_KM, 1.0)),
+        }
+        total = sum(WEIGHTS[criterion] * value for criterion, value in breakdown.items())
+        return round(total, 2), {criterion: round(value, 3) for criterion, value in breakdown.items()}
+
+    def rank(self, vehicle_request, limit=3, category=None):
+        """Best free vehicles for a request, highest score first."""
+        start, end = request_window(vehicle_request)
+        category = category or preferred_category(vehicle_request)
+        department_id = vehicle_request.requester.department_id
+        ranked = []
+        for vehicle in self.candidates(vehicle_request.passenger_count):
+            if not self.reservations.is_free(vehicle.id, start, end):
+                continue
+            total, breakdown = self.score(vehicle, vehicle_request, category, department_id)
+            ranked.append((total, vehicle, breakdown))
+        ranked.sort(key=lambda item: (-item[0], item[1].id))
+        return [
+            {
+                "vehicle_id": vehicle.id,
+                "license_plate": vehicle.license_plate,
+                "make_model": f"{vehicle.make} {vehicle.model}",
+                "category": vehicle.category,
+                "capacity": vehicle.capacity,
+                "department": vehicle.department_name,
+                "score": total,
+                "breakdown": breakdown,
+            }
+            for total, vehicle, breakdown in ranked[:limit]
+        ]
+
+    def book(self, vehicle_id, vehicle_request):
+        self.reservations.book(vehicle_id, *request_window(vehicle_request), vehicle_request.request_id)
+
+    def match_batch(self, vehicle_requests, limit=3, category=None):
+        """
+        Rank vehicles for several requests, most urgent and earliest first.
+
+        Each request's top vehicle is provisionally booked for its window, so
+        later requests in the batch are never offered a vehicle that an
+        earlier one was given for an overlapping time.
+        """
+        ordered = sorted(
+            vehicle_requests,
+            key=lambda r: (URGENCY_ORDER.get(r.urgency, len(URGENCY_ORDER)), request_window(r)[0], r.request_id)
+        )
+        matches = []
+        for vehicle_request in ordered:
+            candidates = self.rank(vehicle_request, limit=limit, category=category)
+            suggested = candidates[0]["vehicle_id"] if candidates else None
+            if suggested is not None:
+                self.book(suggested, vehicle_request)
+            matches.append({
+                "request_id": vehicle_request.request_id,
+                "suggested_vehicle_id": suggested,
+                "candidates": candidates,
+            })
+        return matches
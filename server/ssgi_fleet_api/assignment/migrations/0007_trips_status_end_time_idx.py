@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-17 23:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignment', '0006_alter_trips_options_alter_trips_assignment_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trips',
+            index=models.Index(fields=['status', '-end_time', '-trip_id'], name='trips_status_end_time_idx'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2 on 2026-10-17 23:57
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    """Forbid overlapping reservations of one vehicle (PostgreSQL only)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        'ALTER TABLE assignment_vehiclereservation '
+        'ADD CONSTRAINT reservation_no_overlap EXCLUDE USING gist '
+        "(vehicle_id WITH =, tstzrange(start_time, end_time, '[)') WITH &&)"
+    )
+
+
+def drop_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'ALTER TABLE assignment_vehiclereservation DROP CONSTRAINT IF EXISTS reservation_no_overlap'
+    )
+
+
+def reserve_open_assignments(apps, schema_editor):
+    """Give pending and accepted assignments a reservation for their request window."""
+    Vehicle_Assignment = apps.get_model('assignment', 'Vehicle_Assignment')
+    VehicleReservation = apps.get_model('assignment', 'VehicleReservation')
+    booked = {}
+    reservations = []
+    open_assignments = Vehicle_Assignment.objects.filter(
+        driver_status__in=['Pending', 'Accepted']
+    ).select_related('request').order_by('assigned_at')
+    for assignment in open_assignments.iterator():
+        start = assignment.request.start_dateTime or assignment.assigned_at
+        end = assignment.request.end_dateTime or start + timedelta(hours=4)
+        if end <= start:
+            continue
+        windows = booked.setdefault(assignment.vehicle_id, [])
+        # Legacy double bookings keep only the earliest assignment's window
+        if any(start < other_end and end > other_start for other_start, other_end in windows):
+            continue
+        windows.append((start, end))
+        reservations.append(VehicleReservation(
+            vehicle_id=assignment.vehicle_id,
+            assignment_id=assignment.pk,
+            start_time=start,
+            end_time=end,
+        ))
+    VehicleReservation.objects.bulk_create(reservations, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignment', '0007_trips_status_end_time_idx'),
+        ('vehicles', '0007_vehicle_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VehicleReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.DateTimeField(help_text='Start of the reserved window')),
+                ('end_time', models.DateTimeField(help_text='End of the reserved window (exclusive)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('assignment', models.OneToOneField(help_text='The assignment holding the reservation', on_delete=django.db.models.deletion.CASCADE, related_name='reservation', to='assignment.vehicle_assignment')),
+                ('vehicle', models.ForeignKey(help_text='The reserved vehicle', on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='vehicles.vehicle')),
+            ],
+            options={
+                'verbose_name': 'Vehicle Reservation',
+                'verbose_name_plural': 'Vehicle Reservations',
+                'ordering': ['start_time'],
+                'indexes': [models.Index(fields=['vehicle', 'start_time', 'end_time'], name='reservation_vehicle_window_idx'), models.Index(fields=['end_time'], name='reservation_end_time_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('end_time__gt', models.F('start_time'))), name='reservation_end_after_start')],
+            },
+        ),
+        migrations.RunPython(reserve_open_assignments, migrations.RunPython.noop),
+        migrations.RunPython(add_exclusion_constraint, drop_exclusion_constraint),
+    ]
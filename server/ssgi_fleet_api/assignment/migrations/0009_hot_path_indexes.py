@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 00:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignment', '0008_vehiclereservation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trips',
+            index=models.Index(fields=['status', 'start_time'], name='trips_status_start_time_idx'),
+        ),
+    ]
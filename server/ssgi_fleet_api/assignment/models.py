@@ -209,8 +209,57 @@ class Trips(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status']),
-            models.Index(fields=['assignment', 'status'])
+            models.Index(fields=['assignment', 'status']),
+            # Admin history pages walk completed trips newest first
+            models.Index(fields=['status', '-end_time', '-trip_id'], name='trips_status_end_time_idx'),
+            # Usage rollup rebuilds select completed trips by start time
+            models.Index(fields=['status', 'start_time'], name='trips_status_start_time_idx'),
         ]
 
 
 
+class VehicleReservation(models.Model):
+    """
+    The time window a vehicle is booked for by an assignment.
+
+    Two reservations for the same vehicle may not overlap. On PostgreSQL this
+    is enforced by a GiST exclusion constraint over (vehicle, time range),
+    added in migration 0008; other databases rely on the checks in
+    assignment.reservations. Windows are half-open: a booking ending at 10:00
+    does not clash with one starting at 10:00.
+    """
+    vehicle = models.ForeignKey(
+        Vehicle,
+        on_delete=models.CASCADE,
+        related_name='reservations',
+        help_text="The reserved vehicle"
+    )
+    assignment = models.OneToOneField(
+        Vehicle_Assignment,
+        on_delete=models.CASCADE,
+        related_name='reservation',
+        help_text="The assignment holding the reservation"
+    )
+    start_time = models.DateTimeField(help_text="Start of the reserved window")
+    end_time = models.DateTimeField(help_text="End of the reserved window (exclusive)")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.vehicle} reserved {self.start_time} - {self.end_time}"
+
+    class Meta:
+        verbose_name = 'Vehicle Reservation'
+        verbose_name_plural = 'Vehicle Reservations'
+        ordering = ['start_time']
+        indexes = [
+            # Overlap lookups for one vehicle: vehicle = X AND start_time < end
+            models.Index(fields=['vehicle', 'start_time', 'end_time'], name='reservation_vehicle_window_idx'),
+            # Fleet-wide lookups of reservations still in the future
+            models.Index(fields=['end_time'], name='reservation_end_time_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_time__gt=models.F('start_time')),
+                name='reservation_end_after_start'
+            ),
+        ]
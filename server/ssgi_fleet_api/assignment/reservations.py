@@ -0,0 +1,218 @@
+"""
+Vehicle reservations: who has a vehicle booked, and when.
+
+Every assignment holds a VehicleReservation for its request's time window.
+Single lookups ("does this booking clash?", "which vehicles are free
+between X and Y?") are answered by the database through the
+(vehicle, start_time, end_time) index; on PostgreSQL the GiST exclusion
+constraint also rejects overlapping rows outright, even under races.
+
+Databases without exclusion constraints (SQLite in the tests) get an
+explicit overlap check before the insert instead.
+
+When many windows are checked against one snapshot (bulk assignment, the
+matching engine) the reservations are loaded once into an IntervalTree per
+vehicle and queried in memory.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from ssgi_fleet_api.cache import invalidate
+from .models import VehicleReservation
+
+# Requests without an end time are assumed to last this long
+DEFAULT_TRIP_DURATION = timedelta(hours=4)
+
+
+class ReservationConflict(Exception):
+    """The vehicle is already reserved for an overlapping window."""
+
+    def __init__(self, vehicle_id, start, end):
+        self.vehicle_id = vehicle_id
+        self.start = start
+        self.end = end
+        super().__init__(f"Vehicle {vehicle_id} is already booked between {start} and {end}")
+
+
+def request_window(vehicle_request):
+    """The (start, end) a request occupies a vehicle for."""
+    start = vehicle_request.start_dateTime or timezone.now()
+    end = vehicle_request.end_dateTime or start + DEFAULT_TRIP_DURATION
+    return start, end
+
+
+class _Node:
+    __slots__ = ("start", "end", "payload", "max_end", "left", "right")
+
+    def __init__(self, start, end, payload):
+        self.start = start
+        self.end = end
+        self.payload = payload
+        self.max_end = end
+        self.left = None
+        self.right = None
+
+
+class IntervalTree:
+    """
+    Augmented binary search tree of half-open [start, end) intervals.
+
+    Nodes are ordered by start and carry the largest end in their subtree,
+    so overlap queries skip every subtree that ends before the window.
+    The tree is built balanced from sorted input; insert() keeps it usable
+    for the handful of provisional bookings made during one batch.
+    """
+
+    def __init__(self, intervals=()):
+        self.size = 0
+        self.root = self._build(sorted(intervals, key=lambda interval: interval[0]))
+
+    def _build(self, intervals):
+        if not intervals:
+            return None
+        middle = len(intervals) // 2
+        node = _Node(*intervals[middle])
+        node.left = self._build(intervals[:middle])
+        node.right = self._build(intervals[middle + 1:])
+        for child in (node.left, node.right):
+            if child is not None and child.max_end > node.max_end:
+                node.max_end = child.max_end
+        self.size += 1
+        return node
+
+    def __len__(self):
+        return self.size
+
+    def insert(self, start, end, payload=None):
+        new = _Node(start, end, payload)
+        self.size += 1
+        if self.root is None:
+            self.root = new
+            return
+        node = self.root
+        while True:
+            if end > node.max_end:
+                node.max_end = end
+            side = "left" if start < node.start else "right"
+            child = getattr(node, side)
+            if child is None:
+                setattr(node, side, new)
+                return
+            node = child
+
+    def overlapping(self, start, end):
+        """Payloads of every interval overlapping [start, end)."""
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end <= start:
+                continue
+            stack.append(node.left)
+            if node.start < end:
+                if node.end > start:
+                    found.append(node.payload)
+                stack.append(node.right)
+        return found
+
+    def overlaps(self, start, end):
+        return bool(self.overlapping(start, end))
+
+
+class ReservationIndex:
+    """
+    In-memory reservations for a set of vehicles: one IntervalTree each.
+
+    load() reads every reservation ending after `since` with one indexed
+    query; is_free() and book() then run without touching the database.
+    """
+
+    def __init__(self, reservations=()):
+        by_vehicle = {}
+        for vehicle_id, start, end, payload in reservations:
+            by_vehicle.setdefault(vehicle_id, []).append((start, end, payload))
+        self.trees = {vehicle_id: IntervalTree(rows) for vehicle_id, rows in by_vehicle.items()}
+
+    @classmethod
+    def load(cls, vehicle_ids=None, since=None):
+        queryset = VehicleReservation.objects.filter(end_time__gt=since or timezone.now())
+        if vehicle_ids is not None:
+            queryset = queryset.filter(vehicle_id__in=vehicle_ids)
+        return cls(queryset.values_list('vehicle_id', 'start_time', 'end_time', 'assignment_id'))
+
+    def is_free(self, vehicle_id, start, end):
+        tree = self.trees.get(vehicle_id)
+        return tree is None or not tree.overlaps(start, end)
+
+    def book(self, vehicle_id, start, end, payload=None):
+        self.trees.setdefault(vehicle_id, IntervalTree()).insert(start, end, payload)
+
+
+def conflicting(vehicle_id, start, end):
+    """Reservations of a vehicle overlapping [start, end), via the vehicle/window index."""
+    return VehicleReservation.objects.filter(
+        vehicle_id=vehicle_id,
+        start_time__lt=end,
+        end_time__gt=start
+    )
+
+
+def free_vehicles(queryset, start, end):
+    """Narrow a Vehicle queryset to vehicles with no reservation overlapping [start, end)."""
+    return queryset.exclude(
+        Exists(VehicleReservation.objects.filter(
+            vehicle=OuterRef('pk'),
+            start_time__lt=end,
+            end_time__gt=start
+        ))
+    )
+
+
+def _has_exclusion_constraint():
+    return connection.vendor == 'postgresql'
+
+
+def reserve(assignment, start, end):
+    """
+    Reserve the assignment's vehicle for [start, end).
+
+    Raises ReservationConflict if the vehicle is already booked for an
+    overlapping window. Call inside the transaction that creates the
+    assignment, with the vehicle row locked.
+    """
+    # Without an exclusion constraint, check first; the locked vehicle row
+    # keeps a concurrent booking from slipping in between
+    if not _has_exclusion_constraint() and conflicting(assignment.vehicle_id, start, end).exists():
+        raise ReservationConflict(assignment.vehicle_id, start, end)
+    try:
+        with transaction.atomic():
+            return VehicleReservation.objects.create(
+                vehicle_id=assignment.vehicle_id,
+                assignment=assignment,
+                start_time=start,
+                end_time=end
+            )
+    except IntegrityError as e:
+        if 'reservation_no_overlap' in str(e):
+            raise ReservationConflict(assignment.vehicle_id, start, end)
+        raise
+
+
+def release(assignment, at=None):
+    """
+    Free the rest of an assignment's reservation.
+
+    Declined assignments lose their reservation; finished trips keep it,
+    cut short at `at` so the vehicle is bookable again from then on.
+    """
+    # Vehicle listings filtered by free window are cached under 'vehicles'
+    transaction.on_commit(lambda: invalidate('vehicles'))
+    reservations = VehicleReservation.objects.filter(assignment=assignment)
+    if at is None:
+        return reservations.delete()[0]
+    # A trip finished before its window even began gives the whole window back
+    released = reservations.filter(start_time__gte=at).delete()[0]
+    return released + reservations.filter(end_time__gt=at).update(end_time=at)
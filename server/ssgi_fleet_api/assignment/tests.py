@@ -1,3 +1,550 @@
-from django.test import TestCase
+import asyncio
+import random
+import threading
+from datetime import timedelta
+
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from assignment.events import InProcessBroker, driver_channel, get_broker, reset_broker
+from assignment.models import Trips, Vehicle_Assignment, VehicleReservation
+from assignment.reservations import IntervalTree
+from notifications.models import OutboundEmail
+from request.models import Vehicle_Request
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import Department
+from vehicles.models import Vehicle
+from vehicles.tests import FleetFixtureMixin
+
+
+class AdminAssignmentHistoryAPIViewTests(FleetFixtureMixin, TestCase):
+    url = reverse('admin-assignment-history')
+
+    def test_history_is_cursor_paginated_newest_first(self):
+        vehicle = self.create_vehicle(0)
+        trips = [
+            self.create_completed_trip(vehicle, index * 10, index * 10 + 5,
+                                       start_time=timezone.now() - timedelta(days=10 - index))
+            for index in range(5)
+        ]
+        first = self.client.get(self.url, {"page_size": 2})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.data["history"]), 2)
+        self.assertIsNone(first.data["previous"])
+        self.assertEqual(first.data["history"][0]["total_km"], 5.0)
+
+        seen = []
+        response = first
+        while True:
+            seen.extend(response.data["history"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+        self.assertEqual(len(seen), len(trips))
+
+    def test_pagination_is_opt_in(self):
+        vehicle = self.create_vehicle(0)
+        for index in range(3):
+            self.create_completed_trip(vehicle, index, index + 1 + index, start_time=timezone.now() - timedelta(days=index))
+        response = self.client.get(self.url)
+        self.assertEqual(set(response.data), {"history"})
+        self.assertEqual([row["total_km"] for row in response.data["history"]], [1.0, 2.0, 3.0])
+
+    def test_filters(self):
+        other_department = Department.objects.create(name="Finance")
+        first = self.create_vehicle(0)
+        second = self.create_vehicle(1)
+        self.create_completed_trip(first, 0, 10)
+        self.create_completed_trip(second, 0, 20, start_time=timezone.now() - timedelta(days=30))
+
+        by_vehicle = self.client.get(self.url, {"vehicle": second.id})
+        self.assertEqual([row["total_km"] for row in by_vehicle.data["history"]], [20.0])
+        by_driver = self.client.get(self.url, {"driver": first.assigned_driver_id})
+        self.assertEqual([row["total_km"] for row in by_driver.data["history"]], [10.0])
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        by_date = self.client.get(self.url, {"start": since})
+        self.assertEqual([row["total_km"] for row in by_date.data["history"]], [10.0])
+        tomorrow = (timezone.localdate() + timedelta(days=1)).isoformat()
+        until_tomorrow = self.client.get(self.url, {"end": tomorrow})
+        self.assertEqual(sorted(row["total_km"] for row in until_tomorrow.data["history"]), [10.0, 20.0])
+        until_before = self.client.get(self.url, {"end": since})
+        self.assertEqual([row["total_km"] for row in until_before.data["history"]], [20.0])
+        by_department = self.client.get(self.url, {"department": other_department.id})
+        self.assertEqual(by_department.data["history"], [])
+        self.assertEqual(self.client.get(self.url, {"start": "yesterday"}).status_code, 400)
+
+    def test_page_cost_is_independent_of_history_size(self):
+        vehicle = self.create_vehicle(0)
+        for index in range(3):
+            self.create_completed_trip(vehicle, index, index + 1)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url, {"page_size": 2})
+        for index in range(20):
+            self.create_completed_trip(vehicle, index, index + 1)
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(self.url, {"page_size": 2})
+        self.assertEqual(len(small), len(large))
+
+
+
+class AssignCarConcurrencyTests(FleetFixtureMixin, TransactionTestCase):
+    url = reverse('assign-vehicle')
+
+    def create_request(self):
+        return Vehicle_Request.objects.create(
+            requester=self.employee, pickup_location="HQ", destination="Site",
+            purpose="Field survey", passenger_count=2,
+            status=Vehicle_Request.Status.APPROVED,
+        )
+
+    def test_stale_vehicle_version_is_a_conflict(self):
+        vehicle = self.create_vehicle(0)
+        seen_version = vehicle.version
+        vehicle.notes = "Edited by another admin"
+        vehicle.save()
+        response = self.client.post(self.url, {
+            "request_id": self.create_request().request_id,
+            "vehicle_id": vehicle.id,
+            "vehicle_version": seen_version,
+        }, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["error_code"], "assignment_conflict")
+        vehicle.refresh_from_db()
+        self.assertEqual(vehicle.status, Vehicle.Status.AVAILABLE)
+
+    def test_assignment_bumps_vehicle_version(self):
+        vehicle = self.create_vehicle(0)
+        response = self.client.post(self.url, {
+            "request_id": self.create_request().request_id,
+            "vehicle_id": vehicle.id,
+            "vehicle_version": vehicle.version,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        vehicle.refresh_from_db()
+        self.assertEqual(vehicle.status, Vehicle.Status.IN_USE)
+        self.assertEqual(vehicle.version, 1)
+
+    def test_concurrent_assignments_never_double_book(self):
+        workers = 8
+        vehicle = self.create_vehicle(0)
+        requests = [self.create_request() for _ in range(workers)]
+        barrier = threading.Barrier(workers)
+        statuses = []
+
+        def assign(vehicle_request):
+            client = APIClient()
+            client.force_authenticate(user=self.admin)
+            try:
+                barrier.wait()
+                response = client.post(self.url, {
+                    "request_id": vehicle_request.request_id,
+                    "vehicle_id": vehicle.id,
+                }, format='json')
+                statuses.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=assign, args=(r,)) for r in requests]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(statuses), workers)
+        # Losers either lost the race for the lock (409) or saw the vehicle in use (400).
+        # SQLite's table locks can make every contender lose, but never more than one win.
+        self.assertTrue(all(code in (201, 400, 409) for code in statuses), statuses)
+        winners = statuses.count(201)
+        self.assertLessEqual(winners, 1)
+        self.assertEqual(Vehicle_Assignment.objects.filter(vehicle=vehicle).count(), winners)
+        self.assertEqual(
+            Vehicle_Request.objects.filter(status=Vehicle_Request.Status.ASSIGNED).count(), winners
+        )
+        vehicle.refresh_from_db()
+        self.assertEqual(vehicle.status == Vehicle.Status.IN_USE, winners == 1)
+
+
+class VehicleMatchAPIViewTests(FleetFixtureMixin, TestCase):
+    url = reverse('vehicle-match')
+
+    def create_request(self, passengers=2, start_in=timedelta(hours=1), hours=2, **extra):
+        start = timezone.now() + start_in
+        return Vehicle_Request.objects.create(
+            requester=self.employee, pickup_location="HQ", destination="Site",
+            purpose="Field survey", passenger_count=passengers,
+            start_dateTime=start, end_dateTime=start + timedelta(hours=hours),
+            status=Vehicle_Request.Status.APPROVED, **extra,
+        )
+
+    def match(self, *requests, **extra):
+        response = self.client.post(
+            self.url, {"request_ids": [r.request_id for r in requests], **extra}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return {match["request_id"]: match for match in response.data["matches"]}
+
+    def test_ranks_by_capacity_fit_and_category(self):
+        van = self.create_vehicle(0, capacity=12, category=Vehicle.Category.FIELD)
+        sedan = self.create_vehicle(1, capacity=4, category=Vehicle.Category.POOL)
+        self.create_vehicle(2, capacity=2)
+        vehicle_request = self.create_request(passengers=3)
+
+        match = self.match(vehicle_request)[vehicle_request.request_id]
+        self.assertEqual(match["suggested_vehicle_id"], sedan.id)
+        self.assertEqual([c["vehicle_id"] for c in match["candidates"]], [sedan.id, van.id])
+        self.assertEqual(match["candidates"][0]["breakdown"]["category"], 1.0)
+
+    def test_skips_vehicles_with_conflicting_assignments(self):
+        busy = self.create_vehicle(0)
+        free = self.create_vehicle(1)
+        self.create_assignment(busy, Vehicle_Assignment.DriverStatus.PENDING)
+        vehicle_request = self.create_request(start_in=timedelta(0))
+
+        match = self.match(vehicle_request)[vehicle_request.request_id]
+        self.assertEqual([c["vehicle_id"] for c in match["candidates"]], [free.id])
+
+    def test_batch_never_suggests_one_vehicle_for_overlapping_requests(self):
+        vehicle = self.create_vehicle(0)
+        regular = self.create_request()
+        emergency = self.create_request(urgency=Vehicle_Request.Urgency.EMERGENCY)
+        later = self.create_request(start_in=timedelta(hours=5))
+
+        matches = self.match(regular, emergency, later)
+        self.assertEqual(matches[emergency.request_id]["suggested_vehicle_id"], vehicle.id)
+        self.assertIsNone(matches[regular.request_id]["suggested_vehicle_id"])
+        self.assertEqual(matches[later.request_id]["suggested_vehicle_id"], vehicle.id)
+
+    def test_batch_cost_is_independent_of_batch_size(self):
+        for index in range(5):
+            self.create_vehicle(index)
+        single = [self.create_request()]
+        batch = [self.create_request(start_in=timedelta(hours=3 * i)) for i in range(20)]
+        with CaptureQueriesContext(connection) as small:
+            self.match(*single)
+        with CaptureQueriesContext(connection) as large:
+            self.match(*batch)
+        self.assertEqual(len(small), len(large))
+
+    def test_only_approved_requests(self):
+        pending = self.create_request()
+        pending.status = Vehicle_Request.Status.PENDING
+        pending.save()
+        response = self.client.post(self.url, {"request_ids": [pending.request_id]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkAssignCarAPIViewTests(FleetFixtureMixin, TestCase):
+    url = reverse('bulk-assign-vehicle')
+
+    def create_request(self, status=Vehicle_Request.Status.APPROVED):
+        return Vehicle_Request.objects.create(
+            requester=self.employee, pickup_location="HQ", destination="Site",
+            purpose="Field survey", passenger_count=2, status=status,
+        )
+
+    def assign(self, pairs):
+        return self.client.post(self.url, {
+            "assignments": [
+                {"request_id": request_id, "vehicle_id": vehicle_id} for request_id, vehicle_id in pairs
+            ]
+        }, format='json')
+
+    def test_assigns_every_pair(self):
+        pairs = [(self.create_request().request_id, self.create_vehicle(i).id) for i in range(3)]
+        response = self.assign(pairs)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["assigned"], 3)
+        self.assertTrue(all(result["status"] == "assigned" for result in response.data["results"]))
+        self.assertEqual(Vehicle_Assignment.objects.count(), 3)
+        self.assertEqual(Vehicle.objects.filter(status=Vehicle.Status.IN_USE, version=1).count(), 3)
+        self.assertEqual(Vehicle_Request.objects.filter(status=Vehicle_Request.Status.ASSIGNED).count(), 3)
+        self.assertEqual(OutboundEmail.objects.count(), 6)
+
+    def test_reports_partial_failures(self):
+        vehicle = self.create_vehicle(0)
+        first = self.create_request()
+        second = self.create_request()
+        pending = self.create_request(status=Vehicle_Request.Status.PENDING)
+        response = self.assign([
+            (first.request_id, vehicle.id),
+            (second.request_id, vehicle.id),
+            (pending.request_id, self.create_vehicle(1).id),
+            (999999, self.create_vehicle(2).id),
+        ])
+        self.assertEqual(response.status_code, 207)
+        codes = [result.get("error_code") for result in response.data["results"]]
+        self.assertEqual(codes, [None, "vehicle_used_in_batch", "request_not_approved", "request_not_found"])
+        self.assertEqual(Vehicle_Assignment.objects.get().request_id, first.request_id)
+
+    def test_nothing_assignable_is_a_bad_request(self):
+        vehicle = self.create_vehicle(0, status=Vehicle.Status.MAINTENANCE)
+        response = self.assign([(self.create_request().request_id, vehicle.id)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["results"][0]["error_code"], "vehicle_not_available")
+        self.assertFalse(Vehicle_Assignment.objects.exists())
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_query_count_is_independent_of_batch_size(self):
+        small_pairs = [(self.create_request().request_id, self.create_vehicle(i).id) for i in range(2)]
+        large_pairs = [(self.create_request().request_id, self.create_vehicle(i).id) for i in range(10, 30)]
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.assign(small_pairs).status_code, 201)
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(self.assign(large_pairs).status_code, 201)
+        self.assertEqual(len(small), len(large))
+
+
+class IntervalTreeTests(TestCase):
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        intervals = []
+        for payload in range(300):
+            start = rng.randrange(0, 1000)
+            intervals.append((start, start + rng.randrange(1, 60), payload))
+        tree = IntervalTree(intervals[:200])
+        for interval in intervals[200:]:
+            tree.insert(*interval)
+        self.assertEqual(len(tree), 300)
+        for _ in range(200):
+            start = rng.randrange(0, 1000)
+            end = start + rng.randrange(1, 80)
+            expected = {p for s, e, p in intervals if s < end and e > start}
+            self.assertEqual(set(tree.overlapping(start, end)), expected)
+
+    def test_windows_are_half_open(self):
+        tree = IntervalTree([(10, 20, "a")])
+        self.assertFalse(tree.overlaps(20, 30))
+        self.assertFalse(tree.overlaps(0, 10))
+        self.assertTrue(tree.overlaps(19, 21))
+
+
+class VehicleReservationTests(FleetFixtureMixin, TestCase):
+
+    def create_request(self, start_in, hours=2):
+        start = timezone.now() + start_in
+        return Vehicle_Request.objects.create(
+            requester=self.employee, pickup_location="HQ", destination="Site",
+            purpose="Field survey", passenger_count=2,
+            start_dateTime=start, end_dateTime=start + timedelta(hours=hours),
+            status=Vehicle_Request.Status.APPROVED,
+        )
+
+    def book_ahead(self, vehicle, start_in=timedelta(days=1)):
+        """Reserve the vehicle for a future trip while it stays AVAILABLE today."""
+        response = self.client.post(reverse('assign-vehicle'), {
+            "request_id": self.create_request(start_in).request_id, "vehicle_id": vehicle.id,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        Vehicle.objects.filter(pk=vehicle.pk).update(status=Vehicle.Status.AVAILABLE)
+        return Vehicle_Assignment.objects.get(pk=response.data["assignment_id"])
+
+    def test_assignment_reserves_the_request_window(self):
+        vehicle = self.create_vehicle(0)
+        assignment = self.book_ahead(vehicle)
+        reservation = assignment.reservation
+        self.assertEqual(reservation.vehicle_id, vehicle.id)
+        self.assertEqual(reservation.start_time, assignment.request.start_dateTime)
+        self.assertEqual(reservation.end_time, assignment.request.end_dateTime)
+
+    def test_overlapping_booking_is_refused(self):
+        vehicle = self.create_vehicle(0)
+        self.book_ahead(vehicle)
+        response = self.client.post(reverse('assign-vehicle'), {
+            "request_id": self.create_request(timedelta(days=1, hours=1)).request_id,
+            "vehicle_id": vehicle.id,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error_code"][0], "booking_conflict")
+
+        later = self.client.post(reverse('assign-vehicle'), {
+            "request_id": self.create_request(timedelta(days=2)).request_id,
+            "vehicle_id": vehicle.id,
+        }, format='json')
+        self.assertEqual(later.status_code, 201)
+
+    def test_bulk_assignment_checks_reservations(self):
+        vehicle = self.create_vehicle(0)
+        self.book_ahead(vehicle)
+        first = self.create_request(timedelta(days=3))
+        overlapping = self.create_request(timedelta(days=1))
+        response = self.client.post(reverse('bulk-assign-vehicle'), {"assignments": [
+            {"request_id": overlapping.request_id, "vehicle_id": vehicle.id},
+            {"request_id": first.request_id, "vehicle_id": vehicle.id},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data["results"][0]["error_code"], "booking_conflict")
+        self.assertEqual(VehicleReservation.objects.filter(vehicle=vehicle).count(), 2)
+
+    def test_decline_releases_and_completion_trims(self):
+        vehicle = self.create_vehicle(0)
+        declined = self.book_ahead(vehicle)
+        driver_client = APIClient()
+        driver_client.force_authenticate(user=vehicle.assigned_driver)
+        response = driver_client.post(
+            reverse('decline-assignment', args=[declined.assignment_id]),
+            {"rejection_reason": "Vehicle has a flat tyre"}, format='json',
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertFalse(VehicleReservation.objects.filter(assignment=declined).exists())
+
+        current = self.create_assignment(vehicle, Vehicle_Assignment.DriverStatus.ACCEPTED)
+        trip = Trips.objects.create(assignment=current, start_mileage=0, start_time=timezone.now())
+        driver_client.patch(reverse('complete-assignment', args=[trip.trip_id]), {"end_mileage": "10"}, format='json')
+        trip.refresh_from_db()
+        self.assertEqual(VehicleReservation.objects.get(assignment=current).end_time, trip.end_time)
+
+    def test_listing_filters_vehicles_free_in_window(self):
+        booked = self.create_vehicle(0)
+        free = self.create_vehicle(1)
+        self.book_ahead(booked)
+        start = timezone.now() + timedelta(days=1, hours=1)
+        response = self.client.get('/api/vehicles/vehicles/list/', {
+            "free_from": start.isoformat(), "free_to": (start + timedelta(hours=1)).isoformat(),
+        })
+        self.assertEqual([row["id"] for row in response.data], [free.id])
+
+
+class RecordingBroker(InProcessBroker):
+    """In-process broker that also remembers what was published."""
+
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        return super().publish(channel, message)
+
+
+@override_settings(ASSIGNMENT_EVENTS_BROKER='assignment.tests.RecordingBroker', ASSIGNMENT_EVENTS_HEARTBEAT=1)
+class DriverAssignmentEventsTests(FleetFixtureMixin, TestCase):
+    url = reverse('driver-assignment-events')
+
+    def setUp(self):
+        super().setUp()
+        reset_broker()
+        self.addCleanup(reset_broker)
+        self.vehicle = self.create_vehicle(0)
+        self.driver = self.vehicle.assigned_driver
+        self.token = str(AccessToken.for_user(self.driver))
+
+    def create_request(self):
+        return Vehicle_Request.objects.create(
+            requester=self.employee, pickup_location="HQ", destination="Site",
+            purpose="Field survey", passenger_count=2,
+            status=Vehicle_Request.Status.APPROVED,
+        )
+
+    def test_assignment_is_published_to_the_driver_on_commit(self):
+        vehicle_request = self.create_request()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('assign-vehicle'),
+                {"request_id": vehicle_request.request_id, "vehicle_id": self.vehicle.id},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 201)
+        [(channel, message)] = get_broker().published
+        self.assertEqual(channel, driver_channel(self.driver.id))
+        self.assertEqual(message["event"], "assignment.created")
+        self.assertEqual(message["assignment_id"], response.data["assignment_id"])
+        self.assertEqual(message["vehicle"]["license_plate"], self.vehicle.license_plate)
+
+    def test_failed_assignment_publishes_nothing(self):
+        Vehicle.objects.filter(pk=self.vehicle.pk).update(status=Vehicle.Status.MAINTENANCE)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('assign-vehicle'),
+                {"request_id": self.create_request().request_id, "vehicle_id": self.vehicle.id},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(get_broker().published, [])
+
+    def test_stream_is_for_authenticated_drivers_only(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.assertEqual(self.client.get(self.url, {"token": "not-a-token"}).status_code, 401)
+        admin_token = str(AccessToken.for_user(self.admin))
+        self.assertEqual(self.client.get(self.url, {"token": admin_token}).status_code, 403)
+
+    async def test_stream_delivers_published_assignments(self):
+        response = await self.async_client.get(self.url, headers={"authorization": f"Bearer {self.token}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertIn(b"event: ready", await anext(stream))
+
+        get_broker().publish(driver_channel(self.driver.id), {"event": "assignment.created", "assignment_id": 7})
+        get_broker().publish(driver_channel(self.admin.id), {"event": "assignment.created", "assignment_id": 8})
+        self.assertEqual(
+            await anext(stream),
+            b'event: assignment.created\nid: 7\ndata: {"event": "assignment.created", "assignment_id": 7}\n\n'
+        )
+        # Nothing else is addressed to this driver, so the next chunk is a keepalive
+        self.assertEqual(await anext(stream), b": keepalive\n\n")
+        await stream.aclose()
+
+    async def test_events_service_serves_only_the_stream(self):
+        from ssgi_fleet_api.asgi import events_application
+
+        async def status_of(path):
+            sent = []
+            incoming = asyncio.Queue()
+            incoming.put_nowait({'type': 'http.request', 'body': b'', 'more_body': False})
+
+            async def receive():
+                # The request, then nothing until the handler is done
+                return await incoming.get()
+
+            async def send(message):
+                sent.append(message)
+
+            await events_application({
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+                'headers': [(b'host', b'testserver')], 'server': ('testserver', 80), 'client': ('127.0.0.1', 1),
+            }, receive, send)
+            return sent[0]['status']
+
+        self.assertEqual(await status_of(reverse('admin-assignment-history')), 404)
+        # Reaches the stream view, which wants a token
+        self.assertEqual(await status_of(self.url), 401)
+
+    def test_stream_is_served_under_wsgi(self):
+        # A WSGI server buffers async iterators whole, so the stream must be a sync one
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.is_async)
+        stream = iter(response.streaming_content)
+        self.assertIn(b"event: ready", next(stream))
+
+        get_broker().publish(driver_channel(self.driver.id), {"event": "assignment.created", "assignment_id": 7})
+        self.assertIn(b"id: 7", next(stream))
+        self.assertEqual(next(stream), b": keepalive\n\n")
+        response.close()
+
+
+class DriverCompletedTripsViewTests(FleetFixtureMixin, TestCase):
+    url = reverse('driver-completed-trips')
+
+    def test_unchanged_trips_are_not_modified(self):
+        vehicle = self.create_vehicle(0)
+        self.create_completed_trip(vehicle, 100, 150)
+        client = APIClient()
+        client.force_authenticate(user=vehicle.assigned_driver)
+
+        first = client.get(self.url)
+        self.assertEqual(first.data["count"], 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+        self.create_completed_trip(vehicle, 150, 180)
+        response = client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 2)
 
-# Create your tests here.
@@ -0,0 +1,27 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipient_list', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'recipients')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+    # May contain temporary passwords and password reset links
+    exclude = ('body',)
+    actions = ['retry_now']
+
+    def recipient_list(self, obj):
+        return ", ".join(obj.recipients)
+    recipient_list.short_description = "Recipients"
+
+    def retry_now(self, request, queryset):
+        # Failed emails have lost their body (see outbox._record_failure)
+        updated = queryset.exclude(status=OutboundEmail.Status.SENT).exclude(body='').update(
+            status=OutboundEmail.Status.PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f"{updated} emails queued for retry")
+    retry_now.short_description = "Retry selected emails now"
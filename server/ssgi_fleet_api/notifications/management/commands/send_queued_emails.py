@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from notifications.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Sends queued outbound emails in batches over one SMTP connection per batch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Emails sent per SMTP connection.')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the queue instead of exiting when it is empty.')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to wait between polls when the queue is empty.')
+
+    def handle(self, *args, **options):
+        while True:
+            result = deliver_pending(batch_size=options['batch_size'])
+            if any(result.values()):
+                self.stdout.write(
+                    f"Sent {result['sent']}, retrying {result['retried']}, failed {result['failed']}."
+                )
+            if not options['loop']:
+                break
+            # Drain a backlog without pausing; only sleep once the queue is empty
+            if sum(result.values()) < options['batch_size']:
+                time.sleep(options['interval'])
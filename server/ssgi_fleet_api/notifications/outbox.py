@@ -0,0 +1,165 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# A claimed batch is hidden from other workers for this long; if the worker
+# dies mid-send the rows become due again once the lease runs out.
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def _max_attempts():
+    return getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+
+
+def retry_delay(attempts):
+    """Exponential backoff: 1, 2, 4, 8... minutes, capped at one hour."""
+    return timedelta(minutes=min(2 ** (attempts - 1), 60))
+
+
+def _build(subject, message, recipient_list, from_email=None):
+    return OutboundEmail(
+        subject=subject,
+        body=message,
+        from_email=from_email or '',
+        recipients=[address for address in recipient_list if address],
+    )
+
+
+def enqueue_email(subject, message, recipient_list, from_email=None):
+    """
+    Queue an email for the send_queued_emails worker.
+
+    Takes the same arguments as django.core.mail.send_mail. Call it inside
+    the request's transaction: the row commits (or rolls back) with the
+    change it announces.
+    """
+    email = _build(subject, message, recipient_list, from_email)
+    if not email.recipients:
+        return None
+    email.save()
+    return email
+
+
+def enqueue_emails(messages):
+    """Queue several (subject, message, recipient_list[, from_email]) tuples with one insert."""
+    emails = [_build(*message) for message in messages]
+    return OutboundEmail.objects.bulk_create([email for email in emails if email.recipients])
+
+
+def _claim(batch_size):
+    """Lease up to batch_size due emails to this worker."""
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True).filter(
+                status=OutboundEmail.Status.PENDING,
+                next_attempt_at__lte=now
+            ).order_by('next_attempt_at')[:batch_size]
+        )
+        if emails:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+                attempts=F('attempts') + 1,
+                next_attempt_at=now + CLAIM_LEASE
+            )
+    for email in emails:
+        email.attempts += 1
+    return emails
+
+
+def _record_failure(email, error, now):
+    email.last_error = str(error)
+    if email.attempts >= _max_attempts():
+        email.status = OutboundEmail.Status.FAILED
+        # Never sent, but never retried either; don't keep the secrets around
+        email.body = ''
+    else:
+        email.next_attempt_at = now + retry_delay(email.attempts)
+
+
+def deliver_pending(batch_size=100, connection=None):
+    """
+    Send one batch of due emails over a single SMTP connection.
+
+    Failed messages are retried with exponential backoff until
+    EMAIL_OUTBOX_MAX_ATTEMPTS is reached, then marked failed. Returns a dict
+    with the number of emails sent, scheduled for retry and given up on.
+    """
+    result = {"sent": 0, "retried": 0, "failed": 0}
+    emails = _claim(batch_size)
+    if not emails:
+        return result
+
+    connection = connection or get_connection()
+    try:
+        connection.open()
+        connection_error = None
+    except Exception as e:
+        logger.exception(f"[deliver_pending] Could not connect to the mail server: {e}")
+        connection_error = e
+
+    now = timezone.now()
+    try:
+        for email in emails:
+            if connection_error is not None:
+                _record_failure(email, connection_error, now)
+                continue
+            try:
+                EmailMessage(
+                    email.subject,
+                    email.body,
+                    email.from_email or None,
+                    email.recipients,
+                    connection=connection,
+                ).send()
+                email.status = OutboundEmail.Status.SENT
+                email.sent_at = now
+                email.last_error = ''
+                # Bodies can hold temporary passwords and reset links; keep
+                # only the envelope once delivered
+                email.body = ''
+            except Exception as e:
+                logger.exception(f"[deliver_pending] Sending email {email.pk} failed: {e}")
+                _record_failure(email, e, now)
+    finally:
+        if connection_error is None:
+            connection.close()
+
+    OutboundEmail.objects.bulk_update(
+        emails, ['status', 'body', 'sent_at', 'last_error', 'next_attempt_at']
+    )
+    for email in emails:
+        if email.status == OutboundEmail.Status.SENT:
+            result["sent"] += 1
+        elif email.status == OutboundEmail.Status.FAILED:
+            result["failed"] += 1
+        else:
+            result["retried"] += 1
+    return result
+
+
+def purge_old_emails(batch_size=1000):
+    """
+    Delete sent and failed emails created more than EMAIL_OUTBOX_RETENTION_DAYS
+    ago, batch_size rows per statement. Pending ones are kept whatever their
+    age. Returns the number deleted.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+    old = OutboundEmail.objects.filter(
+        status__in=[OutboundEmail.Status.SENT, OutboundEmail.Status.FAILED],
+        created_at__lt=cutoff
+    )
+    deleted = 0
+    while True:
+        batch = list(old.values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return {"deleted": deleted}
+        deleted += OutboundEmail.objects.filter(pk__in=batch).delete()[0]
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from notifications.models import OutboundEmail
+from notifications.outbox import deliver_pending, enqueue_email, purge_old_emails
+from request.models import Vehicle_Request
+from vehicles.models import Vehicle
+from vehicles.tests import FleetFixtureMixin
+
+
+class FlakyBackend(EmailBackend):
+    """Locmem backend that refuses mail for one address and counts connections."""
+
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if "bounce@ssgi.test" in message.to:
+                raise ConnectionError("550 mailbox unavailable")
+        return super().send_messages(messages)
+
+
+class OutboundEmailTests(FleetFixtureMixin, TestCase):
+
+    def test_assignment_queues_mail_instead_of_sending(self):
+        vehicle = self.create_vehicle(0)
+        vehicle_request = Vehicle_Request.objects.create(
+            requester=self.employee, pickup_location="HQ", destination="Site",
+            purpose="Field survey", passenger_count=2,
+            status=Vehicle_Request.Status.APPROVED,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('assign-vehicle'),
+                {"request_id": vehicle_request.request_id, "vehicle_id": vehicle.id},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            sorted(OutboundEmail.objects.values_list('subject', flat=True)),
+            ["New Vehicle Assignment", "Vehicle Assignment Notification"],
+        )
+
+        self.assertEqual(deliver_pending(), {"sent": 2, "retried": 0, "failed": 0})
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.Status.SENT).exists())
+
+    def test_failed_assignment_queues_nothing(self):
+        vehicle = self.create_vehicle(0, status=Vehicle.Status.MAINTENANCE)
+        vehicle_request = Vehicle_Request.objects.create(
+            requester=self.employee, pickup_location="HQ", destination="Site",
+            purpose="Field survey", passenger_count=2,
+            status=Vehicle_Request.Status.APPROVED,
+        )
+        response = self.client.post(
+            reverse('assign-vehicle'),
+            {"request_id": vehicle_request.request_id, "vehicle_id": vehicle.id},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_batch_shares_one_connection_and_retries_failures(self):
+        for index in range(3):
+            enqueue_email("Hello", "Body", [f"user{index}@ssgi.test"])
+        enqueue_email("Hello", "Body", ["bounce@ssgi.test"])
+        FlakyBackend.opened = 0
+
+        result = deliver_pending(connection=FlakyBackend())
+        self.assertEqual(result, {"sent": 3, "retried": 1, "failed": 0})
+        self.assertEqual(FlakyBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+        bounced = OutboundEmail.objects.get(status=OutboundEmail.Status.PENDING)
+        self.assertEqual(bounced.attempts, 1)
+        self.assertIn("550", bounced.last_error)
+        self.assertGreater(bounced.next_attempt_at, timezone.now())
+        # Not due yet, so the next run leaves it alone
+        self.assertEqual(deliver_pending(connection=FlakyBackend()), {"sent": 0, "retried": 0, "failed": 0})
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_gives_up_after_max_attempts(self):
+        email = enqueue_email("Hello", "Temporary password: s3cret", ["bounce@ssgi.test"])
+        for expected in ({"sent": 0, "retried": 1, "failed": 0}, {"sent": 0, "retried": 0, "failed": 1}):
+            OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+            self.assertEqual(deliver_pending(connection=FlakyBackend()), expected)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.Status.FAILED)
+        self.assertEqual(email.attempts, 2)
+        self.assertEqual(email.body, "")
+
+    def test_sent_bodies_are_blanked_and_old_emails_purged(self):
+        sent = enqueue_email("Welcome", "Temporary password: s3cret", ["user@ssgi.test"])
+        pending = enqueue_email("Hello", "Body", ["bounce@ssgi.test"])
+        deliver_pending(connection=FlakyBackend())
+        sent.refresh_from_db()
+        self.assertEqual(sent.status, OutboundEmail.Status.SENT)
+        self.assertEqual(sent.body, "")
+        self.assertIn("s3cret", mail.outbox[0].body)
+
+        OutboundEmail.objects.update(created_at=timezone.now() - timedelta(days=31))
+        self.assertEqual(purge_old_emails(batch_size=1), {"deleted": 1})
+        self.assertEqual(list(OutboundEmail.objects.values_list('pk', flat=True)), [pending.pk])
+
+    def test_worker_command_drains_queue(self):
+        enqueue_email("Password Reset Request", "Body", [self.employee.email])
+        call_command('send_queued_emails', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.employee.email])
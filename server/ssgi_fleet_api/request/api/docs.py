@@ -386,6 +386,9 @@ Only accessible by the user themselves or an admin.
 
 - If no user_id is provided, returns the history for the current authenticated user.
 - If user_id is provided, only the user themselves or a superuser can access that user's history.
+- Pass `page` and/or `page_size` (default 50, max 200) to page through the requests.
+  Paginated responses also include `count`, `next` and `previous`; the totals
+  always cover the user's whole history.
 
 Response example:
 {
@@ -1,3 +1,4 @@
+import logging
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -20,7 +21,14 @@ from .docs import (
     approve_request_docs,
     user_request_history_docs,
 )
-from django.db.models import Prefetch
+from django.db.models import Count, Prefetch, Q
+from assignment.models import Vehicle_Assignment
+from ssgi_fleet_api.cache import cached_response
+from ssgi_fleet_api.conditional import conditional_list
+from ssgi_fleet_api.pagination import OptionalPageNumberPagination
+
+
+logger = logging.getLogger(__name__)
 
 
 class RequestCreateAPIView(APIView):
@@ -38,13 +46,13 @@ class RequestCreateAPIView(APIView):
 
        
         is_director = hasattr(request.user, 'role') and request.user.role == User.Role.DIRECTOR
-        print(f"User role: {getattr(request.user, 'role', 'NONE')}")
-        print(f"Is director: {is_director}")
-        print(f"Status to set: {'APPROVED' if is_director else 'PENDING'}")
+        logger.debug(
+            "[RequestCreateAPIView][POST] role=%s is_director=%s",
+            getattr(request.user, 'role', None), is_director
+        )
         requester = User.objects.get(
             pk =request.user.id
         )
-        print(f'requester : {requester}')
         
         vehicle_request = serializer.save(
             requester=request.user,
@@ -68,6 +76,13 @@ class RequestCreateAPIView(APIView):
             status=status.HTTP_201_CREATED
         )
 
+def _pending_for_director(view, request):
+    return Vehicle_Request.objects.filter(
+        status=Vehicle_Request.Status.PENDING,
+        requester__department__director=request.user
+    )
+
+
 class PendingRequestsAPI(APIView):
     """
     Retrieves pending requests only from:
@@ -77,6 +92,7 @@ class PendingRequestsAPI(APIView):
     permission_classes = [IsAuthenticated, IsDirector]
     
     @pending_requests_docs
+    @conditional_list(_pending_for_director, namespaces=('departments', 'users'))
     def get(self, request):
         # Get departments where current user is director
         directed_depts = Department.objects.filter(director=request.user)
@@ -141,8 +157,7 @@ class RequestApproveAPI(APIView):
 
         # Get requester's department
         requester_dept = req.requester.department
-        print(f'requester : {requester_dept}')
-        print(f'requester_id : {requester_dept.id}')
+        logger.debug("[RequestApproveAPI][PATCH] Requester department: %s", requester_dept)
 
 
         # Get the department where the request.user is the director
@@ -289,6 +304,7 @@ class RequestsListAPIView(APIView):
 class EmployeeRequestStatusView(APIView):
     permission_classes = [IsAuthenticated, IsEmployee]
     @request_status_docs
+    @conditional_list(lambda view, request: Vehicle_Request.objects.filter(requester=request.user))
     def get(self, request):
         # Get only the current employee's requests, ordered newest first
         requests = Vehicle_Request.objects.filter(
@@ -302,6 +318,7 @@ class EmployeeRequestStatusView(APIView):
 class DepartmentListWithDirectorsView(APIView):
     permission_classes = [IsAuthenticated, IsSuperAdmin]
     
+    @cached_response('departments-with-directors', namespaces=('departments', 'users'), timeout=300)
     def get(self, request):
         # Get all departments with related directors
         departments = Department.objects.all().prefetch_related(
@@ -335,19 +352,34 @@ class UserRequestHistoryAPIView(APIView):
                 return Response({'detail': 'Not authorized.'}, status=403)
             user = get_object_or_404(User, pk=user_id)
 
-        requests = Vehicle_Request.objects.filter(requester=user).order_by('-created_at')
-        total_requests = requests.count()
-        accepted_requests = requests.filter(status=Vehicle_Request.Status.ASSIGNED).count()
-        declined_requests = requests.filter(status=Vehicle_Request.Status.REJECTED).count()
+        requests = Vehicle_Request.objects.filter(requester=user)
+        # All three totals in one conditional aggregation
+        totals = requests.aggregate(
+            total_requests=Count('pk'),
+            accepted_requests=Count('pk', filter=Q(status=Vehicle_Request.Status.ASSIGNED)),
+            declined_requests=Count('pk', filter=Q(status=Vehicle_Request.Status.REJECTED)),
+        )
+        requests = requests.select_related(
+            'requester', 'department_approver'
+        ).prefetch_related(
+            Prefetch(
+                'assignments',
+                queryset=Vehicle_Assignment.objects.select_related('vehicle', 'driver'),
+                to_attr='prefetched_assignments'
+            )
+        ).order_by('-created_at')
+
+        paginator = OptionalPageNumberPagination()
+        page = paginator.paginate_queryset(requests, request, view=self)
 
         request_list = []
-        for req in requests:
+        for req in (page if page is not None else requests):
             vehicle = None
             driver = None
             reason = req.purpose
             # If assigned, get assignment details
             if req.status == Vehicle_Request.Status.ASSIGNED:
-                assignment = req.assignments.first()  # related_name='assignments'
+                assignment = req.prefetched_assignments[0] if req.prefetched_assignments else None
                 if assignment:
                     vehicle = f"{assignment.vehicle.make} {assignment.vehicle.model} - {assignment.vehicle.license_plate}" if assignment.vehicle else None
                     driver = assignment.driver.get_full_name() if assignment.driver else None
@@ -368,9 +400,11 @@ class UserRequestHistoryAPIView(APIView):
                 "status": req.status,
             })
 
-        return Response({
-            "total_requests": total_requests,
-            "accepted_requests": accepted_requests,
-            "declined_requests": declined_requests,
-            "requests": request_list
-        })
+        response = {**totals, "requests": request_list}
+        if page is not None:
+            response.update({
+                "count": paginator.page.paginator.count,
+                "next": paginator.get_next_link(),
+                "previous": paginator.get_previous_link(),
+            })
+        return Response(response)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 00:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request', '0004_remove_vehicle_request_duration_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vehicle_request',
+            index=models.Index(fields=['requester', '-created_at'], name='vrequest_requester_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle_request',
+            index=models.Index(condition=models.Q(('status', 'Pending')), fields=['requester', '-created_at'], name='vrequest_pending_idx'),
+        ),
+    ]
@@ -76,6 +76,16 @@ class Vehicle_Request(models.Model):
         ordering = ['-created_at' , '-updated_at']
         verbose_name = 'Vehicle Request'
         verbose_name_plural = 'Vehicle Requests'
+        indexes = [
+            # An employee's own requests, newest first
+            models.Index(fields=['requester', '-created_at'], name='vrequest_requester_created_idx'),
+            # Directors' pending queues; only the small pending slice is indexed
+            models.Index(
+                fields=['requester', '-created_at'],
+                condition=models.Q(status='Pending'),
+                name='vrequest_pending_idx'
+            ),
+        ]
 
     def clean(self):
         """Validate datetime ranges"""
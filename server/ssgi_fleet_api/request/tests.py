@@ -1,3 +1,122 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from assignment.models import Vehicle_Assignment
+from request.models import Vehicle_Request
+from users.models import User
+from vehicles.tests import FleetFixtureMixin
+
+
+class UserRequestHistoryAPIViewTests(FleetFixtureMixin, TestCase):
+    url = reverse('user-request-history')
+
+    def setUp(self):
+        super().setUp()
+        self.employee_client = APIClient()
+        self.employee_client.force_authenticate(user=self.employee)
+
+    def create_history(self, size, offset=0):
+        for index in range(offset, offset + size):
+            assignment = self.create_assignment(self.create_vehicle(index), Vehicle_Assignment.DriverStatus.PENDING)
+            Vehicle_Request.objects.filter(pk=assignment.request_id).update(status=Vehicle_Request.Status.ASSIGNED)
+            Vehicle_Request.objects.create(
+                requester=self.employee, pickup_location="HQ", destination="Site",
+                purpose="Audit", passenger_count=1, department_approver=self.admin,
+                status=Vehicle_Request.Status.REJECTED, rejection_reason="No vehicles left",
+            )
+
+    def test_totals_and_assignment_details(self):
+        self.create_history(2)
+        response = self.employee_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_requests"], 4)
+        self.assertEqual(response.data["accepted_requests"], 2)
+        self.assertEqual(response.data["declined_requests"], 2)
+        assigned = [row for row in response.data["requests"] if row["status"] == Vehicle_Request.Status.ASSIGNED]
+        self.assertTrue(all(row["vehicle"].startswith("Toyota Hilux - AA-") for row in assigned))
+        self.assertTrue(all(row["driver"].startswith("Dan Driver") for row in assigned))
+        rejected = [row for row in response.data["requests"] if row["status"] == Vehicle_Request.Status.REJECTED]
+        self.assertTrue(all(row["reason"] == "No vehicles left" for row in rejected))
+
+    def test_query_count_is_independent_of_history_size(self):
+        self.create_history(1)
+        with CaptureQueriesContext(connection) as small:
+            self.employee_client.get(self.url)
+        self.create_history(10, offset=1)
+        with CaptureQueriesContext(connection) as large:
+            response = self.employee_client.get(self.url)
+        self.assertEqual(len(response.data["requests"]), 22)
+        self.assertEqual(len(small), len(large))
+
+    def test_pagination_keeps_overall_totals(self):
+        self.create_history(3)
+        response = self.employee_client.get(self.url, {"page_size": 4})
+        self.assertEqual(len(response.data["requests"]), 4)
+        self.assertEqual(response.data["count"], 6)
+        self.assertEqual(response.data["total_requests"], 6)
+        self.assertIsNotNone(response.data["next"])
+
+
+class ConditionalRequestListTests(FleetFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.employee_client = APIClient()
+        self.employee_client.force_authenticate(user=self.employee)
+
+    def create_request(self, **extra):
+        return Vehicle_Request.objects.create(
+            requester=self.employee, pickup_location="HQ", destination="Site",
+            purpose="Audit", passenger_count=1, **extra,
+        )
+
+    def test_unchanged_status_list_is_not_modified(self):
+        url = reverse('employee-pr-requests')
+        self.create_request()
+        first = self.employee_client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("ETag", first)
+        self.assertNotIn("Last-Modified", first)
+
+        # Only the validator aggregate runs; nothing is loaded or serialized
+        with self.assertNumQueries(1):
+            cached = self.employee_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+
+        vehicle_request = self.create_request()
+        changed = self.employee_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(len(changed.data), 2)
+
+        # A deletion leaves the newest timestamp alone but changes the count
+        vehicle_request.delete()
+        after_delete = self.employee_client.get(url, HTTP_IF_NONE_MATCH=changed["ETag"])
+        self.assertEqual(after_delete.status_code, 200)
+        self.assertNotEqual(after_delete["ETag"], changed["ETag"])
+
+    def test_pending_list_tracks_status_changes(self):
+        director = User.objects.create_user(
+            email="director@ssgi.test", password=None, first_name="Dee", last_name="Director",
+            role=User.Role.DIRECTOR, department=self.department, username="dee_director",
+        )
+        self.department.director = director
+        self.department.save()
+        client = APIClient()
+        client.force_authenticate(user=director)
+        url = reverse('pending-requests')
+
+        vehicle_request = self.create_request()
+        first = client.get(url)
+        self.assertEqual(first.data["count"], 1)
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+        vehicle_request.status = Vehicle_Request.Status.APPROVED
+        vehicle_request.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 0)
 
-# Create your tests here.
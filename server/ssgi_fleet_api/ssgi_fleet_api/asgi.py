@@ -10,7 +10,25 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 import os
 
 from django.core.asgi import get_asgi_application
+from django.urls import reverse
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ssgi_fleet_api.settings')
 
 application = get_asgi_application()
+
+
+async def events_application(scope, receive, send):
+    """
+    The driver event stream only, for the asyncio `events` service (see
+    gunicorn.conf.py). Every other path is answered 404: sync API views
+    would all share one thread per worker here.
+    """
+    if scope['type'] == 'http' and scope['path'] != reverse('driver-assignment-events'):
+        await send({
+            'type': 'http.response.start',
+            'status': 404,
+            'headers': [(b'content-type', b'application/json')],
+        })
+        await send({'type': 'http.response.body', 'body': b'{"error": "Not found."}'})
+        return
+    await application(scope, receive, send)
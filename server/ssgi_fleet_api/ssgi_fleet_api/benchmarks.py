@@ -0,0 +1,215 @@
+"""
+Endpoint benchmarks for the fleet API.
+
+run_benchmarks() drives the main workflows through DRF's test client, with
+real JWT authentication, inside one transaction that is rolled back at
+the end:
+
+    login -> request create -> approve -> assign -> accept -> complete
+
+followed by the read-heavy admin pages (fleet history report, assignment
+history). Every call's wall time and query count is recorded per
+endpoint and summarised as percentiles. The summary is plain JSON, so two
+runs (say, two releases against the same generate_fleet_data dataset)
+can be diffed with compare().
+"""
+import logging
+import math
+import platform
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from request.models import Vehicle_Request
+from users.models import Department, User
+from vehicles.models import Vehicle, VehicleDriverAssignmentHistory
+from .cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+PASSWORD = "bench-Passw0rd!"
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def summarise(samples):
+    """Latency percentiles and query counts of one endpoint's samples."""
+    latencies = [sample["ms"] for sample in samples]
+    queries = [sample["queries"] for sample in samples]
+    return {
+        "count": len(samples),
+        "errors": sum(1 for sample in samples if not sample["ok"]),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p90_ms": round(percentile(latencies, 0.90), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "max_ms": round(max(latencies), 2),
+        "queries_mean": round(statistics.fmean(queries), 2),
+        "queries_max": max(queries),
+    }
+
+
+class Bench:
+    """Issues requests and records their timing under an endpoint name."""
+
+    def __init__(self):
+        self.samples = {}
+
+    def client(self, user=None):
+        client = APIClient()
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        return client
+
+    def call(self, name, client, method, path, data=None, expected=(200,)):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(path, data, format='json')
+            elapsed = (time.perf_counter() - started) * 1000
+        self.samples.setdefault(name, []).append({
+            "ms": elapsed,
+            "queries": len(queries),
+            "ok": response.status_code in expected,
+        })
+        if response.status_code not in expected:
+            logger.warning(f"[benchmarks][{name}] {method.upper()} {path} returned {response.status_code}: {getattr(response, 'data', '')}")
+        return response
+
+
+def _actors(iterations, tag):
+    """A department with its director, an employee, an admin and one free vehicle per iteration."""
+    department = Department.objects.create(name=f"Benchmark {tag}")
+    director = User.objects.create_user(
+        email=f"bench-director-{tag}@ssgi.test", username=f"bench_director_{tag}",
+        role=User.Role.DIRECTOR, department=department, first_name="Bench", last_name="Director",
+    )
+    department.director = director
+    department.save()
+    employee = User.objects.create_user(
+        email=f"bench-employee-{tag}@ssgi.test", username=f"bench_employee_{tag}", password=PASSWORD,
+        role=User.Role.EMPLOYEE, department=department, first_name="Bench", last_name="Employee",
+    )
+    admin = User.objects.create_user(
+        email=f"bench-admin-{tag}@ssgi.test", username=f"bench_admin_{tag}",
+        role=User.Role.ADMIN, first_name="Bench", last_name="Admin",
+    )
+    vehicles = []
+    for index in range(iterations):
+        driver = User.objects.create_user(
+            email=f"bench-driver{index}-{tag}@ssgi.test", username=f"bench_driver{index}_{tag}",
+            role=User.Role.DRIVER, first_name="Bench", last_name=f"Driver{index}",
+        )
+        vehicle = Vehicle.objects.create(
+            license_plate=f"BN{tag[:4]}-{index:04d}", make="Toyota", model="Hilux", year=2022,
+            fuel_type=Vehicle.FuelType.DIESEL, capacity=7, assigned_driver=driver, department=department,
+        )
+        VehicleDriverAssignmentHistory.objects.create(vehicle=vehicle, driver=driver)
+        vehicles.append(vehicle)
+    return director, employee, admin, vehicles
+
+
+def _workflow(bench, index, director, employee, admin, vehicle):
+    start = timezone.now() + timedelta(days=1, hours=index)
+    bench.call("login", bench.client(), "post", "/api/auth/login/", {"email": employee.email, "password": PASSWORD})
+
+    created = bench.call("request_create", bench.client(employee), "post", "/api/request/requests/", {
+        "pickup_location": "Headquarters", "destination": "Field Station", "purpose": "Benchmark trip",
+        "start_dateTime": start.isoformat(), "end_dateTime": (start + timedelta(hours=2)).isoformat(),
+        "passenger_count": 2, "passenger_names": ["A", "B"],
+    }, expected=(201,))
+    if created.status_code != 201:
+        return
+    request_id = created.data["id"]
+    bench.call("request_approve", bench.client(director), "patch", f"/api/request/requests/{request_id}/approve/")
+
+    assigned = bench.call("assign", bench.client(admin), "post", "/api/assignments/assign/", {
+        "request_id": request_id, "vehicle_id": vehicle.id,
+    }, expected=(201,))
+    if assigned.status_code != 201:
+        return
+    driver = bench.client(vehicle.assigned_driver)
+    accepted = bench.call("accept", driver, "post", f"/api/assignments/{assigned.data['assignment_id']}/accept/", {
+        "start_mileage": vehicle.current_mileage,
+    }, expected=(200, 201))
+    if accepted.status_code not in (200, 201):
+        return
+    bench.call("complete", driver, "patch", f"/api/assignments/{accepted.data['trip_id']}/complete/", {
+        "end_mileage": vehicle.current_mileage + 42,
+    })
+
+
+def run_benchmarks(iterations=20, reads=None, dataset=None):
+    """
+    Run every scenario `iterations` times and return the JSON-ready summary.
+
+    `reads` is how often the read-only admin pages are requested (defaults
+    to `iterations`); `dataset` is stored as-is to describe the data the
+    run was made against.
+    """
+    bench = Bench()
+    tag = uuid.uuid4().hex[:8]
+    started_at = timezone.now()
+    try:
+        # The test client sends Host: testserver, which a deployment's ALLOWED_HOSTS rejects
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), transaction.atomic():
+            director, employee, admin, vehicles = _actors(iterations, tag)
+            for index, vehicle in enumerate(vehicles):
+                _workflow(bench, index, director, employee, admin, vehicle)
+            admin_client = bench.client(admin)
+            today = timezone.localdate()
+            for _ in range(reads or iterations):
+                bench.call("fleet_history", admin_client, "get", "/api/vehicles/vehicles/history/", {
+                    "start": (today - timedelta(days=30)).isoformat(), "end": today.isoformat(),
+                })
+                bench.call("admin_history", admin_client, "get", "/api/assignments/admin/history/")
+            transaction.set_rollback(True)
+    finally:
+        # Cached responses may have been built from the rolled back rows
+        invalidate('vehicles', 'users', 'departments')
+
+    return {
+        "started_at": started_at.isoformat(),
+        "duration_s": round((timezone.now() - started_at).total_seconds(), 2),
+        "environment": {
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+        },
+        "dataset": dataset or {
+            "vehicle_requests": Vehicle_Request.objects.count(),
+            "vehicles": Vehicle.objects.count(),
+        },
+        "iterations": iterations,
+        "endpoints": {name: summarise(samples) for name, samples in bench.samples.items()},
+    }
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    Endpoints that got slower (p95 more than `threshold` higher) or started
+    issuing more queries than in `baseline`. Returns a list of messages.
+    """
+    regressions = []
+    for name, now in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if before is None:
+            continue
+        if now["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {before['p95_ms']} ms -> {now['p95_ms']} ms")
+        if now["queries_max"] > before["queries_max"]:
+            regressions.append(f"{name}: queries {before['queries_max']} -> {now['queries_max']}")
+    return regressions
@@ -0,0 +1,121 @@
+"""
+Response cache for read-heavy dashboard endpoints.
+
+Cached views declare the data namespaces they depend on ("vehicles",
+"departments", "users"). Every namespace has a version number stored in the
+cache; it is part of each cache key, so invalidating a namespace is a single
+increment that makes all dependent entries unreachable. This works the same
+on the local-memory backend and on Redis, without pattern deletes.
+
+Namespaces are bumped from post_save/post_delete signals (see the apps'
+signals modules) and explicitly after bulk queryset updates, which do not
+send signals.
+"""
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.utils.cache import get_conditional_response
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+VERSION_KEY = 'api-cache:version:{}'
+STATS_KEY = 'api-cache:stats:{}:{}'
+ENTRY_KEY = 'api-cache:entry:v2:{}:{}:{}'
+# Response headers stored with a cached entry and replayed on hits
+CACHED_HEADERS = ('ETag',)
+
+# Registry of cached endpoint names, used to report hit/miss counters
+ENDPOINTS = set()
+
+
+def _incr(key, initial):
+    """Atomically increment key, creating it with `initial` if missing."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, initial, timeout=None):
+            return initial
+        return cache.incr(key)
+
+
+def invalidate(*namespaces):
+    """Make every cached response depending on these namespaces stale."""
+    for namespace in namespaces:
+        _incr(VERSION_KEY.format(namespace), 2)
+
+
+def namespace_versions(namespaces):
+    """Current version of each namespace, as strings, in the order given."""
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    return [str(found.get(key, 1)) for key in keys]
+
+
+def _entry_key(name, namespaces, request):
+    query = sorted(request.GET.lists())
+    fingerprint = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+    return ENTRY_KEY.format(name, '.'.join(namespace_versions(namespaces)), fingerprint)
+
+
+def cached_response(name, namespaces, timeout):
+    """
+    Cache successful responses of a DRF view handler.
+
+    Decorate the handler itself (``get``/``list`` on a class-based view, or the
+    function under ``@api_view``) so authentication and permission checks
+    still run on every request. Responses are keyed by endpoint name,
+    namespace versions, path and query string, and carry an ``X-Cache``
+    header of HIT or MISS.
+
+    ETag headers set by the handler (see ssgi_fleet_api/conditional.py) are
+    cached too, so a hit answers a matching conditional request with 304
+    without querying the database.
+    """
+    ENDPOINTS.add(name)
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            if not getattr(settings, 'API_CACHE_ENABLED', True):
+                return handler(*args, **kwargs)
+            request = args[0] if isinstance(args[0], (Request, HttpRequest)) else args[1]
+            key = _entry_key(name, namespaces, request)
+            entry = cache.get(key)
+            if entry is not None:
+                _incr(STATS_KEY.format(name, 'hits'), 1)
+                headers = entry['headers']
+                http_request = request._request if isinstance(request, Request) else request
+                # Only endpoints that set validators answer conditional requests
+                response = headers and get_conditional_response(
+                    http_request, etag=headers.get('ETag')
+                ) or Response(entry['data'])
+                for header, value in headers.items():
+                    response[header] = value
+                response['X-Cache'] = 'HIT'
+                return response
+
+            _incr(STATS_KEY.format(name, 'misses'), 1)
+            response = handler(*args, **kwargs)
+            if response.status_code == 200:
+                headers = {header: response[header] for header in CACHED_HEADERS if response.has_header(header)}
+                cache.set(key, {'data': response.data, 'headers': headers}, timeout)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """Hit/miss counters per cached endpoint (shared across workers on Redis)."""
+    keys = {
+        (name, kind): STATS_KEY.format(name, kind)
+        for name in ENDPOINTS for kind in ('hits', 'misses')
+    }
+    found = cache.get_many(list(keys.values()))
+    stats = {}
+    for (name, kind), key in keys.items():
+        stats.setdefault(name, {'hits': 0, 'misses': 0})[kind] = found.get(key, 0)
+    return stats
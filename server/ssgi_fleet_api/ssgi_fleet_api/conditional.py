@@ -0,0 +1,80 @@
+"""
+Conditional GET (ETag) for list endpoints.
+
+The ETag comes from one aggregate over the rows a listing shows: the
+newest `updated_at` and the row count. It is checked against the
+request's If-None-Match header before the handler runs, so an unchanged
+listing is answered with 304 Not Modified without loading or serializing
+a single row.
+
+There is deliberately no Last-Modified: when a row is deleted or leaves
+the filter, the newest remaining `updated_at` does not move, so
+If-Modified-Since would answer 304 for a listing that lost rows. Only the
+count in the ETag notices removals.
+
+Rows changed with queryset.update() must set updated_at themselves for
+this to notice them. Listings that also show data from other tables
+(driver names, reservations) can name the cache namespaces of that data;
+their versions (see ssgi_fleet_api/cache.py) are folded into the ETag.
+"""
+import functools
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework.request import Request
+
+from .cache import namespace_versions
+
+
+def list_validators(queryset, request, namespaces=(), timestamp_field='updated_at'):
+    """
+    ETag for the rows of `queryset` as seen by this request.
+
+    The user and the full path are part of the ETag, so two users (or two
+    filters) whose rows happen to share a count and timestamp never share
+    a validator.
+    """
+    state = queryset.order_by().aggregate(last_modified=Max(timestamp_field), count=Count('pk'))
+    last_modified = state['last_modified']
+    fingerprint = '|'.join([
+        str(getattr(request.user, 'pk', None)),
+        request.get_full_path(),
+        str(state['count']),
+        last_modified.isoformat() if last_modified else '',
+        *namespace_versions(namespaces),
+    ])
+    return quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+
+
+def conditional_list(get_queryset, namespaces=(), timestamp_field='updated_at'):
+    """
+    Answer GETs of a DRF list handler with 304 when its rows are unchanged.
+
+    `get_queryset(view, request, *args, **kwargs)` returns the rows the
+    handler would list. Like cached_response, decorate the handler itself so
+    authentication and permission checks still run first. Successful
+    responses carry the ETag header.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return handler(view, request, *args, **kwargs)
+            queryset = get_queryset(view, request, *args, **kwargs)
+            if queryset is None:
+                return handler(view, request, *args, **kwargs)
+            etag = list_validators(queryset, request, namespaces, timestamp_field)
+
+            http_request = request._request if isinstance(request, Request) else request
+            not_modified = get_conditional_response(http_request, etag=etag)
+            if not_modified is not None:
+                return not_modified
+
+            response = handler(view, request, *args, **kwargs)
+            if response.status_code == 200:
+                response['ETag'] = etag
+            return response
+        return wrapper
+    return decorator
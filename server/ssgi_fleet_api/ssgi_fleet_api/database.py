@@ -0,0 +1,63 @@
+"""
+Postgres connection settings: persistent connections, pooling, PgBouncer.
+
+Opening a connection to the hosted database costs a TCP and TLS handshake
+plus authentication, 50-150 ms on our link, so requests must not pay it
+each time. postgres_database() builds settings.DATABASES['default'] from
+the environment in one of three ways:
+
+- DB_POOL=true (the default): a psycopg 3 connection pool per worker
+  process (Django's OPTIONS["pool"]). A request borrows a connection and
+  returns it when it finishes. This is the mode for the ASGI server,
+  where Django's persistent connections are not reused between requests.
+  Sized with DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE and DB_POOL_TIMEOUT
+  (seconds to wait for a free connection).
+- DB_POOL=false: persistent connections kept open for DB_CONN_MAX_AGE
+  seconds, checked before reuse when DB_CONN_HEALTH_CHECKS is on.
+- DB_PGBOUNCER=true, with either of the above: the host is a pooler in
+  transaction mode (PgBouncer, Supabase's Supavisor on port 6543). Each
+  transaction may run on a different server connection, so nothing that
+  lives in a server session can be relied on:
+  * server-side cursors (used by QuerySet.iterator()) are disabled;
+  * psycopg's automatic prepared statements are disabled
+    (prepare_threshold=None); a statement prepared on one server
+    connection does not exist on the next;
+  * session state set with SET, advisory locks and LISTEN/NOTIFY do not
+    survive between transactions.
+
+`manage.py benchmark_db_connections` measures what a query costs with a
+new connection each time, a persistent connection and the pool.
+"""
+
+
+def _flag(environ, name, default):
+    return environ.get(name, default).lower() == 'true'
+
+
+def postgres_database(environ):
+    """The DATABASES['default'] entry for the Postgres settings in `environ`."""
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': environ.get('DB_NAME'),
+        'USER': environ.get('DB_USER'),
+        'PASSWORD': environ.get('DB_PASSWORD'),
+        'HOST': environ.get('DB_HOST'),
+        'PORT': environ.get('DB_PORT'),
+        'CONN_HEALTH_CHECKS': _flag(environ, 'DB_CONN_HEALTH_CHECKS', 'true'),
+        'OPTIONS': {},
+    }
+    if _flag(environ, 'DB_POOL', 'true'):
+        # Django's pool and persistent connections are mutually exclusive
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = {
+            'min_size': int(environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+    else:
+        database['CONN_MAX_AGE'] = int(environ.get('DB_CONN_MAX_AGE', 60))
+
+    if _flag(environ, 'DB_PGBOUNCER', 'false'):
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+        database['OPTIONS']['prepare_threshold'] = None
+    return database
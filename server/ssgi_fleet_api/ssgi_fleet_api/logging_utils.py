@@ -0,0 +1,142 @@
+"""
+Logging pipeline: JSON lines, written off the request thread.
+
+settings.LOGGING is an ordinary dictConfig. configure_logging() (the
+LOGGING_CONFIG callable) applies it and then puts every handler behind a
+QueueHandler: loggers only append the record to an in-memory queue, and a
+QueueListener thread per handler does the formatting and the stream
+writes. A request never waits on stdout or a slow log collector.
+
+Handler filters, such as SamplingFilter, are moved in front of the queue
+so dropped records are never enqueued. Levels are set per logger in
+LOGGING (LOG_LEVELS="vehicles=DEBUG,django.db.backends=DEBUG" in the
+environment, see module_levels()).
+"""
+import atexit
+import json
+import logging
+import logging.config
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listeners = []
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; `extra` fields are included as-is."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_FIELDS})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        return f"{super().formatTime(record, '%Y-%m-%dT%H:%M:%S')}.{int(record.msecs):03d}"
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Let through only a `rate` share of records at or below `max_level`.
+
+    Meant for high-volume DEBUG logs: rate=0.01 keeps one in a hundred,
+    while INFO and above are never sampled.
+    """
+
+    def __init__(self, rate=1.0, max_level='DEBUG'):
+        super().__init__()
+        self.rate = float(rate)
+        self.max_level = logging.getLevelName(max_level) if isinstance(max_level, str) else max_level
+
+    def filter(self, record):
+        return record.levelno > self.max_level or self.rate >= 1 or random.random() < self.rate
+
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    Enqueue records for a listener in this process.
+
+    The message is rendered now (its arguments may change once the call
+    returns) and the traceback turned into text, but formatting is left to
+    the listener's handler.
+    """
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def queue_handlers(loggers):
+    """
+    Replace each handler of `loggers` by a queue feeding it from a listener thread.
+
+    A handler shared by several loggers gets one queue and one listener.
+    Returns the started listeners.
+    """
+    queued = {}
+    started = []
+    for logger in loggers:
+        for handler in list(logger.handlers):
+            if isinstance(handler, QueueHandler):
+                continue
+            if handler not in queued:
+                front = _RecordQueueHandler(queue.SimpleQueue())
+                front.setLevel(handler.level)
+                for log_filter in list(handler.filters):
+                    front.addFilter(log_filter)
+                    handler.removeFilter(log_filter)
+                listener = QueueListener(front.queue, handler, respect_handler_level=True)
+                listener.start()
+                queued[handler] = front
+                started.append(listener)
+            logger.removeHandler(handler)
+            logger.addHandler(queued[handler])
+    return started
+
+
+def stop_listeners():
+    """Flush the queues and stop the listener threads (runs at exit)."""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+def configure_logging(config):
+    """LOGGING_CONFIG callable: dictConfig, then queue every configured handler."""
+    stop_listeners()
+    logging.config.dictConfig(config)
+    loggers = [logging.getLogger()] + [logging.getLogger(name) for name in config.get('loggers', {})]
+    _listeners.extend(queue_handlers(loggers))
+
+
+atexit.register(stop_listeners)
+
+
+def module_levels(value):
+    """Parse "vehicles=DEBUG,django.db.backends=INFO" into {logger: level}."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        name, _, level = item.partition('=')
+        levels[name.strip()] = level.strip().upper()
+    return levels
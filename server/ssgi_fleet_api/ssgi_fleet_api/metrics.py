@@ -0,0 +1,224 @@
+"""
+Per-request SQL and latency instrumentation.
+
+RequestMetricsMiddleware measures, for every request:
+
+- the number of SQL queries and the time spent executing them, through a
+  connection execute wrapper (so it works with DEBUG off),
+- the time spent building serializer output (serializer.data),
+- the wall time of the whole request.
+
+The numbers go out as a Server-Timing header, which browser dev tools
+show next to the request, and as one structured DEBUG line on the
+"ssgi_fleet_api.metrics" logger (LOG_LEVELS="ssgi_fleet_api.metrics=DEBUG"
+turns them on). Requests slower than REQUEST_METRICS_SLOW_MS are logged at
+WARNING level with the same fields plus every SQL statement and its
+duration. With REQUEST_METRICS_STACKS on (when hunting
+a slow query), each statement also carries the application frames that
+issued it; collecting them costs a stack walk per query, so it is off by
+default and the per-query path only keeps counters and the statement.
+
+The middleware is sync and async capable, so it does not force an ASGI
+request through a thread. With REQUEST_METRICS_ENABLED off it raises
+MiddlewareNotUsed, so Django drops it from the chain and requests pay
+nothing.
+"""
+import contextvars
+import logging
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+# Statements kept per request for the slow-request log; the count and
+# timings still cover every query past the cap.
+MAX_RECORDED_QUERIES = 200
+STACK_DEPTH = 8
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Counters of one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.serializer_ms = 0.0
+        self.statements = []
+        # serializer.data can nest (a serializer building another's data);
+        # only the outermost call is timed.
+        self.serializer_depth = 0
+
+    def record_query(self, sql, params, elapsed_ms, stack=None):
+        self.queries += 1
+        self.sql_ms += elapsed_ms
+        if len(self.statements) < MAX_RECORDED_QUERIES:
+            # Formatted only if the request turns out to be slow
+            self.statements.append((sql, params, elapsed_ms, stack))
+
+    def statement_details(self):
+        return [
+            {"sql": sql, "params": repr(params), "ms": round(elapsed_ms, 2), "stack": stack or []}
+            for sql, params, elapsed_ms, stack in self.statements
+        ]
+
+
+def _app_stack():
+    """The innermost application frames (not Django, DRF or the stdlib)."""
+    frames = traceback.StackSummary.extract(traceback.walk_stack(None), lookup_lines=False)
+    app = [
+        f"{frame.filename}:{frame.lineno} in {frame.name}"
+        for frame in frames
+        if frame.filename.startswith(str(settings.BASE_DIR))
+        and 'site-packages' not in frame.filename
+        and frame.filename != __file__
+    ]
+    return app[:STACK_DEPTH]
+
+
+class _QueryTimer:
+    """Connection execute wrapper feeding the current request's metrics."""
+
+    def __init__(self, metrics, stacks=False):
+        self.metrics = metrics
+        self.stacks = stacks
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            stack = None
+            if self.stacks and len(self.metrics.statements) < MAX_RECORDED_QUERIES:
+                stack = _app_stack()
+            self.metrics.record_query(sql, params, elapsed_ms, stack)
+
+
+_serializer_data = BaseSerializer.data
+
+
+def _timed_serializer_data(self):
+    metrics = _current.get()
+    if metrics is None:
+        return _serializer_data.fget(self)
+    metrics.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        return _serializer_data.fget(self)
+    finally:
+        metrics.serializer_depth -= 1
+        if metrics.serializer_depth == 0:
+            metrics.serializer_ms += (time.perf_counter() - started) * 1000
+
+
+def _instrument_serializers():
+    """Time serializer.data; done once, and only when the middleware is enabled."""
+    if BaseSerializer.data is _serializer_data:
+        BaseSerializer.data = property(_timed_serializer_data)
+
+
+def server_timing(metrics, total_ms):
+    return ', '.join([
+        f'db;dur={metrics.sql_ms:.1f};desc="{metrics.queries} queries"',
+        f'serialize;dur={metrics.serializer_ms:.1f}',
+        f'total;dur={total_ms:.1f}',
+    ])
+
+
+class RequestMetricsMiddleware:
+    """Records SQL, serializer and wall time of each request (see module docstring)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = settings.REQUEST_METRICS_SLOW_MS
+        self.header = settings.REQUEST_METRICS_HEADER
+        self.stacks = settings.REQUEST_METRICS_STACKS
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        _instrument_serializers()
+
+    @contextmanager
+    def measure(self, metrics):
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                timer = _QueryTimer(metrics, self.stacks)
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                yield
+        finally:
+            _current.reset(token)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        started = time.perf_counter()
+        with self.measure(metrics):
+            response = self.get_response(request)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        started = time.perf_counter()
+        with self.measure(metrics):
+            response = await self.get_response(request)
+        return self.finish(request, response, metrics, started)
+
+    def finish(self, request, response, metrics, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        if self.header:
+            response['Server-Timing'] = server_timing(metrics, total_ms)
+        self.log(request, response, metrics, total_ms)
+        return response
+
+    def log(self, request, response, metrics, total_ms):
+        match = getattr(request, 'resolver_match', None)
+        user = getattr(request, 'user', None)
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "user_id": user.pk if user is not None and user.is_authenticated else None,
+            "queries": metrics.queries,
+            "sql_ms": round(metrics.sql_ms, 2),
+            "serializer_ms": round(metrics.serializer_ms, 2),
+            "total_ms": round(total_ms, 2),
+        }
+        logger.debug(
+            "%(method)s %(path)s %(status)s in %(total_ms).1f ms (%(queries)s queries, %(sql_ms).1f ms SQL)",
+            fields, extra={"metrics": fields}
+        )
+        if self.slow_ms is not None and total_ms >= self.slow_ms:
+            statements = metrics.statement_details()
+            logger.warning(
+                "Slow request: %s %s took %.1f ms (%s queries, %.1f ms SQL)\n%s",
+                request.method, request.path, total_ms, metrics.queries, metrics.sql_ms,
+                _format_statements(statements),
+                extra={"metrics": {**fields, "statements": statements}}
+            )
+
+
+def _format_statements(statements):
+    lines = []
+    for index, statement in enumerate(statements, 1):
+        lines.append(f"[{index}] {statement['ms']} ms: {statement['sql']} -- params {statement['params']}")
+        lines.extend(f"      at {frame}" for frame in statement['stack'])
+    return '\n'.join(lines)
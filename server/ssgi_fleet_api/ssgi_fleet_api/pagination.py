@@ -0,0 +1,61 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+
+class OptionalPageNumberPagination(PageNumberPagination):
+    """
+    Page-number pagination that only applies when the client asks for it.
+
+    Requests without ``page`` or ``page_size`` keep receiving the full,
+    unwrapped list, so existing clients are unaffected. Paginated requests
+    get the standard ``{count, next, previous, results}`` envelope.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.page_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class EnvelopeCursorPagination(CursorPagination):
+    """
+    Cursor pagination whose page envelope uses a configurable results key.
+
+    Cursor pages cost the same however deep the client pages, because each
+    page is a range scan from the cursor position rather than an OFFSET.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    results_key = 'results'
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            self.results_key: data,
+        })
+
+
+class OptionalEnvelopeCursorPagination(EnvelopeCursorPagination):
+    """
+    EnvelopeCursorPagination that, like OptionalPageNumberPagination, only
+    applies when the client passes ``cursor`` or ``page_size``; other
+    requests keep receiving every row.
+    """
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,133 @@
+"""
+EXPLAIN checks for the hot lookup paths.
+
+Each entry of HOT_QUERIES builds the queryset an endpoint or job runs and
+names the index it is meant to use. check_query_plans() asks the database
+for each plan and reports whether the main table is read through an index
+or scanned sequentially.
+
+Plans depend on table statistics, so the check means most on realistic
+volumes: `manage.py explain_hot_queries --rows 1000000` loads a synthetic
+fleet of that size, analyzes it, runs the check and rolls everything back.
+"""
+import re
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from assignment.models import Trips
+from request.models import Vehicle_Request
+from users.models import User
+from vehicles.models import Vehicle, VehicleDriverAssignmentHistory
+from vehicles.tasks import releasable_pool_cars
+
+
+def _sample():
+    """Ids to plug into the queries: a requester, a director, a vehicle and its driver."""
+    vehicle = Vehicle.objects.filter(assigned_driver__isnull=False).order_by('pk').first()
+    requester = Vehicle_Request.objects.order_by('requester_id').values_list('requester_id', flat=True).first()
+    director = User.objects.filter(role=User.Role.DIRECTOR, directed_departments__isnull=False).order_by('pk').first()
+    return {
+        "requester_id": requester,
+        "director_id": director.pk if director else None,
+        "vehicle_id": vehicle.pk if vehicle else None,
+        "driver_id": vehicle.assigned_driver_id if vehicle else None,
+    }
+
+
+HOT_QUERIES = {
+    # PendingRequestsAPI
+    "pending_requests": (
+        lambda s: Vehicle_Request.objects.filter(
+            status=Vehicle_Request.Status.PENDING,
+            requester__department__director_id=s["director_id"]
+        ).order_by('-created_at'),
+        "vrequest_pending_idx",
+    ),
+    # EmployeeRequestStatusView
+    "employee_requests": (
+        lambda s: Vehicle_Request.objects.filter(requester_id=s["requester_id"]).order_by('-created_at'),
+        "vrequest_requester_created_idx",
+    ),
+    # AdminAssignmentHistoryAPIView, first page
+    "admin_history": (
+        lambda s: Trips.objects.filter(status=Trips.TripStatus.COMPLETED).order_by('-end_time', '-trip_id')[:20],
+        "trips_status_end_time_idx",
+    ),
+    # rebuild_daily_usage for one month
+    "usage_rebuild": (
+        lambda s: Trips.objects.filter(
+            status=Trips.TripStatus.COMPLETED,
+            start_time__gte=timezone.now() - timedelta(days=30),
+            start_time__lt=timezone.now()
+        ),
+        "trips_status_start_time_idx",
+    ),
+    # update_pool_cars / the scheduler's release job
+    "pool_release": (
+        lambda s: releasable_pool_cars(timezone.now()),
+        "vehicle_category_status_idx",
+    ),
+    # with_assigned_date(): the open history row of a vehicle and its driver
+    "current_driver": (
+        lambda s: VehicleDriverAssignmentHistory.objects.filter(
+            vehicle_id=s["vehicle_id"],
+            driver_id=s["driver_id"],
+            unassigned_at__isnull=True
+        ),
+        "vehicle_history_open_idx",
+    ),
+    # Driver reassignment closes the driver's open history rows
+    "driver_open_history": (
+        lambda s: VehicleDriverAssignmentHistory.objects.filter(
+            driver_id=s["driver_id"],
+            unassigned_at__isnull=True
+        ),
+        "driver_history_open_idx",
+    ),
+}
+
+
+def _scans(plan, table):
+    """(sequential scan of table?, index names used in the plan)."""
+    if connection.vendor == 'postgresql':
+        seq_scan = re.search(rf'Seq Scan on {table}\b', plan) is not None
+        indexes = re.findall(r'(?:Index(?: Only)? Scan(?: Backward)? using|Bitmap Index Scan on) (\w+)', plan)
+    else:
+        # SQLite: "SCAN t" reads the whole table, "SEARCH t USING INDEX i" does not
+        seq_scan = re.search(rf'\bSCAN {table}\b(?: AS \w+)?(?! USING)\s*$', plan, re.MULTILINE) is not None
+        indexes = re.findall(r'USING (?:COVERING )?INDEX (\w+)', plan)
+    return seq_scan, indexes
+
+
+def check_query_plans(names=None):
+    """
+    EXPLAIN every hot query (or the named ones).
+
+    Returns one dict per query: name, expected index, indexes used, whether
+    the main table is scanned sequentially, ok, and the plan text.
+    """
+    sample = _sample()
+    results = []
+    for name, (build, expected) in HOT_QUERIES.items():
+        if names and name not in names:
+            continue
+        queryset = build(sample)
+        plan = queryset.explain()
+        seq_scan, indexes = _scans(plan, queryset.model._meta.db_table)
+        results.append({
+            "name": name,
+            "expected_index": expected,
+            "indexes": indexes,
+            "seq_scan": seq_scan,
+            "ok": expected in indexes and not seq_scan,
+            "plan": plan,
+        })
+    return results
+
+
+def analyze():
+    """Refresh planner statistics after loading data."""
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
@@ -2,6 +2,12 @@ from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 import os
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
+
+from ssgi_fleet_api.database import postgres_database
+from ssgi_fleet_api.logging_utils import module_levels
 
 # Load environment variables
 load_dotenv()
@@ -41,6 +47,7 @@ INSTALLED_APPS = [
     'django_filters',
     'request',
     'assignment',
+    'notifications',
     
 ]
 
@@ -48,6 +55,7 @@ AUTH_USER_MODEL = 'users.User'  # Replace default User model
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'ssgi_fleet_api.metrics.RequestMetricsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,7 +67,7 @@ MIDDLEWARE = [
 # Django REST framework and JWT settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -69,7 +77,21 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=30),
     'BLACKLIST_AFTER_ROTATION': True,
     'ROTATE_REFRESH_TOKENS': True,
+    'TOKEN_REFRESH_SERIALIZER': 'users.api.serializers.FleetTokenRefreshSerializer',
 }
+# Seconds a worker trusts token claims or its cached user without reading
+# the users table again; the longest a change to a user can take to apply
+# (at once with a shared cache, see users/authentication.py)
+USER_AUTH_CACHE_TTL = int(os.getenv('USER_AUTH_CACHE_TTL', 60))
+
+# Bloom filter checked before the refresh token blacklist table
+# (users/tokens.py): "redis" shares one bitmap between processes, "memory"
+# keeps one per process (synced through the cache, so it needs a shared one),
+# "off" queries the table on every refresh. Off without Redis.
+TOKEN_BLACKLIST_FILTER = os.getenv('TOKEN_BLACKLIST_FILTER', 'redis' if os.getenv('REDIS_URL') else 'off')
+# Blacklisted, unexpired tokens the filter is sized for, and its false positive rate
+TOKEN_BLACKLIST_FILTER_CAPACITY = int(os.getenv('TOKEN_BLACKLIST_FILTER_CAPACITY', 1_000_000))
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = float(os.getenv('TOKEN_BLACKLIST_FILTER_ERROR_RATE', 0.001))
 
 SPECTACULAR_SETTINGS = {
     'TITLE': 'SSGI Vehicle Request System API',
@@ -109,17 +131,68 @@ ASGI_APPLICATION = 'ssgi_fleet_api.asgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connection reuse, pooling and PgBouncer options are read from the
+# environment too; see ssgi_fleet_api/database.py.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': os.getenv('DB_NAME'),
-        'USER': os.getenv('DB_USER'),
-        'PASSWORD': os.getenv('DB_PASSWORD'),
-        'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT'),
-    }
+    'default': postgres_database(os.environ),
 }
 
+# The test suite, and local development with DB_ENGINE=sqlite, run against
+# SQLite. Anywhere else a missing DB_NAME is a misconfigured deployment, not
+# a reason to quietly start on an empty local file.
+if os.getenv('DB_ENGINE') == 'sqlite' or sys.argv[1:2] == ['test']:
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    }
+elif not os.getenv('DB_NAME'):
+    raise ImproperlyConfigured(
+        'DB_NAME is not set. Configure the Postgres DB_* variables, or set DB_ENGINE=sqlite '
+        'to use a local SQLite database.'
+    )
+
+
+
+# Cache
+# Redis is used when REDIS_URL is set (production); otherwise each process
+# keeps a local-memory cache, which is what the test suite runs against.
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'ssgi_fleet',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ssgi-fleet',
+        }
+    }
+
+# Dashboard response cache (see ssgi_fleet_api/cache.py)
+API_CACHE_ENABLED = os.getenv('API_CACHE_ENABLED', 'true').lower() == 'true'
+
+# Driver assignment push channel (see assignment/events.py). Defaults to Redis
+# pub/sub when REDIS_URL is set, otherwise an in-process broker.
+ASSIGNMENT_EVENTS_BROKER = os.getenv('ASSIGNMENT_EVENTS_BROKER')
+# Seconds between keepalive comments on idle event streams
+ASSIGNMENT_EVENTS_HEARTBEAT = int(os.getenv('ASSIGNMENT_EVENTS_HEARTBEAT', 15))
+
+# Per-request SQL and latency metrics (see ssgi_fleet_api/metrics.py)
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', 'true').lower() == 'true'
+# Add the Server-Timing header to responses
+REQUEST_METRICS_HEADER = os.getenv('REQUEST_METRICS_HEADER', 'true').lower() == 'true'
+# Requests at least this slow are logged with their SQL and call stacks
+REQUEST_METRICS_SLOW_MS = float(os.getenv('REQUEST_METRICS_SLOW_MS', 1000))
+# Record the application call stack of every query for those logs; a stack
+# walk per query, so only turn it on while investigating
+REQUEST_METRICS_STACKS = os.getenv('REQUEST_METRICS_STACKS', 'false').lower() == 'true'
 
 
 # Password validation
@@ -166,6 +239,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Add this for password reset link in emails
 FRONTEND_RESET_URL = os.getenv('FRONTEND_RESET_URL', 'http://localhost:3000/forgotPassword')
+FRONTEND_LOGIN_URL = os.getenv('FRONTEND_LOGIN_URL', 'http://localhost:3000/login')
 
 
 # For production/real email sending, configure Gmail SMTP:
@@ -176,3 +250,51 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')  # Set in .env or replace
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')  # Set in .env or replace
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+# Emails are queued in notifications.OutboundEmail and delivered by
+# `python manage.py send_queued_emails --loop`; a message is marked failed
+# after this many attempts.
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+# Sent and failed emails are deleted by the scheduler after this many days
+# (sent ones have their body blanked as soon as they go out)
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv('EMAIL_OUTBOX_RETENTION_DAYS', 30))
+
+
+# Logging
+# JSON lines on stdout, written by a background thread (see
+# ssgi_fleet_api/logging_utils.py). LOG_LEVEL sets the default level,
+# LOG_LEVELS overrides it per module ("vehicles=DEBUG,django.db.backends=DEBUG")
+# and LOG_DEBUG_SAMPLE_RATE keeps only that share of DEBUG records.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+
+LOGGING_CONFIG = 'ssgi_fleet_api.logging_utils.configure_logging'
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'ssgi_fleet_api.logging_utils.JsonFormatter'},
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+    },
+    'filters': {
+        'sample_debug': {
+            '()': 'ssgi_fleet_api.logging_utils.SamplingFilter',
+            'rate': float(os.getenv('LOG_DEBUG_SAMPLE_RATE', 1)),
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'stream': 'ext://sys.stdout',
+            'formatter': 'text' if LOG_FORMAT == 'text' else 'json',
+            'filters': ['sample_debug'],
+        },
+    },
+    'root': {'handlers': ['console'], 'level': 'WARNING'},
+    'loggers': {
+        name: {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False}
+        for name in ('django', 'ssgi_fleet_api', 'users', 'vehicles', 'request', 'assignment', 'notifications')
+    },
+}
+for _name, _level in module_levels(os.getenv('LOG_LEVELS')).items():
+    LOGGING['loggers'].setdefault(_name, {'handlers': ['console'], 'propagate': False})['level'] = _level
@@ -0,0 +1,168 @@
+"""
+Synthetic fleet data for benchmarks and query-plan checks.
+
+generate_fleet() writes departments, employees, directors, drivers,
+vehicles with driver history, and vehicle requests with their
+assignments and trips, in proportions close to production:
+
+- about one vehicle (and driver) per 100 requests, one employee per 50
+- most requests end assigned with a completed trip; a few are still
+  pending, approved, rejected or cancelled
+- a small share of assignments are accepted or have a trip in progress
+
+Rows are written with bulk_create in batches, so a million requests fit
+in memory. Every run uses a fresh tag in usernames, emails and plates,
+so it can be repeated against a database that already holds data.
+"""
+import random
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from assignment.models import Trips, Vehicle_Assignment
+from request.models import Vehicle_Request
+from users.models import Department, User
+from vehicles.models import Vehicle, VehicleDriverAssignmentHistory
+
+# (request status, driver status of its assignment or None, trip status or None), weight
+REQUEST_MIX = [
+    ((Vehicle_Request.Status.PENDING, None, None), 2),
+    ((Vehicle_Request.Status.APPROVED, None, None), 3),
+    ((Vehicle_Request.Status.REJECTED, None, None), 4),
+    ((Vehicle_Request.Status.CANCELLED, None, None), 3),
+    ((Vehicle_Request.Status.ASSIGNED, Vehicle_Assignment.DriverStatus.PENDING, None), 1),
+    ((Vehicle_Request.Status.ASSIGNED, Vehicle_Assignment.DriverStatus.ACCEPTED, None), 1),
+    ((Vehicle_Request.Status.ASSIGNED, Vehicle_Assignment.DriverStatus.ACCEPTED, Trips.TripStatus.STARTED), 1),
+    ((Vehicle_Request.Status.ASSIGNED, Vehicle_Assignment.DriverStatus.DECLINED, None), 2),
+    ((Vehicle_Request.Status.COMPLETED, Vehicle_Assignment.DriverStatus.COMPLETED, Trips.TripStatus.COMPLETED), 83),
+]
+
+PLACES = ["Headquarters", "Airport", "Field Station", "Ministry", "Observatory", "Warehouse", "Regional Office"]
+MAKES = [("Toyota", "Hilux"), ("Toyota", "Land Cruiser"), ("Nissan", "Patrol"), ("Hyundai", "H-1"), ("Suzuki", "Dzire")]
+
+
+def _users(role, count, tag, departments=None):
+    return [
+        User(
+            email=f"{role}{index}-{tag}@ssgi.test", username=f"{role}_{index}_{tag}",
+            first_name=role.title(), last_name=str(index), role=role,
+            department=departments[index % len(departments)] if departments else None,
+            phone_number=f"+2519{index:08d}",
+        )
+        for index in range(count)
+    ]
+
+
+@transaction.atomic
+def generate_fleet(requests=1000, batch_size=5000, seed=0, days=365):
+    """
+    Write a synthetic fleet sized by its number of vehicle requests.
+
+    Returns the number of rows written per model.
+    """
+    rng = random.Random(seed)
+    tag = uuid.uuid4().hex[:8]
+    now = timezone.now()
+    vehicle_count = max(requests // 100, 10)
+    employee_count = max(requests // 50, 10)
+    department_count = max(min(employee_count // 20, 50), 2)
+
+    departments = Department.objects.bulk_create(
+        [Department(name=f"Department {index} {tag}") for index in range(department_count)]
+    )
+    directors = User.objects.bulk_create(_users(User.Role.DIRECTOR, department_count, tag, departments))
+    for department, director in zip(departments, directors):
+        department.director = director
+    Department.objects.bulk_update(departments, ['director'])
+    employees = User.objects.bulk_create(_users(User.Role.EMPLOYEE, employee_count, tag, departments), batch_size=batch_size)
+    admin = User.objects.create_user(
+        email=f"admin-{tag}@ssgi.test", username=f"admin_{tag}", role=User.Role.ADMIN,
+        first_name="Fleet", last_name="Admin",
+    )
+    drivers = User.objects.bulk_create(_users(User.Role.DRIVER, vehicle_count, tag), batch_size=batch_size)
+
+    vehicles = Vehicle.objects.bulk_create(
+        [
+            Vehicle(
+                license_plate=f"{tag[:5]}-{index:06d}", make=make, model=model,
+                year=rng.randint(2012, 2025), fuel_type=Vehicle.FuelType.DIESEL,
+                fuel_efficiency=round(rng.uniform(6, 14), 1), capacity=rng.choice([4, 5, 7, 12]),
+                category=Vehicle.Category.POOL if index % 3 else Vehicle.Category.FIELD,
+                current_mileage=rng.randint(5000, 250000), assigned_driver=driver,
+                department=rng.choice(departments),
+            )
+            for index, (driver, (make, model)) in enumerate(
+                (driver, rng.choice(MAKES)) for driver in drivers
+            )
+        ],
+        batch_size=batch_size
+    )
+    # Two earlier drivers per vehicle, then the current one
+    history = []
+    for vehicle in vehicles:
+        for offset in (2, 1):
+            history.append(VehicleDriverAssignmentHistory(
+                vehicle=vehicle, driver=rng.choice(drivers),
+                unassigned_at=now - timedelta(days=offset * days // 3),
+            ))
+        history.append(VehicleDriverAssignmentHistory(vehicle=vehicle, driver=vehicle.assigned_driver))
+    VehicleDriverAssignmentHistory.objects.bulk_create(history, batch_size=batch_size)
+
+    mix, weights = zip(*REQUEST_MIX)
+    counts = {"requests": 0, "assignments": 0, "trips": 0}
+    for offset in range(0, requests, batch_size):
+        size = min(batch_size, requests - offset)
+        outcomes = rng.choices(mix, weights, k=size)
+        batch = []
+        for request_status, _, _ in outcomes:
+            start = now - timedelta(minutes=rng.randint(0, days * 24 * 60))
+            batch.append(Vehicle_Request(
+                requester=rng.choice(employees), pickup_location=rng.choice(PLACES),
+                destination=rng.choice(PLACES), purpose="Field work",
+                start_dateTime=start, end_dateTime=start + timedelta(hours=rng.randint(1, 48)),
+                passenger_count=rng.randint(1, 6), status=request_status,
+                urgency=rng.choice(Vehicle_Request.Urgency.values),
+            ))
+        batch = Vehicle_Request.objects.bulk_create(batch)
+
+        assignments, trip_outcomes = [], []
+        for vehicle_request, (_, driver_status, trip_status) in zip(batch, outcomes):
+            if driver_status is None:
+                continue
+            vehicle = rng.choice(vehicles)
+            assignments.append(Vehicle_Assignment(
+                request=vehicle_request, vehicle=vehicle, driver=vehicle.assigned_driver,
+                assigned_by=admin, driver_status=driver_status,
+            ))
+            trip_outcomes.append(trip_status)
+        assignments = Vehicle_Assignment.objects.bulk_create(assignments)
+
+        trips = []
+        for assignment, trip_status in zip(assignments, trip_outcomes):
+            if trip_status is None:
+                continue
+            start = assignment.request.start_dateTime
+            start_mileage = Decimal(rng.randint(5000, 250000))
+            completed = trip_status == Trips.TripStatus.COMPLETED
+            trips.append(Trips(
+                assignment=assignment, status=trip_status,
+                start_time=start, start_mileage=start_mileage,
+                end_time=assignment.request.end_dateTime if completed else None,
+                end_mileage=start_mileage + rng.randint(5, 600) if completed else None,
+            ))
+        Trips.objects.bulk_create(trips)
+
+        counts["requests"] += len(batch)
+        counts["assignments"] += len(assignments)
+        counts["trips"] += len(trips)
+
+    return {
+        "departments": len(departments),
+        "users": len(directors) + len(employees) + len(drivers) + 1,
+        "vehicles": len(vehicles),
+        "driver_history": len(history),
+        **counts,
+    }
@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
+from ssgi_fleet_api.cache import invalidate
+from .authentication import user_changed
 from .models import User, Department
 
 class UserAdminConfig(UserAdmin):
@@ -106,12 +108,18 @@ class UserAdminConfig(UserAdmin):
     is_active_icon.short_description = _('Active')
 
     def activate_users(self, request, queryset):
+        user_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(is_active=True)
+        invalidate('users')
+        user_changed(*user_ids)
         self.message_user(request, f"{updated} users activated")
     activate_users.short_description = _("Activate selected users")
 
     def deactivate_users(self, request, queryset):
+        user_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(is_active=False)
+        invalidate('users')
+        user_changed(*user_ids)
         self.message_user(request, f"{updated} users deactivated")
     deactivate_users.short_description = _("Deactivate selected users")
 
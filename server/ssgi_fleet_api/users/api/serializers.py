@@ -1,3 +1,4 @@
+import logging
 import random
 import string
 from rest_framework import serializers
@@ -7,7 +8,7 @@ from users.models import Department
 from django.utils.crypto import get_random_string
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
+from users.authentication import FleetRefreshToken
 from django.utils.text import slugify
 from django.utils import timezone
 from django.utils.crypto import get_random_string
@@ -15,7 +16,7 @@ from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.contrib.auth.tokens import default_token_generator
 
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from rest_framework import status
 
 
@@ -23,6 +24,9 @@ User = get_user_model()
 # user = User.objects.first()
 
 
+logger = logging.getLogger(__name__)
+
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def validate(self, attrs):
         # Authenticate user
@@ -55,7 +59,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
                 }
             
                 # Generate tokens manually
-            refresh = RefreshToken.for_user(self.user)
+            refresh = FleetRefreshToken.for_user(self.user)
             access = refresh.access_token
 
             # Build custom response
@@ -76,6 +80,12 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 
        
 
+class FleetTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh (and rotation) with the bloom-filtered blacklist check of FleetRefreshToken."""
+
+    token_class = FleetRefreshToken
+
+
 class DepartmentDirectorSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -167,7 +177,7 @@ class SuperAdminRegistrationSerializer(serializers.ModelSerializer):
         except serializers.ValidationError:
             raise
         except Exception as e:
-            print(f"[SuperAdminRegistrationSerializer][validate] Unexpected error: {e}")
+            logger.exception(f"[SuperAdminRegistrationSerializer][validate] Unexpected error: {e}")
             raise serializers.ValidationError({"detail": f"Server error during validation: {str(e)}"})
 
     def validate_role(self, value):
@@ -178,7 +188,7 @@ class SuperAdminRegistrationSerializer(serializers.ModelSerializer):
         except serializers.ValidationError:
             raise
         except Exception as e:
-            print(f"[SuperAdminRegistrationSerializer][validate_role] Unexpected error: {e}")
+            logger.exception(f"[SuperAdminRegistrationSerializer][validate_role] Unexpected error: {e}")
             raise serializers.ValidationError({"detail": f"Server error during role validation: {str(e)}"})
 
     def create(self, validated_data):
@@ -210,15 +220,11 @@ class SuperAdminRegistrationSerializer(serializers.ModelSerializer):
             if generate_creds:
                 user.temporary_password = temporary_password
                 user.save()
-                # Send welcome email with credentials (ensure email is sent after user is saved)
+                # Queue welcome email with credentials
                 try:
-                    # Use transaction.on_commit to ensure email is sent after DB commit
-                    from django.db import transaction
-                    def send_email():
-                        self.send_welcome_email(user.email, temporary_password)
-                    transaction.on_commit(send_email)
+                    self.send_welcome_email(user.email, temporary_password)
                 except Exception as email_exc:
-                    print(f"[SuperAdminRegistrationSerializer][create] Failed to schedule welcome email: {email_exc}")
+                    logger.exception(f"[SuperAdminRegistrationSerializer][create] Failed to queue welcome email: {email_exc}")
             if user.role == User.Role.DIRECTOR and user.department:
                 user.department.director = user
                 user.department.save()
@@ -226,16 +232,16 @@ class SuperAdminRegistrationSerializer(serializers.ModelSerializer):
         except serializers.ValidationError:
             raise
         except Exception as e:
-            print(f"[SuperAdminRegistrationSerializer][create] Unexpected error: {e}")
+            logger.exception(f"[SuperAdminRegistrationSerializer][create] Unexpected error: {e}")
             raise serializers.ValidationError({"detail": f"Server error during user creation: {str(e)}"})
 
     def send_welcome_email(self, email, temp_password):
         """
-        Sends a welcome email to the newly registered user with their credentials and instructions.
+        Queues a welcome email to the newly registered user with their credentials and instructions.
         Uses EMAIL_HOST_USER from settings or .env as the sender.
         """
         from django.conf import settings
-        from django.core.mail import send_mail
+        from notifications.outbox import enqueue_email
         subject = "Welcome to SSGI Fleet Management System"
         message = (
             f"Dear User,\n\n"
@@ -247,13 +253,7 @@ class SuperAdminRegistrationSerializer(serializers.ModelSerializer):
             f"Thank you,\nSSGI Fleet Management Team"
         )
         from_email = getattr(settings, 'EMAIL_HOST_USER', None)
-        send_mail(
-            subject,
-            message,
-            from_email,
-            [email],
-            fail_silently=False,
-        )
+        enqueue_email(subject, message, [email], from_email)
 
 class UserProfileUpdateSerializer(serializers.ModelSerializer):
     old_password = serializers.CharField(write_only=True, required=False, min_length=8)
@@ -293,7 +293,7 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
         except serializers.ValidationError:
             raise
         except Exception as e:
-            print(f"[UserProfileUpdateSerializer][validate] Unexpected error: {e}")
+            logger.exception(f"[UserProfileUpdateSerializer][validate] Unexpected error: {e}")
             raise serializers.ValidationError({"detail": f"Server error during profile validation: {str(e)}"})
 
     def update(self, instance, validated_data):
@@ -306,7 +306,7 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
                 instance.save()
             return instance
         except Exception as e:
-            print(f"[UserProfileUpdateSerializer][update] Unexpected error: {e}")
+            logger.exception(f"[UserProfileUpdateSerializer][update] Unexpected error: {e}")
             raise serializers.ValidationError({"detail": f"Server error during profile update: {str(e)}"})
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -341,14 +341,14 @@ class UserProfileSerializer(serializers.ModelSerializer):
         try:
             return super().to_representation(instance)
         except Exception as e:
-            print(f"[UserProfileSerializer][to_representation] Unexpected error: {e}")
+            logger.exception(f"[UserProfileSerializer][to_representation] Unexpected error: {e}")
             return {"detail": f"Server error during profile serialization: {str(e)}"}
 
     def update(self, instance, validated_data):
         try:
             return super().update(instance, validated_data)
         except Exception as e:
-            print(f"[UserProfileSerializer][update] Unexpected error: {e}")
+            logger.exception(f"[UserProfileSerializer][update] Unexpected error: {e}")
             raise serializers.ValidationError({"detail": f"Server error during profile update: {str(e)}"})
 
 class UserSerializer(serializers.ModelSerializer):
@@ -377,7 +377,7 @@ class UserSerializer(serializers.ModelSerializer):
         try:
             return super().to_representation(instance)
         except Exception as e:
-            print(f"[UserSerializer][to_representation] Unexpected error: {e}")
+            logger.exception(f"[UserSerializer][to_representation] Unexpected error: {e}")
             return {"detail": f"Server error during user serialization: {str(e)}"}
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -412,7 +412,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
         except serializers.ValidationError:
             raise
         except Exception as e:
-            print(f"[UserCreateSerializer][validate] Unexpected error: {e}")
+            logger.exception(f"[UserCreateSerializer][validate] Unexpected error: {e}")
             raise serializers.ValidationError({"detail": f"Server error during user validation: {str(e)}"})
 
     def create(self, validated_data):
@@ -442,7 +442,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
         except serializers.ValidationError:
             raise
         except Exception as e:
-            print(f"[UserCreateSerializer][create] Unexpected error: {e}")
+            logger.exception(f"[UserCreateSerializer][create] Unexpected error: {e}")
             raise serializers.ValidationError({"detail": f"Server error during user creation: {str(e)}"})
 
 class UserUpdateSerializer(serializers.ModelSerializer):
@@ -475,7 +475,7 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         except serializers.ValidationError:
             raise
         except Exception as e:
-            print(f"[UserUpdateSerializer][validate_role] Unexpected error: {e}")
+            logger.exception(f"[UserUpdateSerializer][validate_role] Unexpected error: {e}")
             raise serializers.ValidationError({"detail": f"Server error during role validation: {str(e)}"})
 
     def update(self, instance, validated_data):
@@ -493,7 +493,7 @@ class UserUpdateSerializer(serializers.ModelSerializer):
                     old_department.save()
             return instance
         except Exception as e:
-            print(f"[UserUpdateSerializer][update] Unexpected error: {e}")
+            logger.exception(f"[UserUpdateSerializer][update] Unexpected error: {e}")
             raise serializers.ValidationError({"detail": f"Server error during user update: {str(e)}"})
 
 class TemporaryPasswordSerializer(serializers.Serializer):
@@ -507,7 +507,7 @@ class ForgotPasswordSerializer(serializers.Serializer):
             self.user = User.objects.filter(email=value, is_active=True).first()
             return value
         except Exception as e:
-            print(f"[ForgotPasswordSerializer][validate_email] Unexpected error: {e}")
+            logger.exception(f"[ForgotPasswordSerializer][validate_email] Unexpected error: {e}")
             raise serializers.ValidationError("Unexpected error during email validation.")
 
     def save(self):
@@ -523,7 +523,7 @@ class ForgotPasswordSerializer(serializers.Serializer):
                     user.send_password_reset_email(uid, token)
             return True
         except Exception as e:
-            print(f"[ForgotPasswordSerializer][save] Unexpected error: {e}")
+            logger.exception(f"[ForgotPasswordSerializer][save] Unexpected error: {e}")
             raise serializers.ValidationError("Unexpected error during password reset process.")
 
 class ResetPasswordSerializer(serializers.Serializer):
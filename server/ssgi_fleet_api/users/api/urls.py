@@ -3,7 +3,7 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
-from .views import CustomTokenObtainPairView, SuperAdminRegistrationView,  UserProfileView, LogoutView, UserListView, UserDetailView, generate_temp_password, list_departments, ForgotPasswordAPIView, ResetPasswordAPIView
+from .views import CustomTokenObtainPairView, SuperAdminRegistrationView,  UserProfileView, LogoutView, UserListView, UserDetailView, generate_temp_password, list_departments, api_cache_stats, ForgotPasswordAPIView, ResetPasswordAPIView
 
 urlpatterns = [
     path('users/', UserListView.as_view(), name='user-list'),
@@ -16,6 +16,7 @@ urlpatterns = [
     path('superadmin/register/', SuperAdminRegistrationView.as_view(), name='superadmin-register'),
     path('auth/generate-password/', generate_temp_password, name='generate-password'),
     path('departments/', list_departments, name='list-departments'),
+    path('cache/stats/', api_cache_stats, name='api-cache-stats'),
     path('forgot-password/', ForgotPasswordAPIView.as_view(), name='forgot-password'),
     path('reset-password/', ResetPasswordAPIView.as_view(), name='reset-password'),
 ]
\ No newline at end of file
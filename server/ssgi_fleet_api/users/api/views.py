@@ -1,7 +1,7 @@
+import logging
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.shortcuts import get_object_or_404
 from rest_framework.decorators import api_view, permission_classes
@@ -11,6 +11,8 @@ from rest_framework.decorators import action
 from django.db import transaction
 
 from users.api.permissions import IsSuperAdmin
+from users.authentication import FleetRefreshToken
+from ssgi_fleet_api.cache import cached_response, cache_stats
 from users.models import User, Department
 from users.api.serializers import (
     CustomTokenObtainPairSerializer,
@@ -38,6 +40,9 @@ from users.api.docs import (
 )
 
 
+logger = logging.getLogger(__name__)
+
+
 @extend_schema(
     responses=TemporaryPasswordSerializer
 )
@@ -48,7 +53,7 @@ def generate_temp_password(request):
         password = get_random_string(8)
         return Response({'temporary_password': password})
     except Exception as e:
-        print(f"[generate_temp_password] Unexpected error: {e}")
+        logger.exception(f"[generate_temp_password] Unexpected error: {e}")
         return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
 
 class SuperAdminRegistrationView(generics.CreateAPIView):
@@ -76,21 +81,19 @@ class SuperAdminRegistrationView(generics.CreateAPIView):
                     response.data['welcome_email_sent'] = False
             return response
         except drf_serializers.ValidationError as ve:
-            print(f"[SuperAdminRegistrationView][POST] Validation error: {ve}")
+            logger.warning(f"[SuperAdminRegistrationView][POST] Validation error: {ve}")
             return Response({"detail": ve.detail}, status=400)
         except Exception as e:
-            print(f"[SuperAdminRegistrationView][POST] Unexpected error: {e}")
+            logger.exception(f"[SuperAdminRegistrationView][POST] Unexpected error: {e}")
             return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
 
     def perform_create(self, serializer):
         try:
             user = serializer.save()
             if hasattr(user, "temporary_password"):
-                print(
-                    f"Created user {user.email} with temp password: {user.temporary_password}"
-                )
+                logger.info(f"[SuperAdminRegistrationView] Created user {user.email} with a temporary password")
         except Exception as e:
-            print(f"[SuperAdminRegistrationView] Error in perform_create: {e}")
+            logger.exception(f"[SuperAdminRegistrationView] Error in perform_create: {e}")
             raise
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -103,7 +106,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
             data = serializer.validate(request.data)
             return Response(data, status=data.get('status_code', 200))
         except Exception as e:
-            print(f"[CustomTokenObtainPairView][POST] Unexpected error: {e}")
+            logger.exception(f"[CustomTokenObtainPairView][POST] Unexpected error: {e}")
             return Response({
                 "status": False,
                 "error": "validation_error",
@@ -122,7 +125,7 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
                 return UserProfileUpdateSerializer
             return UserProfileSerializer
         except Exception as e:
-            print(f"[UserProfileView] Error in get_serializer_class: {e}")
+            logger.exception(f"[UserProfileView] Error in get_serializer_class: {e}")
             # Fallback to base serializer
             return UserProfileSerializer
 
@@ -130,21 +133,21 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         try:
             return self.request.user
         except Exception as e:
-            print(f"[UserProfileView] Error in get_object: {e}")
+            logger.exception(f"[UserProfileView] Error in get_object: {e}")
             raise
 
     def retrieve(self, request, *args, **kwargs):
         try:
             return super().retrieve(request, *args, **kwargs)
         except Exception as e:
-            print(f"[UserProfileView] Error in retrieve: {e}")
+            logger.exception(f"[UserProfileView] Error in retrieve: {e}")
             return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
 
     def update(self, request, *args, **kwargs):
         try:
             return super().update(request, *args, **kwargs)
         except Exception as e:
-            print(f"[UserProfileView] Error in update: {e}")
+            logger.exception(f"[UserProfileView] Error in update: {e}")
             return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
 
 
@@ -163,7 +166,7 @@ class LogoutView(APIView):
             )
 
         try:
-            token = RefreshToken(refresh_token)
+            token = FleetRefreshToken(refresh_token)
             token.blacklist()
             return Response({"message": "Logged out"}, status=status.HTTP_200_OK)
         except Exception as e:
@@ -187,7 +190,7 @@ class UserListView(generics.ListCreateAPIView):
         try:
             return super().get(request, *args, **kwargs)
         except Exception as e:
-            print(f"[UserListView][GET] Unexpected error: {e}")
+            logger.exception(f"[UserListView][GET] Unexpected error: {e}")
             return Response({
                 "detail": "Unexpected server error while listing users.",
                 "error": str(e)
@@ -199,7 +202,7 @@ class UserListView(generics.ListCreateAPIView):
         try:
             return super().post(request, *args, **kwargs)
         except Exception as e:
-            print(f"[UserListView][POST] Unexpected error: {e}")
+            logger.exception(f"[UserListView][POST] Unexpected error: {e}")
             return Response({
                 "detail": "Unexpected server error while creating user.",
                 "error": str(e)
@@ -216,7 +219,7 @@ class UserListView(generics.ListCreateAPIView):
                 queryset = queryset.filter(role=role)
             return queryset
         except Exception as e:
-            print(f"[UserListView][get_queryset] Error: {e}")
+            logger.exception(f"[UserListView][get_queryset] Error: {e}")
             # Return empty queryset on error for safety
             return User.objects.none()
 
@@ -235,7 +238,7 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
                 return UserUpdateSerializer
             return UserSerializer
         except Exception as e:
-            print(f"[UserDetailView][get_serializer_class] Error: {e}")
+            logger.exception(f"[UserDetailView][get_serializer_class] Error: {e}")
             return UserSerializer
 
     @user_detail_docs['get']
@@ -243,7 +246,7 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
         try:
             return super().get(request, *args, **kwargs)
         except Exception as e:
-            print(f"[UserDetailView][GET] Unexpected error: {e}")
+            logger.exception(f"[UserDetailView][GET] Unexpected error: {e}")
             return Response({
                 "detail": "Unexpected server error while retrieving user.",
                 "error": str(e)
@@ -254,7 +257,7 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
         try:
             return super().put(request, *args, **kwargs)
         except Exception as e:
-            print(f"[UserDetailView][PUT] Unexpected error: {e}")
+            logger.exception(f"[UserDetailView][PUT] Unexpected error: {e}")
             return Response({
                 "detail": "Unexpected server error while updating user.",
                 "error": str(e)
@@ -265,7 +268,7 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
         try:
             return super().patch(request, *args, **kwargs)
         except Exception as e:
-            print(f"[UserDetailView][PATCH] Unexpected error: {e}")
+            logger.exception(f"[UserDetailView][PATCH] Unexpected error: {e}")
             return Response({
                 "detail": "Unexpected server error while partially updating user.",
                 "error": str(e)
@@ -296,12 +299,28 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
                 status=status.HTTP_200_OK
             )
         except Exception as e:
-            print(f"[UserDetailView][DELETE] Unexpected error: {e}")
+            logger.exception(f"[UserDetailView][DELETE] Unexpected error: {e}")
             return Response({
                 "detail": "Unexpected server error while deactivating user.",
                 "error": str(e)
             }, status=500)
 
+    def _send_restoration_email(self, user, uid, token):
+        """Queue an email telling the user their account is back and how to set a new password."""
+        from django.conf import settings
+        from notifications.outbox import enqueue_email
+        enqueue_email(
+            "Your SSGI Fleet Management account has been restored",
+            (
+                f"Dear {user.get_full_name()},\n\n"
+                f"Your account has been restored by an administrator.\n"
+                f"Please set a new password using the link below:\n"
+                f"{settings.FRONTEND_RESET_URL}?uid={uid}&token={token}\n\n"
+                f"Thank you,\nSSGI Fleet Management Team"
+            ),
+            [user.email],
+        )
+
     @user_restore_docs
     @action(detail=True, methods=['post'], url_path='restore')
     def restore(self, request, pk=None):
@@ -343,7 +362,7 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
                 status=status.HTTP_200_OK
             )
         except Exception as e:
-            print(f"[UserDetailView][RESTORE] Unexpected error: {e}")
+            logger.exception(f"[UserDetailView][RESTORE] Unexpected error: {e}")
             return Response({
                 "detail": "Unexpected server error while restoring user.",
                 "error": str(e)
@@ -362,6 +381,7 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     tags=["Departments"]
 )
 @api_view(["GET"])
+@cached_response('list-departments', namespaces=('departments', 'users'), timeout=300)
 def list_departments(request):
     """
     List all departments in the system.
@@ -372,7 +392,7 @@ def list_departments(request):
         serializer = DepartmentSerializer(departments, many=True)
         return Response(serializer.data)
     except Exception as e:
-        print(f"[list_departments] Unexpected error: {e}")
+        logger.exception(f"[list_departments] Unexpected error: {e}")
         return Response({
             "detail": "Unexpected server error while listing departments.",
             "error": str(e)
@@ -390,7 +410,7 @@ class ForgotPasswordAPIView(APIView):
             # Always return generic message for security
             return Response({"message": "If an account with that email exists, a password reset link has been sent."}, status=status.HTTP_200_OK)
         except Exception as e:
-            print(f"[ForgotPasswordAPIView][POST] Unexpected error: {e}")
+            logger.exception(f"[ForgotPasswordAPIView][POST] Unexpected error: {e}")
             return Response({
                 "detail": "Unexpected server error while requesting password reset.",
                 "error": str(e)
@@ -407,8 +427,22 @@ class ResetPasswordAPIView(APIView):
             serializer.save()
             return Response({"message": "Password has been reset successfully. You can now log in with your new password."}, status=status.HTTP_200_OK)
         except Exception as e:
-            print(f"[ResetPasswordAPIView][POST] Unexpected error: {e}")
+            logger.exception(f"[ResetPasswordAPIView][POST] Unexpected error: {e}")
             return Response({
                 "detail": "Unexpected server error while resetting password.",
                 "error": str(e)
             }, status=500)
+
+
+@extend_schema(
+    summary="Dashboard cache statistics",
+    description="Returns hit and miss counters for each cached dashboard endpoint. Only accessible to superadmins.",
+    tags=["System"],
+    responses={
+        200: OpenApiResponse(description="Counters keyed by endpoint, e.g. {\"vehicle-list\": {\"hits\": 12, \"misses\": 3}}")
+    }
+)
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated, IsSuperAdmin])
+def api_cache_stats(request):
+    return Response(cache_stats())
@@ -0,0 +1,142 @@
+"""
+JWT authentication without a user query on every request.
+
+simplejwt's JWTAuthentication loads the User row for each request, while
+most permission checks only need the user's role. Here:
+
+- Tokens issued by FleetRefreshToken.for_user() (and the access tokens
+  derived from them) carry the user's role, department_id and is_active,
+  plus `claims_at`, when those were read.
+- ClaimsJWTAuthentication builds request.user from those claims: a User
+  with every other column deferred, loaded on first access (see
+  User.refresh_from_db). Authenticated users are also kept in a small
+  in-process cache for USER_AUTH_CACHE_TTL seconds.
+
+Claims and cached users are trusted for at most USER_AUTH_CACHE_TTL
+seconds after they were read from the users table; after that the row is
+read again. So whatever the cache backend, a change to a user (deactivation
+included) reaches every worker within that time. Saving or deleting a user
+also records the time in the shared cache and drops the user from this
+process's cache. With Redis, where every worker sees that mark, the change
+applies on the user's next request.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from users.models import User
+from users.tokens import BlacklistFilterRefreshToken
+
+CHANGED_KEY = 'auth:user-changed:{}'
+CLAIM_FIELDS = ('role', 'department_id', 'is_active')
+MAX_CACHED_USERS = 10000
+
+
+def user_claims(user):
+    return {
+        'role': user.role,
+        'department_id': user.department_id,
+        'is_active': user.is_active,
+        'claims_at': time.time(),
+    }
+
+
+class FleetRefreshToken(BlacklistFilterRefreshToken):
+    """Refresh token whose access tokens carry the user's role, department and status."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, value in user_claims(user).items():
+            token[claim] = value
+        return token
+
+
+class _UserCache:
+    """Users authenticated recently by this process: {user id: (loaded at, user)}."""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id, changed_at):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            loaded_at, user = entry
+            if loaded_at <= changed_at or time.time() - loaded_at > settings.USER_AUTH_CACHE_TTL:
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+        # Each request gets its own copy; views may set attributes on request.user
+        return copy.copy(user)
+
+    def put(self, user):
+        with self.lock:
+            self.entries[user.pk] = (time.time(), user)
+            self.entries.move_to_end(user.pk)
+            while len(self.entries) > MAX_CACHED_USERS:
+                self.entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = _UserCache()
+
+
+def user_changed(*user_ids):
+    """Stop trusting cached users and token claims issued before now (see module docstring)."""
+    now = time.time()
+    timeout = int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+    cache.set_many({CHANGED_KEY.format(user_id): now for user_id in user_ids}, timeout=timeout)
+    for user_id in user_ids:
+        user_cache.discard(user_id)
+
+
+def _user_from_claims(user_id, token):
+    """A User with only the claimed fields loaded; the rest are deferred."""
+    loaded = {'id': user_id, **{claim: token[claim] for claim in CLAIM_FIELDS}}
+    # from_db() expects the values in the model's field order
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in loaded]
+    return User.from_db(None, names, [loaded[name] for name in names])
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that takes the user from token claims or a short-lived cache."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError):
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        changed_at = cache.get(CHANGED_KEY.format(user_id), 0)
+        user = user_cache.get(user_id, changed_at)
+        if user is None:
+            claims_at = validated_token.get('claims_at', 0)
+            fresh = claims_at > changed_at and time.time() - claims_at < settings.USER_AUTH_CACHE_TTL
+            if fresh and all(claim in validated_token for claim in CLAIM_FIELDS):
+                user = _user_from_claims(user_id, validated_token)
+            else:
+                user = super().get_user(validated_token)
+            user_cache.put(user)
+            user = copy.copy(user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.tokens import compact_token_blacklist
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes expired refresh tokens (and their blacklist entries) in batches and rebuilds '
+        'the blacklist bloom filter. Runs daily in the scheduler service.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Tokens deleted per transaction.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        result = compact_token_blacklist(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {result['deleted']} expired tokens; {result['outstanding']} outstanding, "
+            f"{result['blacklisted']} blacklisted remain."
+        ))
@@ -4,7 +4,6 @@ from django.db import models
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
-from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
 
@@ -156,10 +155,25 @@ class User(AbstractUser):
         self.email = self.__class__.objects.normalize_email(self.email)
         super().save(*args, **kwargs)
 
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        """
+        Load every deferred field together when one of them is first read.
+
+        Users authenticated from token claims (users/authentication.py)
+        only have their id, role, department and status loaded; without this
+        each other attribute a view reads would cost its own query.
+        """
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
 
 
     def send_welcome_email(self, temporary_password=None):
-        """Send welcome email with login credentials"""
+        """Queue welcome email with login credentials"""
+        from notifications.outbox import enqueue_email
+
         subject = str(_("Welcome to SSGI Fleet Management"))
         message_lines = [
             str(_("Hello {name},")).format(name=self.first_name),
@@ -188,12 +202,11 @@ class User(AbstractUser):
             ]
         )
 
-        send_mail(
+        enqueue_email(
             subject=subject,
             message="\n".join(message_lines),
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[self.email],
-            fail_silently=False,
         )
 
     @property
@@ -218,7 +231,9 @@ class User(AbstractUser):
         return f"{base_url}{role_paths.get(self.role, '')}"
 
     def send_password_reset_email(self, uid, token):
-        """Send a password reset email with a secure link."""
+        """Queue a password reset email with a secure link."""
+        from notifications.outbox import enqueue_email
+
         subject = str(_("Password Reset Request"))
         reset_link = f"{settings.FRONTEND_RESET_URL}?uid={uid}&token={token}"
         message_lines = [
@@ -235,10 +250,9 @@ class User(AbstractUser):
             str(_("Best regards,")),
             str(_("The SSGI Team")),
         ]
-        send_mail(
+        enqueue_email(
             subject=subject,
             message="\n".join(message_lines),
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[self.email],
-            fail_silently=False,
         )
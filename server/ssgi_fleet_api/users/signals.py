@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ssgi_fleet_api.cache import invalidate
+from users.authentication import user_changed
+from users.models import Department, User
+
+
+@receiver([post_save, post_delete], sender=Department)
+def invalidate_department_cache(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate('departments'))
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_cache(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no cached listing shows
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    transaction.on_commit(lambda: invalidate('users'))
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_authenticated_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    # After commit: a request that reloads the user before then would
+    # otherwise cache the old row again
+    user_id = instance.pk
+    transaction.on_commit(lambda: user_changed(user_id))
@@ -1,3 +1,222 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.authentication import ClaimsJWTAuthentication, FleetRefreshToken, user_cache, user_changed
+from users.models import Department, User
+from users.tokens import (
+    GENERATION_KEY, BloomFilter, MemoryBlacklistFilter, get_blacklist_filter, reset_blacklist_filter,
+)
+
+
+class ClaimsJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.department = Department.objects.create(name="Operations")
+        self.user = User.objects.create_user(
+            email="driver@ssgi.test", password="Passw0rd!", first_name="Dan", last_name="Driver",
+            role=User.Role.DRIVER, department=self.department, username="dan_driver",
+        )
+        self.auth = ClaimsJWTAuthentication()
+
+    def authenticate(self, token):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f"Bearer {token}")
+        return self.auth.authenticate(request)[0]
+
+    def test_login_tokens_carry_claims(self):
+        response = self.client.post(
+            '/api/auth/login/', {"email": "driver@ssgi.test", "password": "Passw0rd!"}, content_type='application/json'
+        )
+        access = AccessToken(response.json()["token"])
+        self.assertEqual(access["role"], User.Role.DRIVER)
+        self.assertEqual(access["department_id"], self.department.pk)
+        self.assertTrue(access["is_active"])
+
+    def test_claims_authenticate_without_queries(self):
+        token = FleetRefreshToken.for_user(self.user).access_token
+        with self.assertNumQueries(0):
+            user = self.authenticate(token)
+            self.assertEqual((user.pk, user.role, user.department_id), (self.user.pk, User.Role.DRIVER, self.department.pk))
+        # The other columns are loaded together on first use
+        with self.assertNumQueries(1):
+            self.assertEqual((user.email, user.first_name, user.username), ("driver@ssgi.test", "Dan", "dan_driver"))
+
+    def test_tokens_without_claims_are_cached(self):
+        token = AccessToken.for_user(self.user)
+        with self.assertNumQueries(1):
+            self.authenticate(token)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(token).email, "driver@ssgi.test")
+
+    def test_deactivation_applies_to_existing_tokens(self):
+        token = FleetRefreshToken.for_user(self.user).access_token
+        self.authenticate(token)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+            # Uncommitted, so still the user other requests see
+            self.assertTrue(self.authenticate(token).is_active)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_bulk_deactivation(self):
+        token = FleetRefreshToken.for_user(self.user).access_token
+        self.authenticate(token)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        user_changed(self.user.pk)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_role_change_replaces_stale_claims(self):
+        token = FleetRefreshToken.for_user(self.user).access_token
+        self.user.role = User.Role.EMPLOYEE
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate(token).role, User.Role.EMPLOYEE)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(token).role, User.Role.EMPLOYEE)
+
+    @override_settings(USER_AUTH_CACHE_TTL=0)
+    def test_old_claims_are_not_trusted(self):
+        # Deactivated where this process's cache never heard of it
+        token = FleetRefreshToken.for_user(self.user).access_token
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertNumQueries(1), self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_requests_get_their_own_copy(self):
+        token = FleetRefreshToken.for_user(self.user).access_token
+        self.authenticate(token).note = "set by a view"
+        self.assertFalse(hasattr(self.authenticate(token), "note"))
+
+# The memory filter syncs processes through the cache, so its tests use one
+# that separate processes would share
+SHARED_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'ssgi-fleet-test-cache'),
+    }
+}
+
+
+@override_settings(TOKEN_BLACKLIST_FILTER='memory', CACHES=SHARED_CACHE)
+class TokenBlacklistFilterTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        reset_blacklist_filter()
+        self.user = User.objects.create_user(
+            email="driver@ssgi.test", password="Passw0rd!", first_name="Dan", last_name="Driver",
+            role=User.Role.DRIVER, username="dan_driver",
+        )
+
+    def tearDown(self):
+        reset_blacklist_filter()
+
+    def refresh(self, token):
+        return self.client.post('/api/auth/token/refresh/', {"refresh": str(token)}, content_type='application/json')
+
+    def blacklist(self, token):
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        keys = [f"jti-{n}" for n in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(f"other-{n}" in bloom for n in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_unrevoked_tokens_are_checked_without_queries(self):
+        self.blacklist(FleetRefreshToken.for_user(self.user))
+        token = FleetRefreshToken.for_user(self.user)
+        token.check_blacklist()
+        with self.assertNumQueries(0):
+            token.check_blacklist()
+
+    def test_logout_revokes_the_refresh_token(self):
+        token = FleetRefreshToken.for_user(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/auth/logout/', {"refresh": str(token)}, content_type='application/json',
+                HTTP_AUTHORIZATION=f"Bearer {token.access_token}",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_rotation_revokes_the_old_token(self):
+        token = FleetRefreshToken.for_user(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(self.refresh(response.json()["refresh"]).status_code, 200)
+
+    def test_other_processes_see_new_revocations(self):
+        # This process blacklists through its own filter; `other` stands in
+        # for another worker's, warmed before the logout
+        token = FleetRefreshToken.for_user(self.user)
+        other = MemoryBlacklistFilter()
+        jti = token["jti"]
+        self.assertFalse(other.might_contain(jti))
+        self.blacklist(token)
+        self.assertTrue(other.might_contain(jti))
+
+    def test_evicted_marker_resyncs(self):
+        other = MemoryBlacklistFilter()
+        token = FleetRefreshToken.for_user(self.user)
+        self.assertFalse(other.might_contain(token["jti"]))
+        # Blacklisted while the marker was lost from the cache
+        BlacklistedToken.objects.create(token=token.outstand())
+        cache.delete(GENERATION_KEY)
+        self.assertTrue(other.might_contain(token["jti"]))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_memory_filter_needs_a_shared_cache(self):
+        # Other workers would never see the marker in a per-process cache
+        with self.assertRaises(ImproperlyConfigured):
+            get_blacklist_filter()
+
+    @override_settings(TOKEN_BLACKLIST_FILTER='off')
+    def test_off_checks_the_table(self):
+        token = FleetRefreshToken.for_user(self.user)
+        self.assertIsNone(get_blacklist_filter())
+        self.blacklist(token)
+        with self.assertRaises(TokenError):
+            token.check_blacklist()
+
+    def test_compaction_deletes_expired_tokens(self):
+        expired = FleetRefreshToken.for_user(self.user)
+        self.blacklist(expired)
+        OutstandingToken.objects.filter(jti=expired["jti"]).update(expires_at=timezone.now() - timedelta(days=1))
+        revoked = FleetRefreshToken.for_user(self.user)
+        self.blacklist(revoked)
+        valid = FleetRefreshToken.for_user(self.user)
+
+        out = StringIO()
+        call_command('compact_token_blacklist', '--batch-size', '1', stdout=out)
+
+        self.assertIn("Deleted 1 expired tokens", out.getvalue())
+        self.assertFalse(OutstandingToken.objects.filter(jti=expired["jti"]).exists())
+        self.assertEqual(BlacklistedToken.objects.get().token.jti, revoked["jti"])
+        # The rebuilt filter still knows the live revocation
+        self.assertTrue(get_blacklist_filter().might_contain(revoked["jti"]))
+        with self.assertRaises(TokenError):
+            revoked.check_blacklist()
+        valid.check_blacklist()
@@ -0,0 +1,283 @@
+"""
+Refresh token blacklist with a bloom filter in front of the database.
+
+simplejwt's blacklist app checks the BlacklistedToken table on every
+refresh and writes OutstandingToken/BlacklistedToken rows on every login,
+refresh rotation and logout. Almost every token checked is not
+blacklisted, so BlacklistFilterRefreshToken asks a bloom filter of the
+blacklisted token ids first and only queries the table when the filter
+answers "maybe" (a real hit or a rare false positive).
+
+The filter lives in one of two places (TOKEN_BLACKLIST_FILTER):
+
+- "redis": a bitmap in Redis shared by every process. Tokens are added
+  when their blacklisting commits. If the bitmap is missing (Redis was
+  flushed), checks go to the database until it is rebuilt.
+- "memory": a bitmap per process. Blacklisting a token writes a new
+  marker to the shared cache; a process that sees the marker change (or
+  go missing) loads the rows blacklisted since its last sync. This needs a
+  cache every process shares, so it is refused with a per-process cache
+  (LocMemCache), where other workers would never see the marker.
+
+`manage.py compact_token_blacklist` (run daily by the scheduler service)
+deletes expired tokens in batches and rebuilds the filter from what is
+left, so neither the tables nor the filter grow with time.
+"""
+import hashlib
+import logging
+import math
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = 'token-blacklist:generation'
+EPOCH_KEY = 'token-blacklist:epoch'
+REDIS_KEY = 'ssgi_fleet:token-blacklist:bloom'
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over a bytearray.
+
+    Bits are numbered from the most significant bit of the first byte,
+    as Redis numbers SETBIT offsets, so the same bytes can be stored as a
+    Redis bitmap.
+    """
+
+    def __init__(self, capacity, error_rate, data=None):
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.size += -self.size % 8
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray(data) if data is not None else bytearray(self.size // 8)
+
+    def indexes(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for index in self.indexes(key):
+            self.bits[index // 8] |= 0x80 >> (index % 8)
+
+    def __contains__(self, key):
+        return all(self.bits[index // 8] & (0x80 >> (index % 8)) for index in self.indexes(key))
+
+
+def _live_blacklist(after_id=0):
+    """(id, jti) of blacklisted tokens that have not expired, oldest first."""
+    return (
+        BlacklistedToken.objects
+        .filter(id__gt=after_id, token__expires_at__gt=timezone.now())
+        .order_by('id')
+        .values_list('id', 'token__jti')
+        .iterator(chunk_size=10000)
+    )
+
+
+def _new_filter():
+    return BloomFilter(settings.TOKEN_BLACKLIST_FILTER_CAPACITY, settings.TOKEN_BLACKLIST_FILTER_ERROR_RATE)
+
+
+def _touch(key):
+    # A fresh random value rather than a counter: if the key is evicted and
+    # set again, it cannot come back with a value a process has already seen
+    cache.set(key, uuid.uuid4().hex, timeout=None)
+
+
+class MemoryBlacklistFilter:
+    """Per-process filter, synced from the table when the shared marker changes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.state = None
+        self.last_id = 0
+
+    def might_contain(self, jti):
+        found = cache.get_many([GENERATION_KEY, EPOCH_KEY])
+        state = (found.get(GENERATION_KEY), found.get(EPOCH_KEY))
+        with self.lock:
+            if self.bloom is None or state[1] != self.state[1] or state[0] is None:
+                # First use, the tables were compacted, or the marker was
+                # evicted (a blacklisting may have gone unseen): start over
+                self.bloom, self.last_id = _new_filter(), 0
+                self.state = None
+                if state[0] is None:
+                    _touch(GENERATION_KEY)
+            if state != self.state:
+                # The markers are read before the rows, so a token
+                # blacklisted in between is loaded now or on the next check
+                for row_id, row_jti in _live_blacklist(self.last_id):
+                    self.bloom.add(row_jti)
+                    self.last_id = row_id
+                self.state = state
+            return jti in self.bloom
+
+    def add(self, jti):
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+        _touch(GENERATION_KEY)
+
+    def rebuild(self):
+        # Every process starts over from the table on its next check
+        _touch(EPOCH_KEY)
+        with self.lock:
+            self.bloom = None
+
+
+class RedisBlacklistFilter:
+    """Filter stored as a Redis bitmap, shared by every process."""
+
+    def __init__(self, url=None):
+        import redis
+
+        self.client = redis.Redis.from_url(url or settings.REDIS_URL)
+        self.shape = _new_filter()
+
+    def might_contain(self, jti):
+        try:
+            with self.client.pipeline(transaction=False) as pipe:
+                pipe.exists(REDIS_KEY)
+                for index in self.shape.indexes(jti):
+                    pipe.getbit(REDIS_KEY, index)
+                exists, *bits = pipe.execute()
+        except Exception as e:
+            logger.warning(f"[RedisBlacklistFilter] Falling back to the database: {e}")
+            return True
+        if not exists:
+            # Lost or never built: nothing can be ruled out until it is rebuilt
+            return True
+        return all(bits)
+
+    def add(self, jti):
+        try:
+            with self.client.pipeline(transaction=False) as pipe:
+                for index in self.shape.indexes(jti):
+                    pipe.setbit(REDIS_KEY, index, 1)
+                pipe.execute()
+        except Exception as e:
+            logger.exception(f"[RedisBlacklistFilter] Could not add {jti}: {e}")
+            # The bitmap no longer covers every blacklisted token; drop it so
+            # checks use the database until the next rebuild
+            try:
+                self.client.delete(REDIS_KEY)
+            except Exception as e:
+                logger.exception(f"[RedisBlacklistFilter] Could not drop the filter: {e}")
+
+    def rebuild(self):
+        bloom = _new_filter()
+        last_id = 0
+        for last_id, jti in _live_blacklist():
+            bloom.add(jti)
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.set(f'{REDIS_KEY}:next', bytes(bloom.bits))
+            pipe.rename(f'{REDIS_KEY}:next', REDIS_KEY)
+            pipe.execute()
+        # Tokens that were added to the old bitmap while this one was built
+        for _, jti in _live_blacklist(last_id):
+            self.add(jti)
+
+
+_filter = None
+_filter_lock = threading.Lock()
+
+
+def get_blacklist_filter():
+    """The configured filter, or None when TOKEN_BLACKLIST_FILTER is "off"."""
+    global _filter
+    if _filter is None:
+        with _filter_lock:
+            if _filter is None:
+                backend = settings.TOKEN_BLACKLIST_FILTER
+                if backend == 'redis':
+                    _filter = RedisBlacklistFilter()
+                elif backend == 'memory':
+                    if isinstance(caches['default'], (LocMemCache, DummyCache)):
+                        raise ImproperlyConfigured(
+                            'TOKEN_BLACKLIST_FILTER = "memory" needs a cache shared by every process; '
+                            'use "redis" or "off" with the per-process cache.'
+                        )
+                    _filter = MemoryBlacklistFilter()
+                else:
+                    return None
+    return _filter
+
+
+def reset_blacklist_filter():
+    """Forget the filter, e.g. after changing settings in tests."""
+    global _filter
+    _filter = None
+
+
+class BlacklistFilterRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check consults the bloom filter first."""
+
+    def check_blacklist(self):
+        bloom = get_blacklist_filter()
+        if bloom is not None and not bloom.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            return
+        super().check_blacklist()
+
+    def blacklist(self):
+        token = self.outstand()
+        result = BlacklistedToken.objects.get_or_create(token=token)
+        bloom = get_blacklist_filter()
+        if bloom is not None:
+            jti = self.payload[api_settings.JTI_CLAIM]
+            transaction.on_commit(lambda: bloom.add(jti))
+        return result
+
+    def outstand(self):
+        # Same as simplejwt's, without loading the user row for the foreign key
+        return OutstandingToken.objects.get_or_create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            defaults={
+                "user_id": self.payload.get(api_settings.USER_ID_CLAIM),
+                "created_at": self.current_time,
+                "token": str(self),
+                "expires_at": datetime_from_epoch(self.payload["exp"]),
+            },
+        )[0]
+
+
+def compact_token_blacklist(batch_size=5000):
+    """
+    Delete expired outstanding tokens, and with them their blacklist
+    entries, in batches of `batch_size` so no statement holds locks for
+    long, then rebuild the filter from the tokens left.
+    """
+    now = timezone.now()
+    deleted = 0
+    while True:
+        batch = list(
+            OutstandingToken.objects.filter(expires_at__lte=now).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not batch:
+            break
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=batch).delete()
+            OutstandingToken.objects.filter(id__in=batch).delete()
+        deleted += len(batch)
+
+    bloom = get_blacklist_filter()
+    if bloom is not None:
+        bloom.rebuild()
+    return {
+        "deleted": deleted,
+        "outstanding": OutstandingToken.objects.count(),
+        "blacklisted": BlacklistedToken.objects.count(),
+    }
@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import Vehicle, VehicleDriverAssignmentHistory
+from ssgi_fleet_api.cache import invalidate
+from .models import Vehicle, VehicleDriverAssignmentHistory, VehicleDailyUsage, ScheduledJobRun
 
 @admin.register(Vehicle)
 class VehicleAdmin(admin.ModelAdmin):
@@ -42,12 +44,14 @@ class VehicleAdmin(admin.ModelAdmin):
     last_service.short_description = "Last Service"
 
     def mark_as_available(self, request, queryset):
-        updated = queryset.update(status='available')
+        updated = queryset.update(status='available', updated_at=timezone.now())
+        invalidate('vehicles')
         self.message_user(request, f"{updated} vehicles marked as available")
     mark_as_available.short_description = "Mark as available"
 
     def flag_for_maintenance(self, request, queryset):
-        updated = queryset.update(status='maintenance')
+        updated = queryset.update(status='maintenance', updated_at=timezone.now())
+        invalidate('vehicles')
         self.message_user(request, f"{updated} vehicles flagged for maintenance")
     flag_for_maintenance.short_description = "Flag for maintenance"
 
@@ -55,4 +59,17 @@ class VehicleAdmin(admin.ModelAdmin):
 class VehicleDriverAssignmentHistoryAdmin(admin.ModelAdmin):
     list_display = ("vehicle", "driver", "assigned_at", "unassigned_at")
     search_fields = ("vehicle__license_plate", "driver__first_name", "driver__last_name")
-    list_filter = ("vehicle", "driver")
\ No newline at end of file
+    list_filter = ("vehicle", "driver")
+@admin.register(VehicleDailyUsage)
+class VehicleDailyUsageAdmin(admin.ModelAdmin):
+    list_display = ("vehicle", "driver", "date", "trip_count", "total_km")
+    search_fields = ("vehicle__license_plate", "driver__first_name", "driver__last_name")
+    list_filter = ("date",)
+@admin.register(ScheduledJobRun)
+class ScheduledJobRunAdmin(admin.ModelAdmin):
+    list_display = ("name", "last_finished_at", "last_duration_ms", "next_run_at", "run_count")
+    readonly_fields = (
+        "name", "last_started_at", "last_finished_at", "last_duration_ms",
+        "last_result", "last_error", "next_run_at", "run_count"
+    )
+
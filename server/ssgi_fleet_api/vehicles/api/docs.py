@@ -136,6 +136,7 @@ vehicle_list_docs = extend_schema(
       - `status`: Filter by status (available, in_use, maintenance, out_of_service)
       - `make`: Filter by manufacturer (e.g., Toyota)
       - `capacity_min`: Minimum capacity (e.g., 4)
+      - `free_from`, `free_to`: Only vehicles with no reservation overlapping this window (ISO 8601 datetimes, both required)
       - `search`: Keyword to search in license plate, make, or model
       - `category`: Filter by vehicle category (`field` or `pool`)
 
@@ -177,6 +178,18 @@ vehicle_list_docs = extend_schema(
             location=OpenApiParameter.QUERY,
             description="Minimum passenger capacity"
         ),
+        OpenApiParameter(
+            name="free_from",
+            type=OpenApiTypes.DATETIME,
+            location=OpenApiParameter.QUERY,
+            description="Start of a window the vehicle must be free for (use with free_to)"
+        ),
+        OpenApiParameter(
+            name="free_to",
+            type=OpenApiTypes.DATETIME,
+            location=OpenApiParameter.QUERY,
+            description="End of a window the vehicle must be free for (use with free_from)"
+        ),
         OpenApiParameter(
             name="search",
             type=OpenApiTypes.STR,
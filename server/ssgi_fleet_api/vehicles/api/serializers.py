@@ -1,9 +1,13 @@
+import logging
 from rest_framework import serializers
 from vehicles.models import Vehicle, VehicleDriverAssignmentHistory
 from users.models import User
 from django.db.models import Q
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
+
 class DriverNameSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -19,7 +23,7 @@ class VehicleDriverAssignmentHistorySerializer(serializers.ModelSerializer):
         try:
             return super().to_representation(instance)
         except Exception as e:
-            print(f"[VehicleDriverAssignmentHistorySerializer] Error serializing assignment history {getattr(instance, 'id', None)}: {e}")
+            logger.exception(f"[VehicleDriverAssignmentHistorySerializer] Error serializing assignment history {getattr(instance, 'id', None)}: {e}")
             return {"error": f"Failed to serialize assignment history: {str(e)}"}
 
 class VehicleSerializer(serializers.ModelSerializer):
@@ -34,13 +38,16 @@ class VehicleSerializer(serializers.ModelSerializer):
 
     def get_assigned_date(self, obj):
         try:
+            # Querysets built with Vehicle.objects.with_assigned_date() carry the value already
+            if hasattr(obj, 'current_assigned_at'):
+                return obj.current_assigned_at if obj.assigned_driver_id else None
             if obj.assigned_driver:
                 assignment = obj.driver_history.filter(driver=obj.assigned_driver, unassigned_at__isnull=True).order_by('-assigned_at').first()
                 if assignment:
                     return assignment.assigned_at
             return None
         except Exception as e:
-            print(f"[VehicleSerializer] Error in get_assigned_date for vehicle {getattr(obj, 'id', None)}: {e}")
+            logger.exception(f"[VehicleSerializer] Error in get_assigned_date for vehicle {getattr(obj, 'id', None)}: {e}")
             return None
 
     def validate_driver_id(self, value):
@@ -63,7 +70,7 @@ class VehicleSerializer(serializers.ModelSerializer):
         except serializers.ValidationError:
             raise
         except Exception as e:
-            print(f"[VehicleSerializer] Error in validate_driver_id: {e}")
+            logger.exception(f"[VehicleSerializer] Error in validate_driver_id: {e}")
             raise serializers.ValidationError({
                 "driver_id": str(e),
                 "error_code": "driver_validation_error"
@@ -79,7 +86,7 @@ class VehicleSerializer(serializers.ModelSerializer):
             )
             return vehicle
         except Exception as e:
-            print(f"[VehicleSerializer] Error in create: {e}")
+            logger.exception(f"[VehicleSerializer] Error in create: {e}")
             raise serializers.ValidationError({"detail": f"Failed to create vehicle: {str(e)}"})
 
     def update(self, instance, validated_data):
@@ -89,7 +96,7 @@ class VehicleSerializer(serializers.ModelSerializer):
             if driver_id is not None:
                 driver = self.context.get('driver')
                 # Unassign this driver from any other vehicle
-                Vehicle.objects.filter(assigned_driver=driver).exclude(id=instance.id).update(assigned_driver=None)
+                Vehicle.objects.filter(assigned_driver=driver).exclude(id=instance.id).update(assigned_driver=None, updated_at=timezone.now())
                 # Set unassigned_at for previous assignment of this driver
                 VehicleDriverAssignmentHistory.objects.filter(driver=driver, unassigned_at__isnull=True).update(unassigned_at=timezone.now())
                 # Set unassigned_at for the current vehicle's previous driver
@@ -98,14 +105,15 @@ class VehicleSerializer(serializers.ModelSerializer):
                 # Assign the driver to this vehicle and create new assignment history
                 instance.assigned_driver = driver
                 instance.save()
-                VehicleDriverAssignmentHistory.objects.create(vehicle=instance, driver=driver)
+                history = VehicleDriverAssignmentHistory.objects.create(vehicle=instance, driver=driver)
+                instance.current_assigned_at = history.assigned_at
             # Update other fields
             for attr, value in validated_data.items():
                 setattr(instance, attr, value)
             instance.save()
             return instance
         except Exception as e:
-            print(f"[VehicleSerializer] Error in update for vehicle {getattr(instance, 'id', None)}: {e}")
+            logger.exception(f"[VehicleSerializer] Error in update for vehicle {getattr(instance, 'id', None)}: {e}")
             raise serializers.ValidationError({"detail": f"Failed to update vehicle: {str(e)}"})
 
     def validate_status(self, value):
@@ -120,7 +128,7 @@ class VehicleSerializer(serializers.ModelSerializer):
         except serializers.ValidationError:
             raise
         except Exception as e:
-            print(f"[VehicleSerializer] Error in validate_status: {e}")
+            logger.exception(f"[VehicleSerializer] Error in validate_status: {e}")
             raise serializers.ValidationError({"status": str(e), "error_code": "status_validation_error"})
 
     def validate_category(self, value):
@@ -138,5 +146,5 @@ class VehicleSerializer(serializers.ModelSerializer):
         except serializers.ValidationError:
             raise
         except Exception as e:
-            print(f"[VehicleSerializer] Error in validate_category: {e}")
+            logger.exception(f"[VehicleSerializer] Error in validate_category: {e}")
             raise serializers.ValidationError({"category": str(e), "error_code": "category_validation_error"})
\ No newline at end of file
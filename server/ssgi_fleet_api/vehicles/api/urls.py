@@ -1,6 +1,6 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import AddVehicleView, ListVehiclesView, VehicleViewSet, unassigned_drivers, all_drivers, VehicleHistoryView, VehicleHistoryListView, VehicleAssignmentHistoryView
+from .views import AddVehicleView, ListVehiclesView, VehicleViewSet, unassigned_drivers, all_drivers, VehicleHistoryView, VehicleHistoryListView, VehicleAssignmentHistoryView, scheduler_status
 
 router = DefaultRouter()
 router.register(r'vehicles', VehicleViewSet, basename='vehicle')
@@ -13,5 +13,6 @@ urlpatterns = [
     path('vehicles/<int:id>/assignment-history/', VehicleAssignmentHistoryView.as_view(), name='vehicle-assignment-history'),
     path('drivers/unassigned/', unassigned_drivers, name='unassigned-drivers'),
     path('drivers/all/', all_drivers, name='all-drivers'),
+    path('scheduler/status/', scheduler_status, name='scheduler-status'),
     *router.urls,
 ]
\ No newline at end of file
@@ -1,3 +1,4 @@
+import logging
 from typing import Generic
 from rest_framework import viewsets, status, generics
 from rest_framework.decorators import action, api_view, permission_classes
@@ -5,21 +6,29 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiResponse, OpenApiParameter, OpenApiTypes
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q, Subquery
 from rest_framework.views import APIView
-from assignment.models import Trips
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from datetime import datetime
 from rest_framework.permissions import IsAdminUser
 from rest_framework.parsers import JSONParser
-from django.http import HttpResponse
-import csv
-import pandas as pd
-import io
 
-from vehicles.models import Vehicle, VehicleDriverAssignmentHistory
+from vehicles.models import ScheduledJobRun, Vehicle, VehicleDriverAssignmentHistory
+from assignment.reservations import free_vehicles
 from users.models import User
 from users.api.serializers import UserSerializer
+from ssgi_fleet_api.cache import cached_response
+from ssgi_fleet_api.conditional import conditional_list
+from ssgi_fleet_api.pagination import OptionalPageNumberPagination
+from vehicles.reports import (
+    fleet_usage_queryset,
+    fleet_usage_row,
+    vehicle_usage_total,
+    fleet_export_rows,
+    csv_export_response,
+    xlsx_export_response,
+)
 from .serializers import VehicleSerializer, VehicleDriverAssignmentHistorySerializer
 from .permissions import IsAdminOrSuperAdmin
 from .docs import (
@@ -29,6 +38,9 @@ from .docs import (
     vehicle_update_docs
 )
 
+logger = logging.getLogger(__name__)
+
+
 @extend_schema_view(post=vehicle_create_docs)
 class AddVehicleView(generics.CreateAPIView):
     """
@@ -42,7 +54,7 @@ class AddVehicleView(generics.CreateAPIView):
         try:
             return super().create(request, *args, **kwargs)
         except Exception as e:
-            print(f"[AddVehicleView] Unexpected error in create: {e}")
+            logger.exception(f"[AddVehicleView] Unexpected error in create: {e}")
             return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
 
 @extend_schema_view(get=vehicle_list_docs)
@@ -60,11 +72,15 @@ class ListVehiclesView(generics.ListAPIView):
             queryset = Vehicle.objects.select_related(
                 'assigned_driver', 
                 'department'
-            )
+            ).with_assigned_date()
             # Custom filters
             params = self.request.query_params
             if capacity := params.get('capacity_min'):
                 queryset = queryset.filter(capacity__gte=capacity)
+            free_from = parse_datetime(params.get('free_from', ''))
+            free_to = parse_datetime(params.get('free_to', ''))
+            if free_from and free_to:
+                queryset = free_vehicles(queryset, free_from, free_to)
             if search := params.get('search'):
                 queryset = queryset.filter(
                     Q(license_plate__icontains=search) |
@@ -72,15 +88,25 @@ class ListVehiclesView(generics.ListAPIView):
                     Q(model__icontains=search))
             return queryset.order_by('make', 'model')
         except Exception as e:
-            print(f"[ListVehiclesView] Unexpected error in get_queryset: {e}")
+            logger.exception(f"[ListVehiclesView] Unexpected error in get_queryset: {e}")
             # Return empty queryset on error
             return Vehicle.objects.none()
 
+    # The cache sits outside the conditional check, so cache hits answer
+    # If-None-Match from the stored ETag without running the aggregate
+    @cached_response('vehicle-list', namespaces=('vehicles', 'users'), timeout=60)
+    @conditional_list(
+        lambda view, request, *args, **kwargs: view.filter_queryset(view.get_queryset()),
+        namespaces=('vehicles', 'users')
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 class VehicleViewSet(viewsets.ModelViewSet):
     """
     Complete vehicle management endpoint
     """
-    queryset = Vehicle.objects.all()
+    queryset = Vehicle.objects.select_related('assigned_driver').with_assigned_date()
     serializer_class = VehicleSerializer
     lookup_field = 'id'
 
@@ -94,10 +120,10 @@ class VehicleViewSet(viewsets.ModelViewSet):
         try:
             return super().retrieve(request, *args, **kwargs)
         except Vehicle.DoesNotExist:
-            print(f"[VehicleViewSet] Vehicle not found for retrieve: {kwargs.get('id')}")
+            logger.warning(f"[VehicleViewSet] Vehicle not found for retrieve: {kwargs.get('id')}")
             return Response({"detail": "Vehicle not found."}, status=404)
         except Exception as e:
-            print(f"[VehicleViewSet] Unexpected error in retrieve: {e}")
+            logger.exception(f"[VehicleViewSet] Unexpected error in retrieve: {e}")
             return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
 
     @vehicle_update_docs
@@ -105,10 +131,10 @@ class VehicleViewSet(viewsets.ModelViewSet):
         try:
             return super().update(request, *args, **kwargs)
         except Vehicle.DoesNotExist:
-            print(f"[VehicleViewSet] Vehicle not found for update: {kwargs.get('id')}")
+            logger.warning(f"[VehicleViewSet] Vehicle not found for update: {kwargs.get('id')}")
             return Response({"detail": "Vehicle not found."}, status=404)
         except Exception as e:
-            print(f"[VehicleViewSet] Unexpected error in update: {e}")
+            logger.exception(f"[VehicleViewSet] Unexpected error in update: {e}")
             return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
 
     @vehicle_update_docs
@@ -116,10 +142,10 @@ class VehicleViewSet(viewsets.ModelViewSet):
         try:
             return super().partial_update(request, *args, **kwargs)
         except Vehicle.DoesNotExist:
-            print(f"[VehicleViewSet] Vehicle not found for partial_update: {kwargs.get('id')}")
+            logger.warning(f"[VehicleViewSet] Vehicle not found for partial_update: {kwargs.get('id')}")
             return Response({"detail": "Vehicle not found."}, status=404)
         except Exception as e:
-            print(f"[VehicleViewSet] Unexpected error in partial_update: {e}")
+            logger.exception(f"[VehicleViewSet] Unexpected error in partial_update: {e}")
             return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
 
     @action(detail=True, methods=['post'])
@@ -131,10 +157,10 @@ class VehicleViewSet(viewsets.ModelViewSet):
             vehicle.save()
             return Response({'status': 'maintenance scheduled'})
         except Vehicle.DoesNotExist:
-            print(f"[VehicleViewSet] Vehicle not found for maintenance: {pk}")
+            logger.warning(f"[VehicleViewSet] Vehicle not found for maintenance: {pk}")
             return Response({"detail": "Vehicle not found."}, status=404)
         except Exception as e:
-            print(f"[VehicleViewSet] Unexpected error in maintenance: {e}")
+            logger.exception(f"[VehicleViewSet] Unexpected error in maintenance: {e}")
             return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
 
     def perform_update(self, serializer):
@@ -143,7 +169,7 @@ class VehicleViewSet(viewsets.ModelViewSet):
             if 'status' in serializer.validated_data:
                 self._log_status_change(instance)
         except Exception as e:
-            print(f"[VehicleViewSet] Error in perform_update: {e}")
+            logger.exception(f"[VehicleViewSet] Error in perform_update: {e}")
             raise
 
     def _log_status_change(self, vehicle):
@@ -152,11 +178,11 @@ class VehicleViewSet(viewsets.ModelViewSet):
 
 @extend_schema(
     summary="Monthly vehicle usage report (all vehicles, filterable)",
-    description="Returns a list of all vehicles with their name, plate, driver(s), department, category, status, trip count, and total kilometers driven for the selected period (default: current month). Supports CSV export. Only accessible to admins and superadmins.",
+    description="Returns a list of all vehicles with their name, plate, driver(s), department, category, status, trip count, and total kilometers driven for the selected period (default: current month). Supports streaming CSV and Excel export. Only accessible to admins and superadmins.",
     parameters=[
         OpenApiParameter("start", OpenApiTypes.DATE, OpenApiParameter.QUERY, description="Start date (YYYY-MM-DD) for the report period. Default: first day of current month."),
         OpenApiParameter("end", OpenApiTypes.DATE, OpenApiParameter.QUERY, description="End date (YYYY-MM-DD) for the report period. Default: today."),
-        OpenApiParameter("export", OpenApiTypes.STR, OpenApiParameter.QUERY, description="If 'csv', returns a CSV file instead of JSON."),
+        OpenApiParameter("export", OpenApiTypes.STR, OpenApiParameter.QUERY, description="If 'csv', streams a CSV file; if 'excel', returns an xlsx workbook instead of JSON."),
     ],
     responses={
         200: OpenApiResponse(
@@ -188,92 +214,35 @@ class VehicleHistoryListView(APIView):
                 if start > end:
                     return Response({"detail": "Start date must be before end date."}, status=400)
             except Exception as e:
-                print(f"[VehicleHistoryListView] Invalid date format: {e}")
+                logger.warning(f"[VehicleHistoryListView] Invalid date format: {e}")
                 return Response({"detail": "Invalid date format. Use YYYY-MM-DD.", "error": str(e)}, status=400)
 
-            vehicles = Vehicle.objects.select_related('assigned_driver', 'department').all()
+            # File exports stream straight from the database cursor
+            export_format = request.query_params.get('export')
+            if export_format in ('csv', 'excel'):
+                try:
+                    rows = fleet_export_rows(start, end)
+                    if export_format == 'csv':
+                        return csv_export_response(rows, 'vehicle_history.csv')
+                    return xlsx_export_response(rows, 'vehicle_history.xlsx')
+                except Exception as ex:
+                    logger.exception(f"[VehicleHistoryListView] {export_format} export error: {ex}")
+                    return Response({"detail": "Failed to export report.", "error": str(ex)}, status=500)
+
+            vehicles = fleet_usage_queryset(start, end)
             data = []
             for vehicle in vehicles:
                 try:
-                    # All completed trips for this vehicle in the period
-                    trips = Trips.objects.filter(
-                        assignment__vehicle=vehicle,
-                        status=Trips.TripStatus.COMPLETED,
-                        start_time__gte=start,
-                        start_time__lte=end
-                    )
-                    total_km = sum([t.distance for t in trips])
-                    trip_count = trips.count()
-                    # All drivers for this vehicle in the period (from assignment history)
-                    assignments = VehicleDriverAssignmentHistory.objects.filter(
-                        vehicle=vehicle,
-                        assigned_at__lte=end
-                    ).filter(
-                        Q(unassigned_at__gte=start) | Q(unassigned_at__isnull=True)
-                    ).select_related('driver')
-                    assigned_drivers_this_period = [
-                        {
-                            "driver": f"{a.driver.first_name} {a.driver.last_name}",
-                            "assigned_at": a.assigned_at,
-                            "unassigned_at": a.unassigned_at
-                        }
-                        for a in assignments
-                    ]
-                    current_driver = vehicle.assigned_driver
-                    maintenance_due = False
-                    if vehicle.next_service_mileage and vehicle.current_mileage >= vehicle.next_service_mileage:
-                        maintenance_due = True
-                    data.append({
-                        "id": vehicle.id,
-                        "vehicle": f"{vehicle.make} {vehicle.model}",
-                        "license_plate": vehicle.license_plate,
-                        "department": vehicle.department.name if vehicle.department else None,
-                        "category": vehicle.category,
-                        "status": vehicle.status,
-                        "current_driver": f"{current_driver.first_name} {current_driver.last_name}" if current_driver else None,
-                        "assigned_drivers_this_period": assigned_drivers_this_period,
-                        "trip_count": trip_count,
-                        "total_km": total_km,
-                        "maintenance_due": maintenance_due
-                    })
+                    data.append(fleet_usage_row(vehicle))
                 except Exception as ve:
-                    print(f"[VehicleHistoryListView] Error processing vehicle {vehicle.id}: {ve}")
+                    logger.exception(f"[VehicleHistoryListView] Error processing vehicle {vehicle.id}: {ve}")
                     data.append({
                         "id": vehicle.id,
                         "error": f"Failed to process vehicle: {str(ve)}"
                     })
-            # Excel export
-            if request.query_params.get('export') == 'excel':
-                try:
-                    df = pd.DataFrame([
-                        {
-                            "Vehicle": row.get("vehicle", "N/A"),
-                            "License Plate": row.get("license_plate", "N/A"),
-                            "Department": row.get("department", "N/A"),
-                            "Category": row.get("category", "N/A"),
-                            "Current Driver": row.get("current_driver", "N/A"),
-                            "Trip Count": row.get("trip_count", 0),
-                            "Total KM": row.get("total_km", 0),
-                            "Maintenance Due": "Yes" if row.get("maintenance_due") else "No"
-                        }
-                        for row in data if not row.get('error')
-                    ])
-                    output = io.BytesIO()
-                    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                        df.to_excel(writer, index=False, sheet_name='vehicles_report')
-                    output.seek(0)
-                    response = HttpResponse(
-                        output.read(),
-                        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                    )
-                    response['Content-Disposition'] = 'attachment; filename="vehicle_history.xlsx"'
-                    return response
-                except Exception as ex:
-                    print(f"[VehicleHistoryListView] Excel export error: {ex}")
-                    return Response({"detail": "Failed to export Excel report.", "error": str(ex)}, status=500)
             return Response(data)
         except Exception as e:
-            print(f"[VehicleHistoryListView] Unexpected error: {e}")
+            logger.exception(f"[VehicleHistoryListView] Unexpected error: {e}")
             return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
 
 @extend_schema(
@@ -302,18 +271,12 @@ class VehicleHistoryView(APIView):
             try:
                 vehicle = Vehicle.objects.select_related('assigned_driver').get(id=id)
             except Vehicle.DoesNotExist:
-                print(f"[VehicleHistoryView] Vehicle not found: {id}")
+                logger.warning(f"[VehicleHistoryView] Vehicle not found: {id}")
                 return Response({"detail": "Vehicle not found."}, status=404)
             try:
                 now = timezone.now()
                 first_day = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                trips = Trips.objects.filter(
-                    assignment__vehicle=vehicle,
-                    status=Trips.TripStatus.COMPLETED,
-                    start_time__gte=first_day,
-                    start_time__lte=now
-                )
-                total_km = sum([t.distance for t in trips])
+                total_km = vehicle_usage_total(vehicle, first_day, now)
                 driver = vehicle.assigned_driver
                 return Response({
                     "vehicle": f"{vehicle.make} {vehicle.model}",
@@ -322,10 +285,10 @@ class VehicleHistoryView(APIView):
                     "total_km_this_month": total_km
                 })
             except Exception as de:
-                print(f"[VehicleHistoryView] Error processing vehicle {id}: {de}")
+                logger.exception(f"[VehicleHistoryView] Error processing vehicle {id}: {de}")
                 return Response({"detail": f"Failed to process vehicle: {str(de)}"}, status=500)
         except Exception as e:
-            print(f"[VehicleHistoryView] Unexpected error: {e}")
+            logger.exception(f"[VehicleHistoryView] Unexpected error: {e}")
             return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
 
 @extend_schema(
@@ -351,7 +314,7 @@ class VehicleAssignmentHistoryView(APIView):
             try:
                 vehicle = Vehicle.objects.get(id=id)
             except Vehicle.DoesNotExist:
-                print(f"[VehicleAssignmentHistoryView] Vehicle not found: {id}")
+                logger.warning(f"[VehicleAssignmentHistoryView] Vehicle not found: {id}")
                 return Response({"detail": "Vehicle not found."}, status=404)
             data = []
             assignments = VehicleDriverAssignmentHistory.objects.filter(vehicle=vehicle).select_related('driver').order_by('-assigned_at')
@@ -363,19 +326,41 @@ class VehicleAssignmentHistoryView(APIView):
                         "unassigned_at": a.unassigned_at
                     })
                 except Exception as de:
-                    print(f"[VehicleAssignmentHistoryView] Error processing assignment {a.id}: {de}")
+                    logger.exception(f"[VehicleAssignmentHistoryView] Error processing assignment {a.id}: {de}")
                     data.append({
                         "assignment_id": a.id,
                         "error": f"Failed to process assignment: {str(de)}"
                     })
             return Response(data)
         except Exception as e:
-            print(f"[VehicleAssignmentHistoryView] Unexpected error: {e}")
+            logger.exception(f"[VehicleAssignmentHistoryView] Unexpected error: {e}")
             return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
 
+def _driver_rows(request, drivers, build_row, log_prefix):
+    """Serialize drivers with build_row, paginating when the client asks for a page."""
+    paginator = OptionalPageNumberPagination()
+    page = paginator.paginate_queryset(drivers, request)
+    data = []
+    for d in (page if page is not None else drivers):
+        try:
+            data.append(build_row(d))
+        except Exception as de:
+            logger.exception(f"[{log_prefix}] Error processing driver {d.id}: {de}")
+            data.append({
+                "id": d.id,
+                "error": f"Failed to process driver: {str(de)}"
+            })
+    if page is not None:
+        return paginator.get_paginated_response(data)
+    return Response(data)
+
 @extend_schema(
     summary="List unassigned drivers",
-    description="Returns a list of all drivers who are not currently assigned to any vehicle. Useful for assigning drivers to vehicles. Each driver includes id, first_name, last_name, and email.",
+    description="Returns a list of all drivers who are not currently assigned to any vehicle. Useful for assigning drivers to vehicles. Each driver includes id, first_name, last_name, and email. Pass `page` and/or `page_size` to receive a paginated response.",
+    parameters=[
+        OpenApiParameter("page", OpenApiTypes.INT, OpenApiParameter.QUERY, description="Page number. When omitted (and no page_size is given) the full list is returned."),
+        OpenApiParameter("page_size", OpenApiTypes.INT, OpenApiParameter.QUERY, description="Results per page (default 50, max 200)."),
+    ],
     responses={
         200: OpenApiResponse(
             response=None,  # You can define a serializer if you want strict schema
@@ -392,31 +377,28 @@ def unassigned_drivers(request):
     Returns: [{"id": ..., "first_name": ..., "last_name": ..., "email": ...}]
     """
     try:
-        assigned_driver_ids = Vehicle.objects.exclude(assigned_driver=None).values_list("assigned_driver", flat=True)
-        drivers = User.objects.filter(role=User.Role.DRIVER, is_active=True).exclude(id__in=assigned_driver_ids)
-        data = []
-        for d in drivers:
-            try:
-                data.append({
-                    "id": d.id,
-                    "first_name": d.first_name,
-                    "last_name": d.last_name,
-                    "email": d.email
-                })
-            except Exception as de:
-                print(f"[unassigned_drivers] Error processing driver {d.id}: {de}")
-                data.append({
-                    "id": d.id,
-                    "error": f"Failed to process driver: {str(de)}"
-                })
-        return Response(data)
+        drivers = User.objects.filter(
+            role=User.Role.DRIVER, is_active=True
+        ).exclude(
+            Exists(Vehicle.objects.filter(assigned_driver=OuterRef('pk')))
+        ).order_by('-date_joined', 'id')
+        return _driver_rows(request, drivers, lambda d: {
+            "id": d.id,
+            "first_name": d.first_name,
+            "last_name": d.last_name,
+            "email": d.email
+        }, "unassigned_drivers")
     except Exception as e:
-        print(f"[unassigned_drivers] Unexpected error: {e}")
+        logger.exception(f"[unassigned_drivers] Unexpected error: {e}")
         return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
 
 @extend_schema(
     summary="List all active drivers (with assignment dates)",
-    description="Returns a list of all active drivers, their assigned vehicle (if any), and the assigned date for their current assignment.",
+    description="Returns a list of all active drivers, their assigned vehicle (if any), and the assigned date for their current assignment. Pass `page` and/or `page_size` to receive a paginated response.",
+    parameters=[
+        OpenApiParameter("page", OpenApiTypes.INT, OpenApiParameter.QUERY, description="Page number. When omitted (and no page_size is given) the full list is returned."),
+        OpenApiParameter("page_size", OpenApiTypes.INT, OpenApiParameter.QUERY, description="Results per page (default 50, max 200)."),
+    ],
     responses={
         200: OpenApiResponse(
             response=None,
@@ -427,41 +409,62 @@ def unassigned_drivers(request):
 )
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsAdminOrSuperAdmin])
+@cached_response('all-drivers', namespaces=('users', 'vehicles'), timeout=60)
 def all_drivers(request):
     """
     List all active drivers, including their current assigned vehicle (if any).
     Returns: [{"id": ..., "first_name": ..., "last_name": ..., "email": ..., "assigned_vehicle": {"id": ..., "license_plate": ...} or null, "assigned_at": ...}]
     """
     try:
-        drivers = User.objects.filter(role=User.Role.DRIVER, is_active=True)
-        data = []
-        for d in drivers:
-            try:
-                assigned_vehicle = None
-                assigned_at = None
-                vehicle = getattr(d, 'assigned_vehicles', None)
-                if vehicle and vehicle.exists():
-                    v = vehicle.first()
-                    assigned_vehicle = {"id": v.id, "license_plate": v.license_plate}
-                    # Get assignment history for this driver/vehicle
-                    assignment = v.driver_history.filter(driver=d, unassigned_at__isnull=True).order_by('-assigned_at').first()
-                    if assignment:
-                        assigned_at = assignment.assigned_at
-                data.append({
-                    "id": d.id,
-                    "first_name": d.first_name,
-                    "last_name": d.last_name,
-                    "email": d.email,
-                    "assigned_vehicle": assigned_vehicle,
-                    "assigned_at": assigned_at
-                })
-            except Exception as de:
-                print(f"[all_drivers] Error processing driver {d.id}: {de}")
-                data.append({
-                    "id": d.id,
-                    "error": f"Failed to process driver: {str(de)}"
-                })
-        return Response(data)
+        # Current vehicle and open assignment date are resolved as subqueries,
+        # so the listing is a single query however many drivers there are
+        current_vehicle = Vehicle.objects.filter(assigned_driver=OuterRef('pk')).order_by('-created_at')
+        open_assignment = VehicleDriverAssignmentHistory.objects.filter(
+            driver=OuterRef('pk'),
+            vehicle=OuterRef('current_vehicle_id'),
+            unassigned_at__isnull=True
+        ).order_by('-assigned_at')
+        drivers = User.objects.filter(
+            role=User.Role.DRIVER, is_active=True
+        ).annotate(
+            current_vehicle_id=Subquery(current_vehicle.values('id')[:1]),
+            current_vehicle_plate=Subquery(current_vehicle.values('license_plate')[:1]),
+        ).annotate(
+            current_assigned_at=Subquery(open_assignment.values('assigned_at')[:1])
+        ).order_by('-date_joined', 'id')
+        return _driver_rows(request, drivers, lambda d: {
+            "id": d.id,
+            "first_name": d.first_name,
+            "last_name": d.last_name,
+            "email": d.email,
+            "assigned_vehicle": (
+                {"id": d.current_vehicle_id, "license_plate": d.current_vehicle_plate}
+                if d.current_vehicle_id else None
+            ),
+            "assigned_at": d.current_assigned_at if d.current_vehicle_id else None
+        }, "all_drivers")
     except Exception as e:
-        print(f"[all_drivers] Unexpected error: {e}")
-        return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
\ No newline at end of file
+        logger.exception(f"[all_drivers] Unexpected error: {e}")
+        return Response({"detail": "Unexpected server error.", "error": str(e)}, status=500)
+
+
+@extend_schema(
+    summary="Scheduler status",
+    description="Last run timing and result of each job run by `manage.py run_scheduler`, and when it will run next. Only accessible to admins and superadmins.",
+    responses={
+        200: OpenApiResponse(
+            response=None,
+            description="A list of jobs [{name, last_started_at, last_finished_at, last_duration_ms, last_result, last_error, next_run_at, run_count}]"
+        )
+    },
+    tags=["System"]
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdminOrSuperAdmin])
+def scheduler_status(request):
+    jobs = ScheduledJobRun.objects.values(
+        "name", "last_started_at", "last_finished_at", "last_duration_ms",
+        "last_result", "last_error", "next_run_at", "run_count"
+    )
+    return Response(list(jobs), status=status.HTTP_200_OK)
+
@@ -0,0 +1,83 @@
+import copy
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import load_backend
+
+from ssgi_fleet_api.benchmarks import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures what one request\'s database access costs with a new connection per request, '
+        'a persistent connection (CONN_MAX_AGE with health checks) and the psycopg pool, '
+        'against the configured database. See ssgi_fleet_api/database.py.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Simulated requests per setup.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to connect to.')
+
+    def handle(self, *args, **options):
+        base = connections[options['database']].settings_dict
+        setups = [
+            ('new connection', {'CONN_MAX_AGE': 0}, False),
+            ('persistent', {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True}, False),
+        ]
+        if base['ENGINE'] == 'django.db.backends.postgresql' and self.pool_available():
+            setups.append(('pool', {'CONN_MAX_AGE': 0}, True))
+        else:
+            self.stdout.write('Skipping the pool: it needs Postgres and psycopg 3 with psycopg_pool.')
+
+        results = {}
+        for name, overrides, pool in setups:
+            settings_dict = copy.deepcopy(base)
+            settings_dict.update(overrides)
+            settings_dict['OPTIONS'] = {key: value for key, value in settings_dict['OPTIONS'].items() if key != 'pool'}
+            if pool:
+                settings_dict['OPTIONS']['pool'] = base['OPTIONS'].get('pool') or True
+            results[name] = self.measure(settings_dict, f'benchmark-{name.replace(" ", "-")}', options['requests'])
+
+        baseline = statistics.fmean(results['new connection'])
+        for name, timings in results.items():
+            mean = statistics.fmean(timings)
+            self.stdout.write(
+                f"{name:15} mean {mean:7.2f} ms  p50 {percentile(timings, 0.5):7.2f} ms  "
+                f"p95 {percentile(timings, 0.95):7.2f} ms  first {timings[0]:7.2f} ms  "
+                f"({baseline / mean:.1f}x vs new connection)"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['requests']} requests per setup against {base['ENGINE'].rsplit('.', 1)[-1]} "
+            f"at {base.get('HOST') or base['NAME']}"
+        ))
+
+    def pool_available(self):
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def measure(self, settings_dict, alias, requests):
+        """
+        Milliseconds per simulated request: the request_started and
+        request_finished connection handling Django does, around one query.
+        """
+        wrapper = load_backend(settings_dict['ENGINE']).DatabaseWrapper(settings_dict, alias)
+        timings = []
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                wrapper.close_if_unusable_or_obsolete()
+                with wrapper.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                wrapper.close_if_unusable_or_obsolete()
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            wrapper.close()
+            if settings_dict['OPTIONS'].get('pool'):
+                wrapper.close_pool()
+        return timings
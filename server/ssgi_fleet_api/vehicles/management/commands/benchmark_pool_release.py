@@ -0,0 +1,101 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from assignment.models import Trips, Vehicle_Assignment
+from request.models import Vehicle_Request
+from users.models import User
+from vehicles.models import Vehicle
+from vehicles.tasks import update_pool_cars
+
+
+class Command(BaseCommand):
+    help = (
+        'Times update_pool_cars on a synthetic fleet of in-use pool cars, a share of them still '
+        'held by accepted assignments or started trips. Everything is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vehicles', type=int, default=10000, help='Pool cars in the synthetic fleet.')
+        parser.add_argument('--busy-ratio', type=float, default=0.3, help='Share of cars with an open assignment.')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs; the fleet is reset before each.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per bulk insert.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            vehicle_ids = self.build_fleet(options)
+            timings = []
+            for _ in range(options['repeat']):
+                Vehicle.objects.filter(pk__in=vehicle_ids).update(status=Vehicle.Status.IN_USE)
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    report = update_pool_cars()
+                    timings.append((time.perf_counter() - started) * 1000)
+            transaction.set_rollback(True)
+
+        reasons = {}
+        for item in report['skipped']:
+            reasons[item['reason']] = reasons.get(item['reason'], 0) + 1
+        self.stdout.write(
+            f"{options['vehicles']} pool cars: released {len(report['released'])}, "
+            f"skipped {len(report['skipped'])} {reasons}"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"update_pool_cars: best {min(timings):.1f} ms, worst {max(timings):.1f} ms "
+                f"over {len(timings)} runs, {len(queries)} queries per run ({connection.vendor})"
+            )
+        )
+
+    def build_fleet(self, options):
+        """Create the synthetic fleet; half of the busy cars also have a trip under way."""
+        tag = uuid.uuid4().hex[:8]
+        batch_size = options['batch_size']
+        requester, admin, driver = (
+            User.objects.create_user(email=f"bench-{role}-{tag}@ssgi.test", username=f"bench_{role}_{tag}", role=role)
+            for role in (User.Role.EMPLOYEE, User.Role.ADMIN, User.Role.DRIVER)
+        )
+        vehicles = Vehicle.objects.bulk_create(
+            [
+                Vehicle(
+                    license_plate=f"B{tag[:4]}-{index:05d}", make="Toyota", model="Corolla", year=2020,
+                    fuel_type=Vehicle.FuelType.PETROL, category=Vehicle.Category.POOL,
+                    status=Vehicle.Status.IN_USE,
+                )
+                for index in range(options['vehicles'])
+            ],
+            batch_size=batch_size
+        )
+        busy = vehicles[:int(len(vehicles) * options['busy_ratio'])]
+        requests = Vehicle_Request.objects.bulk_create(
+            [
+                Vehicle_Request(
+                    requester=requester, pickup_location="HQ", destination="Site", purpose="Benchmark",
+                    passenger_count=1, status=Vehicle_Request.Status.APPROVED,
+                )
+                for _ in busy
+            ],
+            batch_size=batch_size
+        )
+        assignments = Vehicle_Assignment.objects.bulk_create(
+            [
+                Vehicle_Assignment(
+                    request=vehicle_request, vehicle=vehicle, driver=driver, assigned_by=admin,
+                    driver_status=Vehicle_Assignment.DriverStatus.ACCEPTED,
+                )
+                for vehicle_request, vehicle in zip(requests, busy)
+            ],
+            batch_size=batch_size
+        )
+        Trips.objects.bulk_create(
+            [
+                Trips(assignment=assignment, start_mileage=0, start_time=timezone.now(), status=Trips.TripStatus.STARTED)
+                for assignment in assignments[::2]
+            ],
+            batch_size=batch_size
+        )
+        return [vehicle.pk for vehicle in vehicles]
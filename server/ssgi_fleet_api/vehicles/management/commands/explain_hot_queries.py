@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from ssgi_fleet_api.query_plans import HOT_QUERIES, analyze, check_query_plans
+from ssgi_fleet_api.synthetic import generate_fleet
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAINs the hot request, trip and vehicle lookups and fails if one of them does not use '
+        'its index. With --rows, a synthetic fleet of that many requests is loaded first and rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=0, help='Synthetic vehicle requests to load before explaining.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows written per bulk insert.')
+        parser.add_argument('--query', action='append', choices=sorted(HOT_QUERIES), help='Only check this query (repeatable).')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not just the failing ones.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['rows']:
+                counts = generate_fleet(options['rows'], batch_size=options['batch_size'])
+                self.stdout.write(f"Loaded {counts}")
+                analyze()
+            results = check_query_plans(options['query'])
+            transaction.set_rollback(True)
+
+        for result in results:
+            label = 'ok' if result['ok'] else 'FAIL'
+            used = ', '.join(result['indexes']) or 'no index'
+            self.stdout.write(f"[{label}] {result['name']}: expects {result['expected_index']}, uses {used}")
+            if not result['ok'] or options['verbose_plans']:
+                self.stdout.write('    ' + result['plan'].replace('\n', '\n    '))
+
+        failed = [result['name'] for result in results if not result['ok']]
+        if failed:
+            raise CommandError(f"Hot queries not using their index on {connection.vendor}: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS(f"All {len(results)} hot queries use their index ({connection.vendor})."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from ssgi_fleet_api.cache import invalidate
+from ssgi_fleet_api.synthetic import generate_fleet
+from vehicles.reports import rebuild_daily_usage
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates a synthetic fleet (departments, users, vehicles, driver history, requests, '
+        'assignments and trips) sized by the number of vehicle requests, for benchmarks and load tests.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10000, help='Vehicle requests to generate; everything else scales with it.')
+        parser.add_argument('--days', type=int, default=365, help='Spread request and trip times over this many past days.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for reproducible datasets.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows written per bulk insert.')
+
+    def handle(self, *args, **options):
+        counts = generate_fleet(
+            options['requests'], batch_size=options['batch_size'], seed=options['seed'], days=options['days']
+        )
+        # Fleet reports read the daily usage rollup, not the trips
+        counts['daily_usage'] = rebuild_daily_usage(batch_size=options['batch_size'])
+        invalidate('vehicles', 'users', 'departments')
+        self.stdout.write(self.style.SUCCESS(
+            'Generated ' + ', '.join(f'{count} {name}' for name, count in counts.items()) + '.'
+        ))
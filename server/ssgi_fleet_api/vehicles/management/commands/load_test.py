@@ -0,0 +1,111 @@
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ssgi_fleet_api.benchmarks import percentile
+from users.models import User
+
+DEFAULT_PATHS = [
+    '/api/vehicles/vehicles/list/',
+    '/api/assignments/admin/history/?page_size=50',
+    '/api/auth/profile/',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-tests a running server: --concurrency clients, each on its own keep-alive '
+        'connection, request the given paths as fast as they are answered for --duration '
+        'seconds. Reports throughput and latency percentiles, e.g. to compare the worker '
+        'models in server/gunicorn.conf.py.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server under test.')
+        parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable); defaults to the dashboard lists.')
+        parser.add_argument('--user', help='Email of the user to authenticate as (default: the first admin).')
+        parser.add_argument('--concurrency', type=int, default=200, help='Simultaneous clients.')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run.')
+        parser.add_argument('--output', help='Also write the results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(email=options['user']) if options['user'] else User.objects.filter(role=User.Role.ADMIN)
+        user = users.order_by('pk').first()
+        if user is None:
+            raise CommandError('No user to authenticate as; pass --user or create an admin.')
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}', 'Connection': 'keep-alive'}
+        target = urlsplit(options['url'])
+        paths = options['paths'] or DEFAULT_PATHS
+
+        samples, errors = [], []
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def client(offset):
+            connection, latencies, failures = None, [], []
+            index = offset
+            while time.monotonic() < deadline:
+                path = paths[index % len(paths)]
+                index += 1
+                started = time.perf_counter()
+                try:
+                    if connection is None:
+                        connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=60)
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status >= 400:
+                        failures.append(f'{path}: HTTP {response.status}')
+                    elif response.will_close:
+                        connection.close()
+                        connection = None
+                except (OSError, http.client.HTTPException) as e:
+                    failures.append(f'{path}: {e.__class__.__name__}')
+                    if connection is not None:
+                        connection.close()
+                    connection = None
+                latencies.append((time.perf_counter() - started) * 1000)
+            if connection is not None:
+                connection.close()
+            with lock:
+                samples.extend(latencies)
+                errors.extend(failures)
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=client, args=(n,), daemon=True) for n in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        if not samples:
+            raise CommandError('No requests completed.')
+        results = {
+            "url": options['url'],
+            "paths": paths,
+            "concurrency": options['concurrency'],
+            "duration_s": round(elapsed, 2),
+            "requests": len(samples),
+            "errors": len(errors),
+            "requests_per_s": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(samples, 0.50), 1),
+            "p95_ms": round(percentile(samples, 0.95), 1),
+            "p99_ms": round(percentile(samples, 0.99), 1),
+            "max_ms": round(max(samples), 1),
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+        for error in sorted(set(errors))[:10]:
+            self.stderr.write(f"  {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{results['requests']} requests in {results['duration_s']} s with {results['concurrency']} clients: "
+            f"{results['requests_per_s']} req/s, p50 {results['p50_ms']} ms, p95 {results['p95_ms']} ms, "
+            f"p99 {results['p99_ms']} ms, {results['errors']} errors"
+        ))
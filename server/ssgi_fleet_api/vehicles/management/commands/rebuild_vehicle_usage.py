@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from vehicles.reports import rebuild_daily_usage
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the per-vehicle daily usage rollup from completed trips (all days, or the given date range).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD).')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD).')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per bulk insert.')
+
+    def handle(self, *args, **options):
+        try:
+            start = datetime.strptime(options['start'], '%Y-%m-%d').date() if options['start'] else None
+            end = datetime.strptime(options['end'], '%Y-%m-%d').date() if options['end'] else None
+        except ValueError:
+            raise CommandError('Invalid date format. Use YYYY-MM-DD.')
+        if start and end and start > end:
+            raise CommandError('Start date must be before end date.')
+
+        written = rebuild_daily_usage(start, end, batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {written} vehicle usage rows.')
+        )
@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ssgi_fleet_api.benchmarks import compare, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the main API workflows through the test client against the configured database '
+        '(all writes are rolled back) and writes latency percentiles and query counts as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Times each write workflow runs.')
+        parser.add_argument('--reads', type=int, help='Times each read-only page is requested (default: --iterations).')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout.')
+        parser.add_argument('--baseline', help='Earlier results file to compare against; regressions fail the command.')
+        parser.add_argument('--threshold', type=float, default=0.2, help='Allowed p95 slowdown against the baseline (0.2 = 20%%).')
+
+    def handle(self, *args, **options):
+        results = run_benchmarks(iterations=options['iterations'], reads=options['reads'])
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+        for name, summary in results['endpoints'].items():
+            self.stderr.write(
+                f"{name:16} p50 {summary['p50_ms']:8.1f} ms  p95 {summary['p95_ms']:8.1f} ms  "
+                f"queries {summary['queries_mean']:5.1f}  errors {summary['errors']}"
+            )
+        if any(summary['errors'] for summary in results['endpoints'].values()):
+            raise CommandError('Some benchmark requests failed; see the log above.')
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                regressions = compare(json.load(f), results, options['threshold'])
+            if regressions:
+                raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+            self.stderr.write(self.style.SUCCESS('No regressions against the baseline.'))
@@ -0,0 +1,55 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from notifications.outbox import purge_old_emails
+from users.tokens import compact_token_blacklist
+from vehicles.models import ScheduledJobRun
+from vehicles.scheduler import next_pool_release_at, release_due_pool_cars, run_job
+
+# Housekeeping run once a day: expired refresh tokens, old outbound emails
+DAILY_JOBS = {
+    'compact_token_blacklist': compact_token_blacklist,
+    'purge_old_emails': purge_old_emails,
+}
+DAILY = timedelta(days=1)
+
+
+class Command(BaseCommand):
+    help = 'Runs scheduled fleet jobs in one long-lived process, waking when the next pool car booking ends.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run the jobs once and exit.')
+        parser.add_argument(
+            '--max-sleep', type=float, default=120,
+            help='Longest wait in seconds between runs, so bookings made while asleep are still picked up.'
+        )
+
+    def handle(self, *args, **options):
+        max_sleep = timedelta(seconds=options['max_sleep'])
+        while True:
+            close_old_connections()
+            result = run_job('release_pool_cars', release_due_pool_cars)
+            if result.get('released'):
+                self.stdout.write(
+                    f"[{timezone.now()}] Released {len(result['released'])} pool cars: {', '.join(result['released'])}"
+                )
+
+            now = timezone.now()
+            last_runs = dict(
+                ScheduledJobRun.objects.filter(name__in=DAILY_JOBS).values_list('name', 'last_started_at')
+            )
+            for name, job in DAILY_JOBS.items():
+                if last_runs.get(name) is None or now - last_runs[name] >= DAILY:
+                    run_job(name, job)
+
+            now = timezone.now()
+            next_release = next_pool_release_at(now)
+            wake_at = min(next_release, now + max_sleep) if next_release else now + max_sleep
+            ScheduledJobRun.objects.filter(name='release_pool_cars').update(next_run_at=wake_at)
+            if options['once']:
+                break
+            time.sleep(max((wake_at - timezone.now()).total_seconds(), 1))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-17 23:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0005_vehicledriverassignmenthistory'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VehicleDailyUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Day the trips started on')),
+                ('trip_count', models.PositiveIntegerField(default=0)),
+                ('total_km', models.DecimalField(decimal_places=1, default=0, help_text='Total kilometers driven on this day', max_digits=14)),
+                ('driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_vehicle_usage', to=settings.AUTH_USER_MODEL)),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_usage', to='vehicles.vehicle')),
+            ],
+            options={
+                'verbose_name': 'Vehicle Daily Usage',
+                'verbose_name_plural': 'Vehicle Daily Usage',
+                'indexes': [models.Index(fields=['date', 'vehicle'], name='vehicles_ve_date_34d316_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vehicle', 'driver', 'date'), name='unique_vehicle_driver_day')],
+            },
+        ),
+    ]
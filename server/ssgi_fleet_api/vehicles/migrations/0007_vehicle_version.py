@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 23:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0006_vehicledailyusage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Incremented on every change, for optimistic concurrency checks'),
+        ),
+    ]
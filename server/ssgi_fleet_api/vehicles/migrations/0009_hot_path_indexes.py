@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 00:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_alter_user_username'),
+        ('vehicles', '0008_scheduledjobrun'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['category', 'status'], name='vehicle_category_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicledriverassignmenthistory',
+            index=models.Index(condition=models.Q(('unassigned_at__isnull', True)), fields=['vehicle', 'driver'], name='vehicle_history_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicledriverassignmenthistory',
+            index=models.Index(condition=models.Q(('unassigned_at__isnull', True)), fields=['driver'], name='driver_history_open_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_usage(apps, schema_editor):
+    """
+    Fill VehicleDailyUsage from the completed trips recorded before it
+    existed; fleet reports read only the rollup. Same computation as
+    vehicles.reports.rebuild_daily_usage, on the historical models.
+    """
+    Trips = apps.get_model('assignment', 'Trips')
+    VehicleDailyUsage = apps.get_model('vehicles', 'VehicleDailyUsage')
+
+    VehicleDailyUsage.objects.all().delete()
+    distance = ExpressionWrapper(
+        F('end_mileage') - F('start_mileage'),
+        output_field=DecimalField(max_digits=12, decimal_places=1),
+    )
+    grouped = Trips.objects.filter(status='Completed').annotate(
+        day=TruncDate('start_time')
+    ).values(
+        'assignment__vehicle_id', 'assignment__driver_id', 'day'
+    ).annotate(
+        trips=Count('trip_id'),
+        km=Sum(distance),
+    ).order_by()
+
+    batch = []
+    for row in grouped.iterator(chunk_size=1000):
+        batch.append(VehicleDailyUsage(
+            vehicle_id=row['assignment__vehicle_id'],
+            driver_id=row['assignment__driver_id'],
+            date=row['day'],
+            trip_count=row['trips'],
+            total_km=row['km'] or 0,
+        ))
+        if len(batch) >= 1000:
+            VehicleDailyUsage.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        VehicleDailyUsage.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignment', '0009_hot_path_indexes'),
+        ('vehicles', '0009_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_daily_usage, migrations.RunPython.noop),
+    ]
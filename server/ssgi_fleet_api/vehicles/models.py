@@ -1,7 +1,45 @@
 from django.db import models
+from django.utils import timezone
 from users.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+class VehicleQuerySet(models.QuerySet):
+    def with_assigned_date(self):
+        """
+        Annotate current_assigned_at: when the current driver's open
+        assignment history row started (None when there is no driver).
+
+        VehicleSerializer reads the annotation when it is present, so
+        listing vehicles does not need a history query per row.
+        """
+        open_assignment = VehicleDriverAssignmentHistory.objects.filter(
+            vehicle=models.OuterRef('pk'),
+            driver=models.OuterRef('assigned_driver'),
+            unassigned_at__isnull=True
+        ).order_by('-assigned_at')
+        return self.annotate(
+            current_assigned_at=models.Subquery(open_assignment.values('assigned_at')[:1])
+        )
+
+    def claim_for_assignment(self, vehicle, expected_version):
+        """
+        Mark an AVAILABLE vehicle IN_USE if nobody changed it since it was read.
+
+        A single conditional UPDATE guarded by the version column and the
+        status, so two concurrent assignments cannot both succeed even on
+        databases without row locks. Returns True if this caller won.
+        """
+        return self.filter(
+            pk=vehicle.pk,
+            version=expected_version,
+            status=Vehicle.Status.AVAILABLE
+        ).update(
+            status=Vehicle.Status.IN_USE,
+            version=models.F('version') + 1,
+            updated_at=timezone.now()
+        ) == 1
+
+
 class Vehicle(models.Model):
     class Status(models.TextChoices):
         AVAILABLE = 'available', 'Available'
@@ -68,12 +106,31 @@ class Vehicle(models.Model):
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Incremented on every change, for optimistic concurrency checks"
+    )
+
+    objects = VehicleQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.make} {self.model} ({self.license_plate})"
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'version' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'version']
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Pool car release and category/status listings
+            models.Index(fields=['category', 'status'], name='vehicle_category_status_idx'),
+        ]
 
 class VehicleDriverAssignmentHistory(models.Model):
     vehicle = models.ForeignKey('Vehicle', on_delete=models.CASCADE, related_name='driver_history')
@@ -83,3 +140,89 @@ class VehicleDriverAssignmentHistory(models.Model):
 
     def __str__(self):
         return f"{self.driver} assigned to {self.vehicle} from {self.assigned_at} to {self.unassigned_at or 'present'}"
+
+    class Meta:
+        indexes = [
+            # The current driver of a vehicle (and vehicle of a driver): open rows only
+            models.Index(
+                fields=['vehicle', 'driver'],
+                condition=models.Q(unassigned_at__isnull=True),
+                name='vehicle_history_open_idx'
+            ),
+            models.Index(
+                fields=['driver'],
+                condition=models.Q(unassigned_at__isnull=True),
+                name='driver_history_open_idx'
+            ),
+        ]
+
+
+class VehicleDailyUsage(models.Model):
+    """
+    Per-vehicle, per-driver, per-day rollup of completed trips.
+
+    Fleet reports read these rows instead of scanning every trip. Rows are
+    kept current by record_trip() when a trip completes and can be rebuilt
+    from the trip table with the rebuild_vehicle_usage command.
+    """
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='daily_usage')
+    driver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_vehicle_usage')
+    date = models.DateField(help_text="Day the trips started on")
+    trip_count = models.PositiveIntegerField(default=0)
+    total_km = models.DecimalField(
+        max_digits=14,
+        decimal_places=1,
+        default=0,
+        help_text="Total kilometers driven on this day"
+    )
+
+    class Meta:
+        verbose_name = 'Vehicle Daily Usage'
+        verbose_name_plural = 'Vehicle Daily Usage'
+        constraints = [
+            models.UniqueConstraint(fields=['vehicle', 'driver', 'date'], name='unique_vehicle_driver_day')
+        ]
+        indexes = [
+            models.Index(fields=['date', 'vehicle'])
+        ]
+
+    def __str__(self):
+        return f"{self.vehicle} on {self.date}: {self.trip_count} trips, {self.total_km} km"
+
+    @classmethod
+    def record_trip(cls, trip):
+        """Add a completed trip to its vehicle/driver/day rollup row."""
+        assignment = trip.assignment
+        usage, _ = cls.objects.get_or_create(
+            vehicle_id=assignment.vehicle_id,
+            driver_id=assignment.driver_id,
+            date=timezone.localdate(trip.start_time),
+        )
+        cls.objects.filter(pk=usage.pk).update(
+            trip_count=models.F('trip_count') + 1,
+            total_km=models.F('total_km') + (trip.end_mileage - trip.start_mileage),
+        )
+
+
+class ScheduledJobRun(models.Model):
+    """
+    Timing of the last run of each run_scheduler job.
+
+    One row per job, updated in place, so admins can see when a job last
+    ran, how long it took, what it did and when it will run next.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_finished_at = models.DateTimeField(null=True, blank=True)
+    last_duration_ms = models.PositiveIntegerField(default=0)
+    last_result = models.JSONField(default=dict, blank=True)
+    last_error = models.TextField(blank=True)
+    next_run_at = models.DateTimeField(null=True, blank=True)
+    run_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} (last run {self.last_finished_at})"
+
+    class Meta:
+        ordering = ['name']
+
@@ -0,0 +1,218 @@
+import csv
+import tempfile
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Prefetch, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from openpyxl import Workbook
+
+from assignment.models import Trips
+from vehicles.models import Vehicle, VehicleDailyUsage, VehicleDriverAssignmentHistory
+
+
+def fleet_usage_queryset(start, end):
+    """
+    Vehicles annotated with their usage for the period [start, end].
+
+    Each vehicle carries:
+    - trip_count: number of completed trips started in the period
+    - total_km: kilometers driven on those trips
+    - period_assignments: driver history rows overlapping the period
+
+    Usage is summed from the VehicleDailyUsage rollup, so the cost grows
+    with days x vehicles rather than with the number of trips. The whole
+    report takes a fixed number of queries (one for the vehicles and their
+    aggregates, one for the driver history prefetch) regardless of fleet size.
+    """
+    in_period = Q(
+        daily_usage__date__gte=timezone.localtime(start).date(),
+        daily_usage__date__lte=timezone.localtime(end).date(),
+    )
+    period_history = VehicleDriverAssignmentHistory.objects.filter(
+        assigned_at__lte=end
+    ).filter(
+        Q(unassigned_at__gte=start) | Q(unassigned_at__isnull=True)
+    ).select_related('driver')
+
+    return Vehicle.objects.select_related(
+        'assigned_driver', 'department'
+    ).annotate(
+        trip_count=Coalesce(Sum('daily_usage__trip_count', filter=in_period), 0),
+        total_km=Coalesce(
+            Sum('daily_usage__total_km', filter=in_period),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=14, decimal_places=1),
+        ),
+    ).prefetch_related(
+        Prefetch('driver_history', queryset=period_history, to_attr='period_assignments')
+    )
+
+
+def vehicle_usage_total(vehicle, start, end):
+    """Total kilometers a single vehicle drove between start and end."""
+    total = VehicleDailyUsage.objects.filter(
+        vehicle=vehicle,
+        date__gte=timezone.localtime(start).date(),
+        date__lte=timezone.localtime(end).date(),
+    ).aggregate(total_km=Sum('total_km'))['total_km']
+    return float(total or 0)
+
+
+@transaction.atomic
+def rebuild_daily_usage(start_date=None, end_date=None, batch_size=1000):
+    """
+    Recompute VehicleDailyUsage from completed trips.
+
+    Rows in the optional [start_date, end_date] window are deleted and
+    regenerated with a single grouped query over Trips. Returns the number
+    of rollup rows written.
+    """
+    rollups = VehicleDailyUsage.objects.all()
+    trips = Trips.objects.filter(status=Trips.TripStatus.COMPLETED)
+    if start_date:
+        rollups = rollups.filter(date__gte=start_date)
+        trips = trips.filter(start_time__date__gte=start_date)
+    if end_date:
+        rollups = rollups.filter(date__lte=end_date)
+        trips = trips.filter(start_time__date__lte=end_date)
+    rollups.delete()
+
+    distance = ExpressionWrapper(
+        F('end_mileage') - F('start_mileage'),
+        output_field=DecimalField(max_digits=12, decimal_places=1),
+    )
+    grouped = trips.annotate(
+        day=TruncDate('start_time')
+    ).values(
+        'assignment__vehicle_id', 'assignment__driver_id', 'day'
+    ).annotate(
+        trips=Count('trip_id'),
+        km=Sum(distance),
+    ).order_by()
+
+    written = 0
+    batch = []
+    for row in grouped.iterator(chunk_size=batch_size):
+        batch.append(VehicleDailyUsage(
+            vehicle_id=row['assignment__vehicle_id'],
+            driver_id=row['assignment__driver_id'],
+            date=row['day'],
+            trip_count=row['trips'],
+            total_km=row['km'] or 0,
+        ))
+        if len(batch) >= batch_size:
+            VehicleDailyUsage.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        VehicleDailyUsage.objects.bulk_create(batch)
+        written += len(batch)
+    return written
+
+
+def fleet_usage_row(vehicle):
+    """Build the report row for a vehicle from fleet_usage_queryset."""
+    current_driver = vehicle.assigned_driver
+    maintenance_due = bool(
+        vehicle.next_service_mileage and vehicle.current_mileage >= vehicle.next_service_mileage
+    )
+    return {
+        "id": vehicle.id,
+        "vehicle": f"{vehicle.make} {vehicle.model}",
+        "license_plate": vehicle.license_plate,
+        "department": vehicle.department.name if vehicle.department else None,
+        "category": vehicle.category,
+        "status": vehicle.status,
+        "current_driver": f"{current_driver.first_name} {current_driver.last_name}" if current_driver else None,
+        "assigned_drivers_this_period": [
+            {
+                "driver": f"{a.driver.first_name} {a.driver.last_name}",
+                "assigned_at": a.assigned_at,
+                "unassigned_at": a.unassigned_at
+            }
+            for a in vehicle.period_assignments
+        ],
+        "trip_count": vehicle.trip_count,
+        "total_km": float(vehicle.total_km),
+        "maintenance_due": maintenance_due
+    }
+
+
+# Rows are pulled from the database in chunks of this size while exporting,
+# so memory stays flat however long the report period is.
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_HEADERS = [
+    "Vehicle",
+    "License Plate",
+    "Department",
+    "Category",
+    "Current Driver",
+    "Trip Count",
+    "Total KM",
+    "Maintenance Due",
+]
+
+
+def fleet_export_rows(start, end, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one export row per vehicle, reading the fleet with a server-side cursor."""
+    for vehicle in fleet_usage_queryset(start, end).iterator(chunk_size=chunk_size):
+        row = fleet_usage_row(vehicle)
+        yield [
+            row["vehicle"],
+            row["license_plate"],
+            row["department"],
+            row["category"],
+            row["current_driver"],
+            row["trip_count"],
+            row["total_km"],
+            "Yes" if row["maintenance_due"] else "No",
+        ]
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the csv writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def csv_export_response(rows, filename):
+    """Stream rows as CSV without building the file in memory."""
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow(EXPORT_HEADERS)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def xlsx_export_response(rows, filename):
+    """
+    Write rows to an xlsx workbook in openpyxl write-only mode.
+
+    Write-only worksheets flush each row to disk as it is appended, and the
+    finished workbook is spooled to a temporary file that FileResponse
+    streams and then closes (which deletes it).
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('vehicles_report')
+    sheet.append(EXPORT_HEADERS)
+    for row in rows:
+        sheet.append(row)
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=filename,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
@@ -0,0 +1,63 @@
+"""
+Jobs run by the long-lived `manage.py run_scheduler` process.
+
+Pool cars are released when the window they were booked for has ended and
+no trip on them is still running. Instead of polling on a fixed cron tick,
+the scheduler asks next_pool_release_at() when the next booking ends and
+sleeps until then.
+"""
+import logging
+import time
+
+from django.db.models import F, Min
+from django.utils import timezone
+
+from assignment.models import VehicleReservation
+from vehicles.models import ScheduledJobRun
+from vehicles.tasks import in_use_pool_cars, release_pool_cars
+
+
+logger = logging.getLogger(__name__)
+
+
+def release_due_pool_cars(now=None):
+    """
+    Mark in-use pool cars AVAILABLE once their booking has ended.
+
+    Same locked, reservation-aware release as `manage.py update_pool_cars`
+    (see tasks.release_pool_cars). Returns the license plates released.
+    """
+    return {"released": sorted(release_pool_cars(now).values())}
+
+
+def next_pool_release_at(now=None):
+    """When the next booking of an in-use pool car ends, or None if none is pending."""
+    now = now or timezone.now()
+    return VehicleReservation.objects.filter(
+        vehicle__in=in_use_pool_cars(),
+        end_time__gt=now
+    ).aggregate(next_end=Min('end_time'))['next_end']
+
+
+def run_job(name, job, **kwargs):
+    """Run a job and record its timing and result in ScheduledJobRun."""
+    started = timezone.now()
+    clock = time.monotonic()
+    result, error = {}, ''
+    try:
+        result = job(**kwargs)
+    except Exception as e:
+        logger.exception(f"[scheduler][{name}] Job failed: {e}")
+        error = str(e)
+    duration_ms = int((time.monotonic() - clock) * 1000)
+
+    ScheduledJobRun.objects.get_or_create(name=name)
+    ScheduledJobRun.objects.filter(name=name).update(
+        last_started_at=started,
+        last_finished_at=timezone.now(),
+        last_duration_ms=duration_ms,
+        last_result=result,
+        last_error=error,
+        run_count=F('run_count') + 1
+    )
+    return result
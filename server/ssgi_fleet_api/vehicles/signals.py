@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ssgi_fleet_api.cache import invalidate
+from vehicles.models import Vehicle, VehicleDriverAssignmentHistory
+
+
+@receiver([post_save, post_delete], sender=Vehicle)
+@receiver([post_save, post_delete], sender=VehicleDriverAssignmentHistory)
+def invalidate_vehicle_cache(sender, **kwargs):
+    # After commit, so a concurrent read cannot cache the old rows under the new version
+    transaction.on_commit(lambda: invalidate('vehicles'))
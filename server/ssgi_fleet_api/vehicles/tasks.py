@@ -1,8 +1,98 @@
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from assignment.models import Trips, Vehicle_Assignment, VehicleReservation
 from vehicles.models import Vehicle
+from ssgi_fleet_api.cache import invalidate
 
-def update_pool_cars():
-    updated = Vehicle.objects.filter(
+
+def in_use_pool_cars():
+    return Vehicle.objects.filter(
         category=Vehicle.Category.POOL,
         status=Vehicle.Status.IN_USE
-    ).update(status=Vehicle.Status.AVAILABLE)
-    return updated
+    )
+
+
+def open_assignments():
+    """
+    Assignments that still hold their vehicle: accepted by the driver, or
+    with a trip in progress. Correlated to the outer Vehicle row, for use
+    in Exists()/NOT EXISTS filters.
+    """
+    return Vehicle_Assignment.objects.filter(
+        Q(driver_status=Vehicle_Assignment.DriverStatus.ACCEPTED) |
+        Q(trips__status=Trips.TripStatus.STARTED),
+        vehicle=OuterRef('pk')
+    )
+
+
+def later_reservations(now):
+    """Reservations of the outer Vehicle row that run past `now`, for Exists() filters."""
+    return VehicleReservation.objects.filter(vehicle=OuterRef('pk'), end_time__gt=now)
+
+
+def releasable_pool_cars(now):
+    """
+    In-use pool cars nothing holds any more: no reservation runs past `now`
+    and no assignment is open (see open_assignments). A freshly assigned car
+    is still PENDING with the driver, so its reservation is what holds it.
+    """
+    return in_use_pool_cars().exclude(
+        Exists(later_reservations(now))
+    ).exclude(Exists(open_assignments()))
+
+
+def release_pool_cars(now=None):
+    """
+    Mark releasable pool cars AVAILABLE; returns {id: license_plate} of the
+    cars released.
+
+    The in-use pool cars are locked before the predicate is evaluated, so an
+    assignment that commits while this waits for the lock is seen by it,
+    and one that starts afterwards waits until the release commits.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        locked = list(in_use_pool_cars().select_for_update().values_list('id', flat=True))
+        released = dict(
+            releasable_pool_cars(now).filter(pk__in=locked).values_list('id', 'license_plate')
+        )
+        if released:
+            Vehicle.objects.filter(pk__in=released).update(
+                status=Vehicle.Status.AVAILABLE,
+                version=F('version') + 1,
+                updated_at=now
+            )
+            # Queryset updates bypass the post_save cache invalidation
+            transaction.on_commit(lambda: invalidate('vehicles'))
+    return released
+
+
+def update_pool_cars():
+    """
+    Release in-use pool cars that nothing is holding any more.
+
+    Uses the same locked predicate as the scheduler (release_pool_cars).
+    Cars with a trip in progress, an accepted assignment or a booking that
+    has not ended stay in use and are reported as skipped, with the reason.
+
+    Returns {"released": [plates], "skipped": [{"license_plate", "reason"}]}.
+    """
+    now = timezone.now()
+    released = release_pool_cars(now)
+
+    skipped = in_use_pool_cars().annotate(
+        on_trip=Exists(Trips.objects.filter(assignment__vehicle=OuterRef('pk'), status=Trips.TripStatus.STARTED)),
+        held=Exists(open_assignments()),
+    ).order_by('license_plate').values_list('license_plate', 'on_trip', 'held')
+    return {
+        "released": sorted(released.values()),
+        "skipped": [
+            {
+                "license_plate": plate,
+                "reason": "trip_in_progress" if on_trip else "accepted_assignment" if held else "reserved",
+            }
+            for plate, on_trip, held in skipped
+        ],
+    }
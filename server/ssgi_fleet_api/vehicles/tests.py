@@ -1,3 +1,713 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+import importlib
+import json
+import logging
+import os
+import tempfile
+from io import StringIO
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.apps import apps
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import LiveServerTestCase, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from assignment.models import Vehicle_Assignment, Trips, VehicleReservation
+from assignment.reservations import request_window, reserve
+from request.models import Vehicle_Request
+from users.models import User, Department
+from vehicles.models import ScheduledJobRun, Vehicle, VehicleDailyUsage, VehicleDriverAssignmentHistory
+from vehicles.scheduler import next_pool_release_at, release_due_pool_cars
+from vehicles.tasks import update_pool_cars
+from ssgi_fleet_api.benchmarks import compare
+from ssgi_fleet_api.database import postgres_database
+from ssgi_fleet_api.logging_utils import JsonFormatter, SamplingFilter, module_levels, queue_handlers
+from ssgi_fleet_api.metrics import RequestMetricsMiddleware
+from ssgi_fleet_api.query_plans import HOT_QUERIES, check_query_plans
+from ssgi_fleet_api.synthetic import generate_fleet
+
+
+class FleetFixtureMixin:
+    """Helpers for building small fleets with trip history."""
+
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name="Operations")
+        self.admin = User.objects.create_user(
+            email="admin@ssgi.test", password=None,
+            first_name="Ada", last_name="Admin", role=User.Role.ADMIN,
+            username="ada_admin",
+        )
+        self.employee = User.objects.create_user(
+            email="employee@ssgi.test", password=None,
+            first_name="Eli", last_name="Employee", role=User.Role.EMPLOYEE,
+            department=self.department, username="eli_employee",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def create_vehicle(self, index, **extra):
+        driver = User.objects.create_user(
+            email=f"driver{index}@ssgi.test", password=None,
+            first_name="Dan", last_name=f"Driver{index}", role=User.Role.DRIVER,
+            username=f"driver_{index}",
+        )
+        vehicle = Vehicle.objects.create(
+            license_plate=f"AA-{index:04d}", make="Toyota", model="Hilux",
+            year=2020, fuel_type=Vehicle.FuelType.DIESEL, assigned_driver=driver,
+            department=self.department, **extra,
+        )
+        VehicleDriverAssignmentHistory.objects.create(vehicle=vehicle, driver=driver)
+        return vehicle
+
+    def create_assignment(self, vehicle, driver_status=Vehicle_Assignment.DriverStatus.COMPLETED):
+        vehicle_request = Vehicle_Request.objects.create(
+            requester=self.employee, pickup_location="HQ", destination="Site",
+            purpose="Field survey", passenger_count=2,
+            status=Vehicle_Request.Status.APPROVED,
+        )
+        vehicle.status = Vehicle.Status.AVAILABLE
+        assignment = Vehicle_Assignment.objects.create(
+            request=vehicle_request, vehicle=vehicle,
+            driver=vehicle.assigned_driver, assigned_by=self.admin,
+            driver_status=driver_status,
+        )
+        if driver_status in (Vehicle_Assignment.DriverStatus.PENDING, Vehicle_Assignment.DriverStatus.ACCEPTED):
+            reserve(assignment, *request_window(vehicle_request))
+        return assignment
+
+    def create_completed_trip(self, vehicle, start_mileage, end_mileage, start_time=None):
+        start_time = start_time or timezone.now()
+        trip = Trips.objects.create(
+            assignment=self.create_assignment(vehicle), start_mileage=Decimal(start_mileage),
+            end_mileage=Decimal(end_mileage), start_time=start_time,
+            end_time=start_time + timedelta(hours=1),
+            status=Trips.TripStatus.COMPLETED,
+        )
+        VehicleDailyUsage.record_trip(trip)
+        return trip
+
+
+class VehicleHistoryListViewTests(FleetFixtureMixin, TestCase):
+    url = reverse('vehicle-history-list')
+
+    def build_fleet(self, size, offset=0):
+        for index in range(offset, offset + size):
+            vehicle = self.create_vehicle(index)
+            self.create_completed_trip(vehicle, 100, 150)
+            self.create_completed_trip(vehicle, 150, 175.5)
+
+    def test_report_totals(self):
+        self.build_fleet(2)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+        for row in response.data:
+            self.assertEqual(row["trip_count"], 2)
+            self.assertEqual(row["total_km"], 75.5)
+            self.assertEqual(len(row["assigned_drivers_this_period"]), 1)
+
+    def test_trips_outside_period_are_ignored(self):
+        vehicle = self.create_vehicle(0)
+        self.create_completed_trip(vehicle, 0, 40, start_time=timezone.now() - timedelta(days=400))
+        self.create_completed_trip(vehicle, 40, 50)
+        start = (timezone.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        response = self.client.get(self.url, {"start": start})
+        self.assertEqual(response.data[0]["trip_count"], 1)
+        self.assertEqual(response.data[0]["total_km"], 10.0)
+
+    def test_query_count_is_independent_of_fleet_size(self):
+        self.build_fleet(2)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+        self.build_fleet(10, offset=2)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 12)
+        self.assertEqual(len(small), len(large))
+
+    def test_csv_export_streams_rows(self):
+        self.build_fleet(3)
+        response = self.client.get(self.url, {"export": "csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:2], ["Vehicle", "License Plate"])
+        self.assertEqual(len(lines), 4)
+        self.assertIn("75.5", lines[1])
+
+    def test_excel_export_is_a_workbook(self):
+        from io import BytesIO
+        from openpyxl import load_workbook
+
+        self.build_fleet(2)
+        response = self.client.get(self.url, {"export": "excel"})
+        self.assertEqual(response.status_code, 200)
+        workbook = load_workbook(BytesIO(b"".join(response.streaming_content)))
+        rows = list(workbook["vehicles_report"].values)
+        self.assertEqual(rows[0][0], "Vehicle")
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][5], 2)
+
+
+class VehicleDailyUsageTests(FleetFixtureMixin, TestCase):
+
+    def test_completing_a_trip_updates_the_rollup(self):
+        vehicle = self.create_vehicle(0)
+        self.create_completed_trip(vehicle, 0, 20)
+        started = Trips.objects.create(
+            assignment=self.create_assignment(vehicle, Vehicle_Assignment.DriverStatus.ACCEPTED),
+            start_mileage=Decimal("20"), start_time=timezone.now(),
+        )
+
+        driver_client = APIClient()
+        driver_client.force_authenticate(user=vehicle.assigned_driver)
+        response = driver_client.patch(
+            reverse('complete-assignment', args=[started.trip_id]),
+            {"end_mileage": "32.5"}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        usage = VehicleDailyUsage.objects.get(vehicle=vehicle)
+        self.assertEqual(usage.trip_count, 2)
+        self.assertEqual(usage.total_km, Decimal("32.5"))
+
+    def test_rebuild_matches_incremental_rollup(self):
+        for index in range(3):
+            vehicle = self.create_vehicle(index)
+            self.create_completed_trip(vehicle, 0, 10 + index)
+            self.create_completed_trip(vehicle, 50, 55, start_time=timezone.now() - timedelta(days=3))
+        expected = sorted(VehicleDailyUsage.objects.values_list('vehicle_id', 'date', 'trip_count', 'total_km'))
+
+        VehicleDailyUsage.objects.all().delete()
+        call_command('rebuild_vehicle_usage', stdout=StringIO())
+        rebuilt = sorted(VehicleDailyUsage.objects.values_list('vehicle_id', 'date', 'trip_count', 'total_km'))
+        self.assertEqual(rebuilt, expected)
+
+    def test_migration_backfills_trips_from_before_the_rollup(self):
+        vehicle = self.create_vehicle(0)
+        self.create_completed_trip(vehicle, 0, 12)
+        self.create_completed_trip(vehicle, 12, 30)
+        expected = list(VehicleDailyUsage.objects.values_list('vehicle_id', 'date', 'trip_count', 'total_km'))
+
+        VehicleDailyUsage.objects.all().delete()
+        migration = importlib.import_module('vehicles.migrations.0010_backfill_vehicledailyusage')
+        migration.backfill_daily_usage(apps, None)
+        self.assertEqual(list(VehicleDailyUsage.objects.values_list('vehicle_id', 'date', 'trip_count', 'total_km')), expected)
+
+    def test_single_vehicle_history_reads_rollup(self):
+        vehicle = self.create_vehicle(0)
+        self.create_completed_trip(vehicle, 0, 12)
+        self.create_completed_trip(vehicle, 12, 30)
+        response = self.client.get(reverse('vehicle-history', args=[vehicle.id]))
+        self.assertEqual(response.data["total_km_this_month"], 30.0)
+
+
+class DriverListingTests(FleetFixtureMixin, TestCase):
+
+    def create_unassigned_driver(self, index):
+        return User.objects.create_user(
+            email=f"spare{index}@ssgi.test", password=None,
+            first_name="Sam", last_name=f"Spare{index}", role=User.Role.DRIVER,
+            username=f"spare_{index}",
+        )
+
+    def test_all_drivers_reports_current_vehicle_and_assignment_date(self):
+        vehicle = self.create_vehicle(0)
+        spare = self.create_unassigned_driver(0)
+        response = self.client.get(reverse('all-drivers'))
+        rows = {row["id"]: row for row in response.data}
+        assigned = rows[vehicle.assigned_driver_id]
+        self.assertEqual(assigned["assigned_vehicle"], {"id": vehicle.id, "license_plate": vehicle.license_plate})
+        self.assertEqual(assigned["assigned_at"], vehicle.driver_history.get().assigned_at)
+        self.assertIsNone(rows[spare.id]["assigned_vehicle"])
+        self.assertIsNone(rows[spare.id]["assigned_at"])
+
+    def test_unassigned_drivers_excludes_assigned(self):
+        vehicle = self.create_vehicle(0)
+        spare = self.create_unassigned_driver(0)
+        response = self.client.get(reverse('unassigned-drivers'))
+        ids = [row["id"] for row in response.data]
+        self.assertEqual(ids, [spare.id])
+        self.assertNotIn(vehicle.assigned_driver_id, ids)
+
+    def test_driver_listings_use_constant_queries(self):
+        for url in (reverse('all-drivers'), reverse('unassigned-drivers')):
+            with self.subTest(url=url):
+                self.create_vehicle(100 if 'all' in url else 200)
+                with CaptureQueriesContext(connection) as small:
+                    self.client.get(url)
+                # Cache invalidation waits for commit, which TestCase never reaches
+                with self.captureOnCommitCallbacks(execute=True):
+                    for index in range(8):
+                        offset = 300 if 'all' in url else 400
+                        self.create_vehicle(offset + index)
+                        self.create_unassigned_driver(offset + index)
+                with CaptureQueriesContext(connection) as large:
+                    self.client.get(url)
+                self.assertEqual(len(small), len(large))
+
+    def test_pagination_is_opt_in(self):
+        for index in range(5):
+            self.create_unassigned_driver(index)
+        response = self.client.get(reverse('unassigned-drivers'), {"page_size": 2})
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+        self.assertIsInstance(self.client.get(reverse('unassigned-drivers')).data, list)
+
+
+class VehicleListingTests(FleetFixtureMixin, TestCase):
+
+    def test_assigned_date_comes_from_annotation(self):
+        vehicle = self.create_vehicle(0)
+        response = self.client.get('/api/vehicles/vehicles/list/')
+        self.assertEqual(response.data[0]["assigned_date"], vehicle.driver_history.get().assigned_at)
+
+    def test_vehicle_listings_use_constant_queries(self):
+        # ListVehiclesView and VehicleViewSet.list share the 'vehicle-list' route name
+        for url in ('/api/vehicles/vehicles/list/', '/api/vehicles/vehicles/'):
+            with self.subTest(url=url):
+                with self.captureOnCommitCallbacks(execute=True):
+                    Vehicle.objects.all().delete()
+                    self.create_vehicle(500 if url.endswith('list/') else 600)
+                with CaptureQueriesContext(connection) as small:
+                    self.client.get(url)
+                with self.captureOnCommitCallbacks(execute=True):
+                    for index in range(10):
+                        self.create_vehicle((700 if url.endswith('list/') else 800) + index)
+                with CaptureQueriesContext(connection) as large:
+                    response = self.client.get(url)
+                self.assertEqual(len(response.data), 11)
+                self.assertEqual(len(small), len(large))
+                self.assertLessEqual(len(large), 2)
+
+    def test_reassigning_driver_returns_new_assigned_date(self):
+        vehicle = self.create_vehicle(0)
+        new_driver = User.objects.create_user(
+            email="new.driver@ssgi.test", password=None, first_name="Nia",
+            last_name="Driver", role=User.Role.DRIVER, username="nia_driver",
+        )
+        response = self.client.patch(
+            reverse('vehicle-detail', kwargs={"id": vehicle.id}),
+            {"driver_id": new_driver.id}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        current = vehicle.driver_history.get(driver=new_driver)
+        self.assertEqual(response.data["assigned_date"], current.assigned_at)
+
+
+class RequestMetricsTests(FleetFixtureMixin, TestCase):
+    url = '/api/vehicles/vehicles/list/'
+
+    def test_server_timing_and_log_line(self):
+        self.create_vehicle(0)
+        with self.assertLogs('ssgi_fleet_api.metrics', level='DEBUG') as logs:
+            response = self.client.get(self.url)
+        timing = {part.split(';')[0]: part for part in response['Server-Timing'].split(', ')}
+        self.assertEqual(set(timing), {'db', 'serialize', 'total'})
+        record = logs.records[-1]
+        self.assertEqual(record.metrics["view"], 'vehicle-list')
+        self.assertEqual(record.metrics["status"], 200)
+        self.assertEqual(record.metrics["user_id"], self.admin.pk)
+        self.assertGreater(record.metrics["queries"], 0)
+        self.assertIn(f'desc="{record.metrics["queries"]} queries"', timing['db'])
+
+    @override_settings(REQUEST_METRICS_SLOW_MS=0)
+    def test_stacks_are_off_by_default(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with self.assertLogs('ssgi_fleet_api.metrics', level='WARNING') as logs:
+            client.get(self.url)
+        statements = logs.records[-1].metrics["statements"]
+        self.assertTrue(statements)
+        self.assertTrue(all(statement["stack"] == [] for statement in statements))
+
+    @override_settings(REQUEST_METRICS_SLOW_MS=0, REQUEST_METRICS_STACKS=True)
+    def test_slow_requests_log_sql_and_stack(self):
+        self.create_vehicle(0)
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with self.assertLogs('ssgi_fleet_api.metrics', level='WARNING') as logs:
+            client.get(self.url)
+        record = logs.records[-1]
+        statements = record.metrics["statements"]
+        self.assertEqual(len(statements), record.metrics["queries"])
+        self.assertTrue(any('vehicles_vehicle' in statement["sql"] for statement in statements))
+        self.assertTrue(any('vehicles/api/views.py' in frame for s in statements for frame in s["stack"]))
+        self.assertIn("Slow request: GET /api/vehicles/vehicles/list/", record.getMessage())
+
+    def test_async_chain_stays_async(self):
+        async def get_response(request):
+            return HttpResponse('ok')
+
+        middleware = RequestMetricsMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = RequestFactory().get(self.url)
+        with self.assertLogs('ssgi_fleet_api.metrics', level='DEBUG') as logs:
+            response = async_to_sync(middleware)(request)
+        self.assertIn('total;dur=', response['Server-Timing'])
+        self.assertEqual(logs.records[-1].levelno, logging.DEBUG)
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_disabled_middleware_is_dropped(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestMetricsMiddleware(lambda request: None)
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        self.assertNotIn('Server-Timing', client.get(self.url))
+
+
+class LoggingPipelineTests(TestCase):
+
+    def make_logger(self, name):
+        stream = StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JsonFormatter())
+        logger = logging.getLogger(name)
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        return logger, handler, stream
+
+    def test_queued_records_are_written_as_json(self):
+        logger, handler, stream = self.make_logger('tests.logging.queue')
+        listeners = queue_handlers([logger])
+        self.addCleanup(lambda: [logger.removeHandler(h) for h in list(logger.handlers)])
+        self.assertNotIn(handler, logger.handlers)
+
+        items = ['a']
+        logger.info("items: %s", items, extra={"metrics": {"queries": 3}})
+        items.append('b')
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+        for listener in listeners:
+            listener.stop()
+
+        first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(first["message"], "items: ['a']")
+        self.assertEqual(first["metrics"], {"queries": 3})
+        self.assertEqual(first["level"], "INFO")
+        self.assertEqual(second["logger"], 'tests.logging.queue')
+        self.assertIn("ValueError: boom", second["exc"])
+
+    def test_sampling_only_drops_debug_records(self):
+        logger, handler, stream = self.make_logger('tests.logging.sampling')
+        handler.addFilter(SamplingFilter(rate=0))
+        logger.debug("noisy")
+        logger.info("kept")
+        self.assertEqual([json.loads(line)["message"] for line in stream.getvalue().splitlines()], ["kept"])
+
+    def test_module_levels(self):
+        self.assertEqual(
+            module_levels(" vehicles=debug, django.db.backends=INFO ,"),
+            {"vehicles": "DEBUG", "django.db.backends": "INFO"}
+        )
+        self.assertEqual(module_levels(None), {})
+
+
+class DatabaseSettingsTests(TestCase):
+    env = {'DB_NAME': 'fleet', 'DB_HOST': 'db.example.com', 'DB_PORT': '5432'}
+
+    def test_pool_is_the_default(self):
+        database = postgres_database(self.env)
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        self.assertEqual(database['OPTIONS'], {'pool': {'min_size': 2, 'max_size': 10, 'timeout': 10.0}})
+
+    def test_persistent_connections_without_pool(self):
+        database = postgres_database({**self.env, 'DB_POOL': 'false', 'DB_CONN_MAX_AGE': '300'})
+        self.assertEqual(database['CONN_MAX_AGE'], 300)
+        self.assertEqual(database['OPTIONS'], {})
+
+    def test_pgbouncer_transaction_mode(self):
+        database = postgres_database({**self.env, 'DB_POOL': 'false', 'DB_PGBOUNCER': 'true'})
+        self.assertTrue(database['DISABLE_SERVER_SIDE_CURSORS'])
+        self.assertEqual(database['OPTIONS'], {'prepare_threshold': None})
+
+    def test_connection_benchmark(self):
+        out = StringIO()
+        call_command('benchmark_db_connections', '--requests', '3', stdout=out)
+        self.assertIn("new connection", out.getvalue())
+        self.assertIn("persistent", out.getvalue())
+
+
+class DashboardCacheTests(FleetFixtureMixin, TestCase):
+    url = '/api/vehicles/vehicles/list/'
+
+    def test_repeat_requests_are_served_from_cache(self):
+        self.create_vehicle(0)
+        first = self.client.get(self.url)
+        self.assertEqual(first["X-Cache"], "MISS")
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(self.url)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(len(queries), 0)
+
+    def test_conditional_hit_needs_no_queries(self):
+        vehicle = self.create_vehicle(0)
+        first = self.client.get(self.url)
+        self.assertIn("ETag", first)
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["X-Cache"], "HIT")
+        self.assertEqual(len(queries), 0)
+
+        vehicle.status = Vehicle.Status.MAINTENANCE
+        with self.captureOnCommitCallbacks(execute=True):
+            vehicle.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+    @override_settings(API_CACHE_ENABLED=False)
+    def test_conditional_get_without_cache(self):
+        self.create_vehicle(0)
+        first = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+        # Filters are part of the validator
+        self.assertEqual(
+            self.client.get(self.url, {"status": "maintenance"}, HTTP_IF_NONE_MATCH=first["ETag"]).status_code,
+            200
+        )
+
+    def test_query_string_is_part_of_the_key(self):
+        self.create_vehicle(0)
+        self.client.get(self.url)
+        response = self.client.get(self.url, {"status": "maintenance"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data, [])
+
+    def test_saving_a_vehicle_invalidates(self):
+        vehicle = self.create_vehicle(0)
+        self.client.get(self.url)
+        vehicle.status = Vehicle.Status.MAINTENANCE
+        with self.captureOnCommitCallbacks(execute=True):
+            vehicle.save()
+            # Until the write commits, readers keep the committed listing
+            self.assertEqual(self.client.get(self.url)["X-Cache"], "HIT")
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data[0]["status"], Vehicle.Status.MAINTENANCE)
+
+    def test_bulk_pool_release_invalidates(self):
+        self.create_vehicle(0, category=Vehicle.Category.POOL, status=Vehicle.Status.IN_USE)
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            update_pool_cars()
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data[0]["status"], Vehicle.Status.AVAILABLE)
+
+    def test_department_listing_is_cached_and_invalidated(self):
+        url = reverse('list-departments')
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+        with self.captureOnCommitCallbacks(execute=True):
+            Department.objects.create(name="Finance")
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data), 2)
+
+    def test_stats_are_superadmin_only(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.assertEqual(self.client.get(reverse('api-cache-stats')).status_code, 403)
+
+        superadmin = User.objects.create_user(
+            email="root@ssgi.test", password=None, first_name="Sue",
+            last_name="Root", role=User.Role.SUPERADMIN, username="sue_root",
+        )
+        self.client.force_authenticate(user=superadmin)
+        stats = self.client.get(reverse('api-cache-stats')).data
+        self.assertEqual(stats["vehicle-list"], {"hits": 1, "misses": 1})
+
+
+class PoolCarSchedulerTests(FleetFixtureMixin, TestCase):
+
+    def booked_pool_car(self, index, ends_in, category=Vehicle.Category.POOL):
+        vehicle = self.create_vehicle(index, category=category)
+        assignment = self.create_assignment(vehicle, Vehicle_Assignment.DriverStatus.COMPLETED)
+        now = timezone.now()
+        VehicleReservation.objects.create(
+            vehicle=vehicle, assignment=assignment,
+            start_time=now + ends_in - timedelta(hours=2), end_time=now + ends_in,
+        )
+        Vehicle.objects.filter(pk=vehicle.pk).update(status=Vehicle.Status.IN_USE)
+        return vehicle, assignment
+
+    def test_releases_only_pool_cars_whose_booking_ended(self):
+        ended, _ = self.booked_pool_car(0, ends_in=-timedelta(minutes=5))
+        running, _ = self.booked_pool_car(1, ends_in=timedelta(hours=1))
+        on_trip, assignment = self.booked_pool_car(2, ends_in=-timedelta(minutes=5))
+        Trips.objects.create(assignment=assignment, start_mileage=0, start_time=timezone.now())
+        field, _ = self.booked_pool_car(3, ends_in=-timedelta(minutes=5), category=Vehicle.Category.FIELD)
+
+        self.assertEqual(release_due_pool_cars(), {"released": [ended.license_plate]})
+        statuses = dict(Vehicle.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[ended.id], Vehicle.Status.AVAILABLE)
+        for vehicle in (running, on_trip, field):
+            self.assertEqual(statuses[vehicle.id], Vehicle.Status.IN_USE)
+
+    def test_next_release_is_the_earliest_booking_end(self):
+        self.assertIsNone(next_pool_release_at())
+        self.booked_pool_car(0, ends_in=timedelta(hours=3))
+        soon, _ = self.booked_pool_car(1, ends_in=timedelta(minutes=30))
+        self.assertEqual(next_pool_release_at(), soon.reservations.get().end_time)
+
+    def test_run_once_records_timing_and_is_exposed(self):
+        ended, _ = self.booked_pool_car(0, ends_in=-timedelta(minutes=5))
+        self.booked_pool_car(1, ends_in=timedelta(minutes=30))
+        call_command('run_scheduler', '--once', stdout=StringIO())
+
+        run = ScheduledJobRun.objects.get(name='release_pool_cars')
+        self.assertEqual(run.run_count, 1)
+        self.assertEqual(run.last_result, {"released": [ended.license_plate]})
+        self.assertLessEqual(run.next_run_at, timezone.now() + timedelta(minutes=30))
+
+        response = self.client.get(reverse('scheduler-status'))
+        self.assertEqual(response.status_code, 200)
+        jobs = {job["name"]: job for job in response.data}
+        self.assertEqual(jobs["release_pool_cars"]["run_count"], 1)
+        self.assertEqual(jobs["compact_token_blacklist"]["last_result"]["deleted"], 0)
+
+
+class UpdatePoolCarsTests(FleetFixtureMixin, TestCase):
+
+    def test_skips_cars_still_held_by_an_assignment(self):
+        idle = self.create_vehicle(0, category=Vehicle.Category.POOL)
+        accepted = self.create_vehicle(1, category=Vehicle.Category.POOL)
+        self.create_assignment(accepted, Vehicle_Assignment.DriverStatus.ACCEPTED)
+        on_trip = self.create_vehicle(2, category=Vehicle.Category.POOL)
+        Trips.objects.create(
+            assignment=self.create_assignment(on_trip, Vehicle_Assignment.DriverStatus.ACCEPTED),
+            start_mileage=0, start_time=timezone.now(),
+        )
+        finished = self.create_vehicle(3, category=Vehicle.Category.POOL)
+        self.create_completed_trip(finished, 100, 150)
+        field = self.create_vehicle(4, category=Vehicle.Category.FIELD)
+        Vehicle.objects.update(status=Vehicle.Status.IN_USE)
+
+        with self.assertNumQueries(6):
+            report = update_pool_cars()
+        self.assertEqual(report, {
+            "released": [idle.license_plate, finished.license_plate],
+            "skipped": [
+                {"license_plate": accepted.license_plate, "reason": "accepted_assignment"},
+                {"license_plate": on_trip.license_plate, "reason": "trip_in_progress"},
+            ],
+        })
+        statuses = dict(Vehicle.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[idle.id], Vehicle.Status.AVAILABLE)
+        self.assertEqual(statuses[finished.id], Vehicle.Status.AVAILABLE)
+        for vehicle in (accepted, on_trip, field):
+            self.assertEqual(statuses[vehicle.id], Vehicle.Status.IN_USE)
+
+    def test_freshly_assigned_car_is_held_by_its_reservation(self):
+        # AssignCarAPIView leaves the assignment PENDING with the driver
+        pending = self.create_vehicle(0, category=Vehicle.Category.POOL)
+        self.create_assignment(pending, Vehicle_Assignment.DriverStatus.PENDING)
+        Vehicle.objects.update(status=Vehicle.Status.IN_USE)
+
+        self.assertEqual(release_due_pool_cars(), {"released": []})
+        self.assertEqual(update_pool_cars(), {
+            "released": [],
+            "skipped": [{"license_plate": pending.license_plate, "reason": "reserved"}],
+        })
+        self.assertEqual(Vehicle.objects.get().status, Vehicle.Status.IN_USE)
+
+    def test_benchmark_command_rolls_back_its_fleet(self):
+        out = StringIO()
+        call_command('benchmark_pool_release', '--vehicles', '20', '--repeat', '1', stdout=out)
+        self.assertIn("released 14, skipped 6", out.getvalue())
+        self.assertFalse(Vehicle.objects.exists())
+
+
+class HotQueryPlanTests(TestCase):
+
+    def test_hot_queries_use_their_indexes(self):
+        counts = generate_fleet(requests=500, batch_size=200)
+        self.assertEqual(counts["requests"], 500)
+        self.assertEqual(counts["vehicles"], 10)
+        results = check_query_plans()
+        self.assertEqual({result["name"] for result in results}, set(HOT_QUERIES))
+        for result in results:
+            with self.subTest(result["name"]):
+                self.assertIn(result["expected_index"], result["indexes"], result["plan"])
+                self.assertFalse(result["seq_scan"], result["plan"])
+
+    def test_command_loads_and_rolls_back(self):
+        out = StringIO()
+        call_command('explain_hot_queries', '--rows', '300', stdout=out)
+        self.assertIn("All 7 hot queries use their index", out.getvalue())
+        self.assertFalse(Vehicle_Request.objects.exists())
+
+
+
+class BenchmarkSuiteTests(TestCase):
+
+    def test_generate_fleet_data_builds_reports(self):
+        out = StringIO()
+        call_command('generate_fleet_data', '--requests', '300', '--days', '30', stdout=out)
+        self.assertIn("300 requests", out.getvalue())
+        self.assertEqual(Vehicle_Request.objects.count(), 300)
+        self.assertTrue(VehicleDailyUsage.objects.exists())
+
+    def test_run_benchmarks_writes_results_and_rolls_back(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            call_command('run_benchmarks', '--iterations', '2', '--output', path, stdout=StringIO(), stderr=StringIO())
+            with open(path) as f:
+                results = json.load(f)
+        self.assertEqual(set(results["endpoints"]), {
+            "login", "request_create", "request_approve", "assign", "accept", "complete",
+            "fleet_history", "admin_history",
+        })
+        for name, summary in results["endpoints"].items():
+            with self.subTest(name):
+                self.assertEqual(summary["count"], 2)
+                self.assertEqual(summary["errors"], 0)
+                self.assertGreater(summary["queries_max"], 0)
+        self.assertFalse(User.objects.exists())
+
+    def test_compare_flags_slower_endpoints_and_extra_queries(self):
+        def run(p95, queries):
+            return {"endpoints": {"assign": {"p95_ms": p95, "queries_max": queries}}}
+
+        self.assertEqual(compare(run(10.0, 15), run(11.5, 15)), [])
+        self.assertEqual(compare(run(10.0, 15), run(13.0, 16)), [
+            "assign: p95 10.0 ms -> 13.0 ms",
+            "assign: queries 15 -> 16",
+        ])
+
+
+class LoadTestCommandTests(FleetFixtureMixin, LiveServerTestCase):
+
+    def test_reports_throughput_against_a_live_server(self):
+        self.create_vehicle(0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'load.json')
+            call_command(
+                'load_test', '--url', self.live_server_url, '--concurrency', '4', '--duration', '0.5',
+                '--user', self.admin.email, '--output', path, stdout=StringIO(), stderr=StringIO()
+            )
+            with open(path) as f:
+                results = json.load(f)
+        self.assertGreater(results["requests"], 0)
+        self.assertEqual(results["errors"], 0)
+        self.assertEqual(results["concurrency"], 4)